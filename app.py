@@ -2,13 +2,16 @@
 import streamlit as st, pandas as pd
 from pathlib import Path
 from signal_engine_v3_11 import (
-    Inputs, evaluate_signal, SWEEP_PROFILES, SWEEP_TYPES, ARCHETYPES,
-    load_profiles_from_excel, dump_profiles_to_json, load_profiles_from_json, log_signal_csv,
-    reset_model_to_defaults
+    Inputs, evaluate_signal, SWEEP_TYPES, ARCHETYPES,
+    load_profiles_from_excel, compute_targets, rr
 )
-# --- imports ---
-import streamlit as st
-from pathlib import Path
+from signal_logger import signal_logger, trade_ticket_logger
+from profile_registry import ProfileRegistry, ProfileSet
+from rerun_timer import RerunTimer
+import telemetry
+from targets import target_surface, score_surface, surface_frame, grid
+from dataclasses import astuple
+import datetime as dt, io, threading, time, uuid
 
 # 1) PAGE CONFIG — must be the first st.* call
 st.set_page_config(
@@ -16,18 +19,10 @@ st.set_page_config(
     page_icon="🪩",
     layout="wide"
 )
+timer = RerunTimer(st.session_state)
 
-# 2) THEME CSS — inject after page_config
-css = Path("assets/neon_theme.css").read_text()
-st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
-
-# 3) rest of your app...
-#   (imports that use st.* should be below OR they must not call st.* at import-time)
-# from signal_engine_v3 import ...
-
-
-st.markdown("""
-<style>
+# 2) THEME CSS — read once per server process, injected as a single block
+APP_CSS = """
 div.block-container {padding-top: 1.2rem; max-width: 1200px;}
 body {background: radial-gradient(1200px 700px at 10% -10%, rgba(0,255,255,.08), transparent),
                    radial-gradient(900px 600px at 110% 0%, rgba(255,0,255,.06), transparent),
@@ -39,24 +34,73 @@ h1.title-gradient {background: linear-gradient(90deg,#00e5ff,#ff5cf0,#00ffd5,#00
 .badge {display:inline-block; padding:.2rem .6rem; border-radius:12px; font-size:12px; border:1px solid rgba(255,255,255,.25); margin-right:.3rem;}
 .badge.green {background: rgba(0,200,100,.18); border-color: rgba(0,200,100,.45);} .badge.red {background: rgba(255,60,60,.18); border-color: rgba(255,60,60,.45);}
 .small {opacity:.7; font-size:12px}
-</style>
-""", unsafe_allow_html=True)
+"""
+
+@st.cache_resource
+def page_css()->str:
+    return Path("assets/neon_theme.css").read_text() + "\n" + APP_CSS
+
+st.markdown(f"<style>{page_css()}</style>", unsafe_allow_html=True)
 
 st.markdown("<h1 class='title-gradient'>LSF — Sweep Adaptive Signal Tool</h1>", unsafe_allow_html=True)
 st.caption("v3.11 — Adaptive Bias Logic + Transitional tag + VWAP close confirm (everything else preserved).")
 
+# Profiles — one shared registry (re-reads the JSON only when it changes on disk) and a per-session
+# copy-on-write snapshot, so Tuning edits in one browser session never leak into another.
+TUNING_PATH = Path("data") / "profiles_tuning.json"
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def read_model_summary(data:bytes):
+    xls = pd.ExcelFile(io.BytesIO(data))
+    return xls.parse("Model Summary") if "Model Summary" in xls.sheet_names else None
+
+@st.cache_resource
+def get_registry():
+    TUNING_PATH.parent.mkdir(parents=True, exist_ok=True)
+    return ProfileRegistry(str(TUNING_PATH))
+
+def session_profiles()->ProfileSet:
+    base = get_registry().snapshot(); ss = st.session_state
+    if "profiles" not in ss or (not ss.get("profiles_edited") and ss["profiles"].version != base.version):
+        ss["profiles"], ss["profiles_edited"] = base, False
+    return ss["profiles"]
+
+def set_session_profiles(ps:ProfileSet, edited:bool=True):
+    st.session_state["profiles"], st.session_state["profiles_edited"] = ps, edited
+
+# Gate telemetry — one process-wide aggregate, installed while at least one session has its checkbox ticked;
+# the engine pays for it only while it is installed. Streamlit gives no reliable "session closed" hook, so each
+# ticked session refreshes its claim on every rerun and claims idle for TELEMETRY_TTL seconds are dropped.
+TELEMETRY_TTL = 600.0
+
+@st.cache_resource
+def get_telemetry(): return telemetry.GateTelemetry()
+
+@st.cache_resource
+def telemetry_sessions(): return {}, threading.Lock()      # session id -> last rerun (monotonic) while ticked
+
+def sync_telemetry(on:bool):
+    claims, lock = telemetry_sessions(); sid = st.session_state.setdefault("telemetry_sid", uuid.uuid4().hex)
+    now = time.monotonic()
+    with lock:
+        if on: claims[sid] = now
+        else: claims.pop(sid, None)
+        for k in [k for k, t in claims.items() if now - t > TELEMETRY_TTL]: del claims[k]
+        if claims: telemetry.enable(get_telemetry())
+        else: telemetry.disable()
+
 with st.sidebar:
     st.header("Data & Model")
-    tuning_path = Path("data") / "profiles_tuning.json"
-    tuning_path.parent.mkdir(parents=True, exist_ok=True)
-    if tuning_path.exists(): load_profiles_from_json(str(tuning_path))
+    profiles = session_profiles()
 
     uploaded = st.file_uploader("Optional: Load 'Model Summary' Excel", type=["xlsx"])
-    if uploaded is not None:
+    if uploaded is not None and st.session_state.get("excel_applied") != (uploaded.name, uploaded.size):
         try:
-            xls = pd.ExcelFile(uploaded)
-            if "Model Summary" in xls.sheet_names:
-                df = xls.parse("Model Summary"); load_profiles_from_excel(df)
+            df = read_model_summary(uploaded.getvalue())
+            if df is not None:
+                d = profiles.to_dict(); load_profiles_from_excel(df, d)
+                profiles = ProfileSet.from_dict(d, source=f"excel:{uploaded.name}"); set_session_profiles(profiles)
+                st.session_state["excel_applied"] = (uploaded.name, uploaded.size)
                 st.success("Adaptive thresholds refreshed from Excel ✅")
         except Exception as e:
             st.error(f"Excel parse failed: {e}")
@@ -64,15 +108,21 @@ with st.sidebar:
     model = st.selectbox("Liquidity Model", ARCHETYPES, index=0)
     session = st.selectbox("Session", ["Asia","London","NY"], index=2)
     sweep_type = st.selectbox("Liquidity Sweep", SWEEP_TYPES, index=0)
-    prof = SWEEP_PROFILES[model]
+    prof = profiles[model]
     st.markdown("**Profile Defaults**")
     cA, cB = st.columns(2)
     with cA: st.write(f"- Bias mode: `{prof.get('bias_mode')}`"); st.write(f"- ADX min: `{prof.get('adx_min')}`")
     with cB: st.write(f"- Delay: `{prof.get('post_sweep_delay',3)} bars`"); st.write(f"- VWAP expectation: `{prof.get('expected_vwap','support')}`")
+    st.caption(f"Profiles `{profiles.version}` • {profiles.source}{' (unsaved edits)' if st.session_state.get('profiles_edited') else ''}")
     st.markdown("---")
     st.header("Logging")
     enable_log = st.checkbox("Log 'Entry Ready = YES' to CSV", value=True)
     log_path = str(Path("logs/lsf_signal_log.csv"))
+    show_timings = st.checkbox("Debug: rerun timings", value=False)
+    show_telemetry = st.checkbox("Debug: gate telemetry", value=False, key="show_telemetry",
+                                 help="Counts every evaluation in this server process (all sessions) while any session has it ticked.")
+    sync_telemetry(show_telemetry)
+timer.lap("sidebar + profiles")
 
 st.subheader("Market State")
 c1,c2,c3,c4,c5,c6 = st.columns(6)
@@ -104,6 +154,8 @@ b1,b2 = st.columns(2)
 with b1: bias_logic_mode = st.selectbox("Bias logic mode", ["auto","adaptive","strict"], index=0)
 with b2: vwap_close_confirm = st.checkbox("Require VWAP close-confirm when flip/reclaim", value=True)
 
+timer.lap("market-state widgets")
+
 # Trade Ticket — with auto targets (kept)
 st.subheader("Trade Ticket — Entry / Risk / Targets")
 tt1, tt2, tt3, tt4 = st.columns(4)
@@ -123,31 +175,7 @@ with pol1: ensure_beyond = st.checkbox("Ensure targets beyond entry", value=True
 with pol2: preset = st.selectbox("Presets", ["—","2σ/3σ","2.5σ/4σ","3σ/5σ"], index=2)
 with pol3: apply_auto = st.button("Apply auto targets")
 
-# 1) replace the function
-def compute_targets(anchor, dev, m1, m2, side, entry, ensure):
-    """
-    If 'ensure' is True, use ENTRY as the base so TP is always away from entry.
-    Otherwise, use the provided anchor (legacy behavior).
-    """
-    base = entry if ensure else anchor
-    sign = 1 if side == "LONG" else -1
-    t1 = base + sign * (m1 * dev)
-    t2 = base + sign * (m2 * dev)
-
-    # one-tick safety nudge
-    tick = 0.25
-    if ensure:
-        if side == "LONG":
-            t1 = max(t1, entry + tick)
-            t2 = max(t2, entry + tick)
-        else:
-            t1 = min(t1, entry - tick)
-            t2 = min(t2, entry - tick)
-
-    return round(t1, 2), round(t2, 2)
-
-
-# 2) replace the apply call (where we compute TPs) with entry-aware version
+# auto targets — entry-aware (compute_targets / rr live in the engine so replay can share them)
 if apply_auto:
     t1, t2 = compute_targets(
         cisd_anchor, dev_per_sigma, mult1, mult2,
@@ -158,30 +186,89 @@ if apply_auto:
     st.success(f"Auto TP1={t1:.2f} | TP2={t2:.2f}")
 
 
-def rr(entry, sl, tp, side):
-    risk = (entry - sl) if side=="LONG" else (sl - entry)
-    reward = (tp - entry) if side=="LONG" else (entry - tp)
-    if risk <= 0: return None
-    return round(reward / risk, 2)
-
 rr1 = rr(entry_price, stop_loss, st.session_state.get("TP1_auto", tp1), desired)
 rr2 = rr(entry_price, stop_loss, st.session_state.get("TP2_auto", tp2), desired)
 c_rr1, c_rr2 = st.columns(2)
 with c_rr1: st.markdown(f"<div class='metric-card'><h3>R:R to TP1</h3><h2>{'—' if rr1 is None else rr1}</h2></div>", unsafe_allow_html=True)
 with c_rr2: st.markdown(f"<div class='metric-card'><h3>R:R to TP2</h3><h2>{'—' if rr2 is None else rr2}</h2></div>", unsafe_allow_html=True)
 
-# Evaluate
+# Target / R:R explorer — the whole grid in one NumPy pass (targets.py); a fragment, so its widgets rerun only this block
+@st.cache_data(show_spinner=False, max_entries=32)
+def surface_cached(ref, side, dev, mults, stops, offsets, anchor, ensure):
+    return target_surface(ref, side, dev, mults, stops, offsets, anchor, ensure)
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def read_bar_paths(data:bytes):
+    df = pd.read_csv(io.BytesIO(data), usecols=["high","low","close"])
+    return df["high"].to_numpy(float), df["low"].to_numpy(float), df["close"].to_numpy(float)
+
+MAX_PATH_CELLS = 20_000_000     # paths x cells per scoring run (~0.5 s); `every` is raised to stay under it
+
+@st.cache_data(show_spinner="Scoring against bar paths…", max_entries=16)
+def scored_cached(ref, side, dev, mults, stops, offsets, anchor, ensure, data:bytes, every, horizon, fill_bars):
+    h, l, c = read_bar_paths(data)
+    return score_surface(target_surface(ref, side, dev, mults, stops, offsets, anchor, ensure), h, l, c,
+                         range(0, len(c), every), horizon, fill_bars)
+
+@st.fragment
+def target_explorer(ref, side, dev, anchor, ensure):
+    import altair as alt
+    e1, e2, e3 = st.columns(3)
+    with e1: m_lo, m_hi = st.slider("σ multipliers", 0.25, 10.0, (1.0, 6.0), 0.25); m_step = st.number_input("σ step", 0.05, 2.0, 0.25, 0.05)
+    with e2: s_lo, s_hi = st.slider("Stop distance (pts)", 1.0, 100.0, (5.0, 40.0), 0.25); s_step = st.number_input("Stop step", 0.25, 10.0, 1.0, 0.25)
+    with e3: o_lo, o_hi = st.slider("Entry offset (pts, + = better fill)", -20.0, 20.0, (-2.0, 4.0), 0.25); o_step = st.number_input("Offset step", 0.25, 10.0, 1.0, 0.25)
+    mults, stops, offsets = (tuple(grid(m_lo, m_hi, m_step)), tuple(grid(s_lo, s_hi, s_step)), tuple(grid(o_lo, o_hi, o_step)))
+    bars_file = st.file_uploader("Optional: 1m bars CSV (high, low, close) to score hit rates / expected R", type=["csv"], key="explorer_bars")
+    if bars_file is not None:
+        h1, h2, h3 = st.columns(3)
+        with h1: horizon = st.number_input("Horizon (bars)", 5, 1000, 120, 5)
+        with h2: fill_bars = st.number_input("Fill window (bars)", 1, 60, 5)
+        with h3: every = st.number_input("Signal every N bars", 1, 1000, 30)
+        n_bars = len(read_bar_paths(bars_file.getvalue())[2]); n_grid = len(mults)*len(stops)*len(offsets)
+        floor = -(-n_bars*n_grid//MAX_PATH_CELLS)
+        if every < floor: st.caption(f"Signal spacing raised to every {floor} bars to keep {n_grid:,} cells × paths under {MAX_PATH_CELLS:,}."); every = floor
+        surf = scored_cached(ref, side, dev, mults, stops, offsets, anchor, ensure, bars_file.getvalue(), every, horizon, fill_bars)
+        metrics = ["exp_r", "p_tp", "p_sl", "rr", "tp"]
+    else:
+        surf = surface_cached(ref, side, dev, mults, stops, offsets, anchor, ensure); metrics = ["rr", "tp"]
+    k1, k2 = st.columns(2)
+    with k1: metric = st.selectbox("Colour by", metrics)
+    with k2: off = st.select_slider("Entry offset shown", options=list(surf["offset"]), value=min(surf["offset"], key=abs))
+    df = surface_frame(surf); n_cells = len(df); df = df[df["offset"] == off]
+    chart = alt.Chart(df).mark_rect().encode(
+        x=alt.X("mult:O", title="σ multiplier"), y=alt.Y("stop:O", title="stop (pts)", sort="descending"),
+        color=alt.Color(f"{metric}:Q", scale=alt.Scale(scheme="redyellowgreen" if metric in ("exp_r", "rr", "p_tp") else "yelloworangered")),
+        tooltip=[c for c in df.columns if c != "offset"])
+    st.altair_chart(chart.properties(height=420), use_container_width=True)
+    pick = {"p_sl": "idxmin", "tp": None}.get(metric, "idxmax")        # lower is better for p_sl; a TP price has no "best"
+    best = df.loc[getattr(df[metric], pick)()] if pick and df[metric].notna().any() else None
+    st.caption(f"{n_cells:,} cells computed • showing {len(df):,}" +
+               (f" • best {metric} = {best[metric]:.3f} at {best['mult']}σ, stop {best['stop']} (TP {best['tp']:.2f})" if best is not None else ""))
+
+with st.expander("🎯 Target / R:R explorer"):
+    target_explorer(float(entry_price), desired, float(dev_per_sigma), float(cisd_anchor), bool(ensure_beyond))
+
+timer.lap("trade ticket + targets")
+
+# Evaluate — memoized on the full input tuple + profile snapshot version
+@st.cache_data(show_spinner=False, max_entries=4096)
+def evaluate_cached(desired:str, inp_key:tuple, profiles_version:str, _profiles):
+    return evaluate_signal(desired, Inputs(*inp_key), profiles=_profiles)
+
 inp = Inputs(price=price, vwap_side=vwap_side, vwap_slope=vwap_slope,
              adx_now=adx_now, adx_sma3=adx_sma3, adx_sma6=adx_sma6, adx_kill=adx_kill,
              session=session, mss_dir=None if mss_dir=='None' else mss_dir, mss_tf='3m',
              htf_60m_bias=htf, ltf_15m_bias=l15, ltf_3m_bias=l3,
              liquidity_model=model, sweep_type=sweep_type, bars_since_sweep=bars_since_sweep,
-             post_sweep_delay=SWEEP_PROFILES[model].get('post_sweep_delay',3),
-             require_vwap_flip=SWEEP_PROFILES[model].get('require_vwap_flip', True),
+             post_sweep_delay=prof.post_sweep_delay,
+             require_vwap_flip=prof.require_vwap_flip,
              micro_fvg_present=micro_fvg,
-             adx_min=SWEEP_PROFILES[model].get('adx_min', 28), adx_slope_min=adx_slope_min,
+             adx_min=prof.adx_min, adx_slope_min=adx_slope_min,
              bias_logic_mode=bias_logic_mode, vwap_close_confirm=vwap_close_confirm)
-res = evaluate_signal(desired, inp, profiles=SWEEP_PROFILES)
+# a cache hit never reaches the engine, so while telemetry is installed evaluate directly and let it count every rerun
+res = (evaluate_signal(desired, inp, profiles=profiles) if telemetry.current() is not None
+       else evaluate_cached(desired, astuple(inp), profiles.version, profiles))
+timer.lap("evaluate")
 
 st.subheader("Signal Result")
 m1, m2, m3 = st.columns([1,1,1])
@@ -198,50 +285,108 @@ with st.expander("Component Checks"):
         chips.append(f"<span class='badge {cls}'>{label}</span>")
     chips.append(f"<span class='badge'>{'bias:'+comp.get('bias_note','')}</span>")
     st.markdown(' '.join(chips), unsafe_allow_html=True)
+timer.lap("result render")
 
-# Logging
-if res["entry_ready"] and enable_log:
+# Logging — one buffered logger per file, shared across reruns (header/append handled under a file lock)
+@st.cache_resource
+def get_loggers(signal_path:str):
+    return signal_logger(signal_path), trade_ticket_logger("logs/trade_tickets.csv")
+
+# a rerun caused by an unrelated widget must not log the same signal again
+log_key = (desired, astuple(inp), profiles.version, entry_price, stop_loss, rr1, rr2)
+if res["entry_ready"] and enable_log and st.session_state.get("last_logged") != log_key:
     try:
-        log_signal_csv(log_path, model, desired, res, inp)
-        tlog = Path("logs/trade_tickets.csv"); tlog.parent.mkdir(parents=True, exist_ok=True)
-        import csv, datetime as dt
-        with open(tlog, "a", newline="") as f:
-            w = csv.writer(f)
-            if not tlog.exists() or tlog.stat().st_size == 0:
-                w.writerow(["timestamp","session","model","sweep_type","side","entry","sl","tp1","tp2","rr1","rr2","grade","tag"])
-            w.writerow([dt.datetime.utcnow().isoformat(), session, res.get("model_used"), sweep_type, desired,
-                        entry_price, stop_loss, st.session_state.get("TP1_auto", tp1),
-                        st.session_state.get("TP2_auto", tp2), rr1, rr2, res["grade"], res["tag"]])
+        sig_log, ticket_log = get_loggers(log_path)
+        sig_log.log_signal(model, desired, res, inp)
+        ticket_log.log({"timestamp": dt.datetime.utcnow().isoformat(), "session": session, "model": res.get("model_used"),
+                        "sweep_type": sweep_type, "side": desired, "entry": entry_price, "sl": stop_loss,
+                        "tp1": st.session_state.get("TP1_auto", tp1), "tp2": st.session_state.get("TP2_auto", tp2),
+                        "rr1": rr1, "rr2": rr2, "grade": res["grade"], "tag": res["tag"]})
+        sig_log.flush(); ticket_log.flush()
+        st.session_state["last_logged"] = log_key
         st.success("Logged to CSV ✔")
     except Exception as e:
         st.error(f"Logging failed: {e}")
 
-for name, path in [("Signal Log", log_path), ("Trade Tickets", "logs/trade_tickets.csv")]:
-    p = Path(path)
-    if Path(p).exists():
-        with open(p, "rb") as f:
-            st.download_button(f"Download {name} (CSV)", f, file_name=Path(p).name, mime="text/csv")
+timer.lap("logging")
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def read_log_bytes(path:str, mtime_ns:int, size:int)->bytes:
+    return Path(path).read_bytes()
+
+@st.fragment
+def log_downloads():
+    for name, path in [("Signal Log", log_path), ("Trade Tickets", "logs/trade_tickets.csv")]:
+        p = Path(path)
+        if p.exists():
+            stt = p.stat()
+            st.download_button(f"Download {name} (CSV)", read_log_bytes(path, stt.st_mtime_ns, stt.st_size),
+                               file_name=p.name, mime="text/csv")
+
+log_downloads()
+timer.lap("downloads")
 
 st.markdown('---')
 st.subheader("Tuning (per-model)")
+# widgets write through on_change callbacks (run before the next rerun), so the evaluation above
+# already sees the edit; each edit produces a new session snapshot instead of mutating shared state
+def _tune(model:str, field:str, key:str):
+    val = st.session_state[key]; ps = session_profiles()
+    ps = ps.edit(model, grade_weights={field[2:]: val}) if field.startswith("w_") else ps.edit(model, **{field: val})
+    set_session_profiles(ps)
+
+def _reset_model(model:str):
+    set_session_profiles(session_profiles().reset(model))
+    for k in [k for k in st.session_state if k.startswith(f"tune_{model}_")]: del st.session_state[k]
+
+def _tune_kw(field:str)->dict:
+    key = f"tune_{model}_{field}"
+    return {"key": key, "on_change": _tune, "args": (model, field, key)}
+
+# widget keys outlive the snapshot they were seeded from; when the profiles change underneath them (registry
+# reload, Excel load, save) drop the keys so the widgets pick up the new values
+if st.session_state.get("tuning_version") != profiles.version:
+    for k in [k for k in st.session_state if k.startswith("tune_")]: del st.session_state[k]
+    st.session_state["tuning_version"] = profiles.version
+
+gw = prof.grade_weights
 tc1, tc2, tc3 = st.columns(3)
-with tc1: SWEEP_PROFILES[model]["adx_min"] = st.number_input("ADX min (model)", value=float(SWEEP_PROFILES[model]["adx_min"]), step=1.0)
-with tc2: SWEEP_PROFILES[model]["post_sweep_delay"] = st.number_input("Post-sweep delay (bars, model)", value=int(SWEEP_PROFILES[model].get("post_sweep_delay",3)), step=1)
-with tc3: SWEEP_PROFILES[model]["require_vwap_flip"] = st.checkbox("Require VWAP flip", value=bool(SWEEP_PROFILES[model].get("require_vwap_flip", True)))
+with tc1: st.number_input("ADX min (model)", value=float(prof.adx_min), step=1.0, **_tune_kw("adx_min"))
+with tc2: st.number_input("Post-sweep delay (bars, model)", value=int(prof.post_sweep_delay), step=1, min_value=0, **_tune_kw("post_sweep_delay"))
+with tc3: st.checkbox("Require VWAP flip", value=bool(prof.require_vwap_flip), **_tune_kw("require_vwap_flip"))
 tw1, tw2, tw3, tw4, tw5 = st.columns(5)
-gw = SWEEP_PROFILES[model]["grade_weights"]
-with tw1: gw["sweep"] = st.number_input("Weight: Sweep", value=int(gw.get("sweep",30)), min_value=0, max_value=50)
-with tw2: gw["mss"] = st.number_input("Weight: MSS", value=int(gw.get("mss",20)), min_value=0, max_value=50)
-with tw3: gw["vwap"] = st.number_input("Weight: VWAP", value=int(gw.get("vwap",20)), min_value=0, max_value=50)
-with tw4: gw["adx"] = st.number_input("Weight: ADX", value=int(gw.get("adx",15)), min_value=0, max_value=50)
-with tw5: gw["bias"] = st.number_input("Weight: Bias", value=int(gw.get("bias",15)), min_value=0, max_value=50)
+with tw1: st.number_input("Weight: Sweep", value=int(gw["sweep"]), min_value=0, max_value=50, **_tune_kw("w_sweep"))
+with tw2: st.number_input("Weight: MSS", value=int(gw["mss"]), min_value=0, max_value=50, **_tune_kw("w_mss"))
+with tw3: st.number_input("Weight: VWAP", value=int(gw["vwap"]), min_value=0, max_value=50, **_tune_kw("w_vwap"))
+with tw4: st.number_input("Weight: ADX", value=int(gw["adx"]), min_value=0, max_value=50, **_tune_kw("w_adx"))
+with tw5: st.number_input("Weight: Bias", value=int(gw["bias"]), min_value=0, max_value=50, **_tune_kw("w_bias"))
 
 btn1, btn2 = st.columns([1,1])
 with btn1:
     if st.button("💾 Save tuning"):
-        tuning_path = Path("data") / "profiles_tuning.json"
-        tuning_path.parent.mkdir(parents=True, exist_ok=True)
-        dump_profiles_to_json(str(tuning_path)); st.success("Saved tuning to data/profiles_tuning.json")
+        set_session_profiles(get_registry().save(session_profiles()), edited=False)
+        st.success(f"Saved tuning to {TUNING_PATH.as_posix()}")
 with btn2:
-    if st.button("♻️ Reset this model to defaults"):
-        reset_model_to_defaults(model); st.success(f"{model} reset to defaults (not saved yet). Click 💾 Save to persist.")
+    if st.button("♻️ Reset this model to defaults", on_click=_reset_model, args=(model,)):
+        st.success(f"{model} reset to defaults (not saved yet). Click 💾 Save to persist.")
+timer.lap("tuning")
+timer.finish()
+
+if show_telemetry:
+    tel = get_telemetry()
+    with st.expander("📊 Gate telemetry", expanded=True):
+        g1, g2 = st.columns(2)
+        with g1: st.caption("Most-rejecting gates"); st.dataframe(pd.DataFrame(tel.blocking_gates()), hide_index=True, use_container_width=True)
+        with g2: st.caption("Eval time per row (µs; p50/p99 are bucket upper bounds)"); st.dataframe(pd.DataFrame(tel.timing_rows()), hide_index=True, use_container_width=True)
+        st.caption("Pass rate by archetype / session / direction")
+        st.dataframe(pd.DataFrame(tel.gate_rows()), hide_index=True, use_container_width=True)
+        ov = tel.override_rows()
+        if ov: st.caption("auto_model_from_context overrides"); st.dataframe(pd.DataFrame(ov), hide_index=True, use_container_width=True)
+        d1, d2 = st.columns(2)
+        with d1: st.download_button("⬇️ Prometheus text", tel.prometheus(), file_name="lsf_gates.prom", mime="text/plain")
+        with d2: st.button("Reset counters", on_click=tel.reset)
+
+if show_timings:
+    with st.sidebar.expander("⏱ Rerun timings (ms)", expanded=True):
+        st.dataframe(pd.DataFrame(RerunTimer.summary(st.session_state)), hide_index=True, use_container_width=True)
+        st.caption(f"last {len(RerunTimer.history(st.session_state))} reruns of this session")
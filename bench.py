@@ -0,0 +1,234 @@
+# bench.py — reproducible micro-benchmarks for the hot paths, with a saved baseline and regression gate
+#
+#   python bench.py                        run everything, write bench_results/latest.json, compare to bench_baseline.json
+#   python bench.py --save-baseline        run and store the result as the new (committed) baseline
+#   python bench.py -k evaluate --threshold 0.3
+# Exit status is 1 when any case is slower than baseline * (1 + threshold). Each case runs in --rounds interleaved
+# rounds, each timed next to a fixed reference loop, and the median time / reference ratio is what gets compared.
+# On a shared single-core VM an unchanged tree still drifts up to ~1.5x per case, hence the 0.75 default.
+from __future__ import annotations
+from typing import Callable, Dict, Any, List, Optional, Tuple
+import argparse, copy, gc, json, os, platform, re, shutil, statistics, sys, tempfile, time
+
+import numpy as np
+import pandas as pd
+import signal_engine_v3_11 as eng
+from signal_engine_v3_11 import (ARCHETYPES, evaluate_signal, evaluate_signals_batch, inputs_to_columns, random_inputs,
+                                 load_profiles_from_excel, load_profiles_from_json, dump_profiles_to_json,
+                                 log_signal_csv, compute_targets, rr)
+
+RESULTS_DIR = "bench_results"                # per-run output, git-ignored
+BASELINE = "bench_baseline.json"             # reference numbers, committed
+CASES: List[Tuple[str, Callable[[], Tuple[Callable[[], Any], int, Callable[[], None]]]]] = []
+IO_CASES = set()            # file-system bound: the CPU reference cannot normalise disk jitter, so they get 2x the threshold
+
+def case(name:str, io:bool=False):
+    """Register a setup function returning (run, ops_per_run, teardown); setup cost is not timed."""
+    def deco(fn):
+        CASES.append((name, fn))
+        if io: IO_CASES.add(name)
+        return fn
+    return deco
+
+# --- synthetic data ---
+def model_summary_sheet(n:int, seed:int=0)->pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"Archetype": rng.choice(ARCHETYPES + ["Unknown_Model"], n),
+                         "Avg_ADX_Entry": rng.uniform(15, 40, n).round(1),
+                         "VWAP_reclaim/support": rng.uniform(0, 1, n).round(2),
+                         "VWAP_rejection/resistance": rng.uniform(0, 1, n).round(2),
+                         "VWAP_flip/cross": rng.uniform(0, 1, n).round(2)})
+
+def _noop(): pass
+
+# --- cases ---
+@case("evaluate_signal/all_archetypes_x2")
+def _():
+    rows = random_inputs(2000, 1); per = [(m, d) for m in ARCHETYPES for d in ("LONG","SHORT")]
+    def run():
+        for i, inp in enumerate(rows):
+            inp.liquidity_model, d = per[i % len(per)]
+            evaluate_signal(d, inp)
+    return run, len(rows), _noop
+
+@case("evaluate_signals_batch/50k")
+def _():
+    cols = inputs_to_columns(random_inputs(50_000, 2))
+    return (lambda: evaluate_signals_batch(cols, "LONG")), 50_000, _noop
+
+@case("evaluate_signal_compact/into_buffer")
+def _():
+    from signal_engine_v3_11 import evaluate_signal_compact, ResultBuffer
+    rows = random_inputs(2000, 1)
+    def run():
+        buf = ResultBuffer()
+        for inp in rows: buf.append(evaluate_signal_compact("LONG", inp))
+        return buf.to_records()
+    return run, len(rows), _noop
+
+@case("evaluate_signal/telemetry_on")
+def _():
+    import telemetry
+    rows = random_inputs(2000, 1); prev = telemetry.current(); tel = telemetry.GateTelemetry()
+    def run():
+        telemetry.enable(tel)
+        try:
+            for inp in rows: evaluate_signal("LONG", inp)
+        finally: eng.TELEMETRY = prev
+    return run, len(rows), _noop
+
+@case("target_surface/11k_cells")
+def _():
+    from targets import target_surface, grid
+    args = (25000.0, "LONG", 12.5, grid(0.25, 8, 0.25), grid(2, 40, 1), grid(-4, 4, 1))
+    return (lambda: target_surface(*args)), 1, _noop
+
+@case("decision_table/lookup")
+def _():
+    from decision_table import DecisionTables
+    tabs = DecisionTables(); rows = random_inputs(5000, 3)
+    t = {m: tabs.table(m, "LONG") for m in ARCHETYPES}
+    return (lambda: [t[r.liquidity_model].lookup(r) for r in rows]), len(rows), _noop
+
+@case("log_signal_csv/append", io=True)
+def _():
+    d = tempfile.mkdtemp(); path = os.path.join(d, "log.csv"); inp = random_inputs(1, 4)[0]
+    res = evaluate_signal("LONG", inp)
+    def run():
+        for _ in range(500): log_signal_csv(path, inp.liquidity_model, "LONG", res, inp)
+    return run, 500, lambda: shutil.rmtree(d, ignore_errors=True)
+
+@case("signal_logger/append_buffered", io=True)
+def _():
+    from signal_logger import signal_logger
+    d = tempfile.mkdtemp(); lg = signal_logger(os.path.join(d, "log.csv"), max_rows=1000, max_age=60)
+    inp = random_inputs(1, 4)[0]; res = evaluate_signal("LONG", inp)
+    def run():
+        for _ in range(5000): lg.log_signal(inp.liquidity_model, "LONG", res, inp)
+        lg.flush()
+    return run, 5000, lambda: (lg.close(), shutil.rmtree(d, ignore_errors=True))
+
+@case("load_profiles_from_excel/20k_rows")
+def _():
+    df = model_summary_sheet(20_000)
+    return (lambda: load_profiles_from_excel(df, copy.deepcopy(eng._SWEEP_PROFILES_DEFAULT))), len(df), _noop
+
+@case("profiles_json/dump+load", io=True)
+def _():
+    d = tempfile.mkdtemp(); path = os.path.join(d, "p.json"); saved = copy.deepcopy(eng.SWEEP_PROFILES)
+    def run():
+        for _ in range(200): dump_profiles_to_json(path); load_profiles_from_json(path)
+    def teardown():
+        eng.SWEEP_PROFILES.clear(); eng.SWEEP_PROFILES.update(saved); shutil.rmtree(d, ignore_errors=True)
+    return run, 200, teardown
+
+@case("profile_registry/snapshot_unchanged", io=True)
+def _():
+    from profile_registry import ProfileRegistry
+    d = tempfile.mkdtemp(); path = os.path.join(d, "p.json"); dump_profiles_to_json(path)
+    reg = ProfileRegistry(path); reg.snapshot()
+    def run():
+        for _ in range(5000): reg.snapshot()
+    return run, 5000, lambda: shutil.rmtree(d, ignore_errors=True)
+
+@case("targets/compute_targets+rr")
+def _():
+    rng = np.random.default_rng(5)
+    args = [(float(e), float(s), side) for e, s, side in zip(rng.uniform(20000, 26000, 5000).round(2),
+                                                              rng.uniform(5, 40, 5000).round(2), rng.choice(["LONG","SHORT"], 5000))]
+    def run():
+        for entry, stop, side in args:
+            t1, t2 = compute_targets(entry, 12.5, 2.5, 4.0, side, entry, True)
+            sl = entry - stop if side == "LONG" else entry + stop
+            rr(entry, sl, t1, side); rr(entry, sl, t2, side)
+    return run, len(args), _noop
+
+# --- runner ---
+def _reference():
+    """Fixed pure-Python workload (dict stores, float math, calls) timed in every round; cases are reported relative to it."""
+    def f(x, i): return x*0.5 + i
+    def run():
+        d = {}; x = 0.0
+        for i in range(20_000): x = f(x, i); d[i & 255] = x
+        return x
+    return run, 20_000, _noop
+
+def measure(setup, repeat:int, min_time:float)->Dict[str, Any]:
+    run, ops, teardown = setup()
+    try:
+        run()                                             # warm-up (imports, caches, file creation)
+        samples = []; t_end = time.perf_counter() + min_time
+        while len(samples) < repeat or time.perf_counter() < t_end:
+            gc.collect(); gc.disable()
+            try:
+                t0 = time.perf_counter(); run(); samples.append((time.perf_counter() - t0)/ops)
+            finally:
+                gc.enable()
+            if len(samples) >= repeat*20: break
+    finally:
+        teardown()
+    return {"ops_per_run": ops, "runs": len(samples), "min_us": min(samples)*1e6,
+            "median_us": statistics.median(samples)*1e6, "stdev_us": (statistics.stdev(samples)*1e6 if len(samples) > 1 else 0.0)}
+
+def aggregate(rounds:List[Tuple[Dict[str, Any], float]])->Dict[str, Any]:
+    """Median across rounds of each statistic, and of each round's statistic divided by the reference timed next to it."""
+    med = lambda k: statistics.median(r[k] for r, _ in rounds)
+    return {"ops_per_run": rounds[0][0]["ops_per_run"], "runs": sum(r["runs"] for r, _ in rounds), "rounds": len(rounds),
+            "min_us": med("min_us"), "median_us": med("median_us"), "stdev_us": med("stdev_us"),
+            "rel_min": statistics.median(r["min_us"]/ref for r, ref in rounds),
+            "rel_median": statistics.median(r["median_us"]/ref for r, ref in rounds)}
+
+def compare(latest:Dict[str, Any], baseline:Dict[str, Any], threshold:float, metric:str="min_us")->List[Dict[str, Any]]:
+    """Ratios use the reference-normalised statistic when both sides have it, so machine-wide speed drift cancels out."""
+    out = []; rel = "rel_" + metric.split("_")[0]
+    for name, r in latest["cases"].items():
+        b = baseline.get("cases", {}).get(name)
+        if b is None: out.append({"case": name, "status": "new"}); continue
+        k = rel if rel in r and rel in b else metric
+        ratio = r[k]/b[k] if b[k] else float("inf")
+        out.append({"case": name, "baseline_us": round(b[metric], 3), "latest_us": round(r[metric], 3),
+                    "ratio": round(ratio, 3), "status": "REGRESSION" if ratio > 1 + threshold*(2 if name in IO_CASES else 1) else "ok"})
+    return out
+
+def main(argv:Optional[List[str]]=None)->int:
+    ap = argparse.ArgumentParser(description="LSF hot-path benchmarks")
+    ap.add_argument("-k", default=None, help="regex filter on case names")
+    ap.add_argument("--repeat", type=int, default=5); ap.add_argument("--min-time", type=float, default=0.5)
+    ap.add_argument("--rounds", type=int, default=5, help="interleaved rounds per case; the median round is compared")
+    ap.add_argument("--threshold", type=float, default=float(os.environ.get("LSF_BENCH_THRESHOLD", 0.75)),
+                    help="allowed slowdown vs baseline (0.75 = 75%%; doubled for file-system cases)")
+    ap.add_argument("--baseline", default=BASELINE)
+    ap.add_argument("--out", default=os.path.join(RESULTS_DIR, "latest.json"))
+    ap.add_argument("--metric", choices=["min_us","median_us"], default="min_us",
+                    help="statistic compared against the baseline (min is the least noisy)")
+    ap.add_argument("--save-baseline", action="store_true")
+    a = ap.parse_args(argv)
+    latest = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": sys.version.split()[0],
+              "platform": platform.platform(), "numpy": np.__version__, "pandas": pd.__version__, "cases": {}}
+    cases = [(name, setup) for name, setup in CASES if not a.k or re.search(a.k, name)]
+    per: Dict[str, List[Tuple[Dict[str, Any], float]]] = {name: [] for name, _ in cases}; refs = []
+    for _ in range(a.rounds):                             # rounds interleave cases so a slow spell hits one round, not one case
+        for name, setup in cases:
+            r = measure(setup, a.repeat, a.min_time)
+            ref = min(measure(_reference, a.repeat, a.min_time/5)["min_us"] for _ in range(2))     # timed right next to the case
+            per[name].append((r, ref)); refs.append(ref)
+    latest["reference_us"] = statistics.median(refs)
+    for name, _ in cases:
+        r = latest["cases"][name] = aggregate(per[name])
+        print(f"{name:40s} {r['median_us']:12.3f} us/op  (min {r['min_us']:.3f}, x{r['rel_min']:.1f} reference, {r['runs']} runs x {r['ops_per_run']} ops)")
+    os.makedirs(os.path.dirname(a.out) or ".", exist_ok=True)
+    with open(a.out, "w") as f: json.dump(latest, f, indent=2)
+    if a.save_baseline:
+        os.makedirs(os.path.dirname(a.baseline) or ".", exist_ok=True)
+        shutil.copyfile(a.out, a.baseline); print(f"baseline saved -> {a.baseline}"); return 0
+    if not os.path.exists(a.baseline):
+        print(f"no baseline at {a.baseline}; run with --save-baseline to create one"); return 0
+    with open(a.baseline) as f: baseline = json.load(f)
+    rows = compare(latest, baseline, a.threshold, a.metric)
+    print(pd.DataFrame(rows).to_string(index=False))
+    bad = [r for r in rows if r["status"] == "REGRESSION"]
+    if bad: print(f"{len(bad)} case(s) regressed more than {a.threshold:.0%}"); return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+# calibration.py — streaming auto-calibration of profiles from signal/trade logs and trade journals
+#
+# Files are read in chunks and folded into fixed-size running statistics per (archetype, session), so memory
+# stays constant however long the journal is. Recognised columns (any subset):
+#   model_used | model | Archetype      archetype          session                 session (else "ALL")
+#   direction | side                    LONG / SHORT       adx_now                 ADX at entry
+#   vwap_side, vwap_slope               VWAP behaviour     grade                   0-100
+#   entry_ready                         rows with a falsy value are ignored
+#   r | outcome | win                   trade result (r > 0, TP1/TP2/WIN, or truthy win)
+#   mss_ok, vwap_ok, adx_ok, bias_ok    gate bits, used to re-weight grade_weights when present
+from __future__ import annotations
+from typing import Optional, Dict, Any, Tuple, Iterable
+import copy, os
+import numpy as np
+import pandas as pd
+
+from signal_engine_v3_11 import SWEEP_PROFILES, vwap_expectation, apply_vwap_expectation
+
+ADX_LO, ADX_HI, ADX_BIN = 0.0, 100.0, 0.25
+N_ADX_BINS = int((ADX_HI - ADX_LO)/ADX_BIN)
+VWAP_CLASSES = ("support","resistance","flip")
+GATE_COLS = ("mss","vwap","adx","bias")
+_TRUE = {"true","1","yes","y","t"}
+
+def _bool(s:pd.Series)->np.ndarray:
+    if s.dtype == bool: return s.to_numpy()
+    if s.dtype == object: return s.astype(str).str.strip().str.lower().isin(_TRUE).to_numpy()
+    return (pd.to_numeric(s, errors="coerce").fillna(0) != 0).to_numpy()
+
+def _first(df:pd.DataFrame, *names)->Optional[pd.Series]:
+    for n in names:
+        if n in df: return df[n]
+    return None
+
+class GroupStats:
+    """Constant-size running stats: ADX histograms (all / with an outcome / winners), VWAP class counts, wins by grade, gate lifts."""
+    __slots__ = ("n","adx_all","adx_out","adx_win","vwap","grade_n","grade_o","grade_w","gate","outcomes","wins")
+    def __init__(self):
+        self.n = 0; self.outcomes = 0; self.wins = 0
+        self.adx_all = np.zeros(N_ADX_BINS, np.int64); self.adx_out = np.zeros(N_ADX_BINS, np.int64); self.adx_win = np.zeros(N_ADX_BINS, np.int64)
+        self.vwap = np.zeros(len(VWAP_CLASSES), np.int64)
+        self.grade_n = np.zeros(101, np.int64); self.grade_o = np.zeros(101, np.int64); self.grade_w = np.zeros(101, np.int64)
+        self.gate = np.zeros((len(GATE_COLS), 2, 2), np.int64)      # [gate, ok, win] counts
+    def merge(self, o:"GroupStats"):
+        for k in self.__slots__: setattr(self, k, getattr(self, k) + getattr(o, k))
+
+def adx_quantile(hist:np.ndarray, q:float)->float:
+    total = hist.sum()
+    if not total: return float("nan")
+    i = int(np.searchsorted(np.cumsum(hist), q*total, side="left"))
+    return ADX_LO + (i + 0.5)*ADX_BIN
+
+def adx_edge_floor(out_hist:np.ndarray, win_hist:np.ndarray)->float:
+    """
+    ADX floor that maximises wins - losses over the outcome-labelled rows at or above it (lowest such floor on ties).
+    Unlike a quantile of the logged entries this can stay put or fall back to the lowest observed ADX; it does not
+    ratchet upwards each time the log is re-read.
+    """
+    if not out_hist.sum(): return float("nan")
+    edge = np.cumsum((2*win_hist - out_hist)[::-1])[::-1]        # sum over bins >= i of (+1 win, -1 loss)
+    first = int(np.flatnonzero(out_hist)[0])
+    return ADX_LO + (first + int(np.argmax(edge[first:])))*ADX_BIN
+
+def vwap_classes(side:np.ndarray, slope:np.ndarray, direction:Optional[np.ndarray])->np.ndarray:
+    """0 support/reclaim, 1 rejection/resistance, 2 flip/cross, -1 unknown — relative to the trade direction."""
+    long = np.ones(len(side), bool) if direction is None else (direction == "LONG")
+    short = np.zeros(len(side), bool) if direction is None else (direction == "SHORT")
+    with_trend = (long & (side == "ABOVE")) | (short & (side == "BELOW"))
+    flip = (side == "TOUCHING") | (long & (side == "BELOW")) | (short & (side == "ABOVE"))
+    flip |= with_trend & ((long & (slope == "DOWN")) | (short & (slope == "UP")))      # on the right side but VWAP turning
+    cls = np.where(flip, 2, np.where(with_trend & long, 0, np.where(with_trend & short, 1, -1)))
+    return np.where(long | short, cls, -1)
+
+class Calibrator:
+    def __init__(self): self.stats: Dict[Tuple[str,str], GroupStats] = {}; self.rows = 0
+    # --- ingestion ---
+    def update(self, df:pd.DataFrame)->int:
+        model = _first(df, "model_used", "model", "Archetype")
+        if model is None or df.empty: return 0
+        keep = np.ones(len(df), bool)
+        if "entry_ready" in df: keep &= _bool(df["entry_ready"])
+        df = df[keep]; model = model[keep].astype(str).to_numpy()
+        n = len(df)
+        if not n: return 0
+        session = df["session"].astype(str).to_numpy() if "session" in df else np.full(n, "ALL", dtype=object)
+        direction = _first(df, "direction", "side")
+        direction = None if direction is None else direction.astype(str).str.upper().to_numpy()
+        adx = pd.to_numeric(df["adx_now"], errors="coerce").to_numpy(float) if "adx_now" in df else np.full(n, np.nan)
+        abin = np.clip(np.nan_to_num((adx - ADX_LO)/ADX_BIN).astype(np.int64), 0, N_ADX_BINS - 1)
+        has_adx = ~np.isnan(adx)
+        vcls = (vwap_classes(df["vwap_side"].astype(str).to_numpy(), df["vwap_slope"].astype(str).to_numpy(), direction)
+                if "vwap_side" in df and "vwap_slope" in df else np.full(n, -1))
+        grade = pd.to_numeric(df["grade"], errors="coerce").to_numpy(float) if "grade" in df else np.full(n, np.nan)
+        has_grade = ~np.isnan(grade); gi = np.clip(np.nan_to_num(grade), 0, 100).astype(np.int64)
+        win, has_out = self._outcome(df, n)
+        gates = [(g, _bool(df[f"{g}_ok"])) for g in GATE_COLS if f"{g}_ok" in df]
+        for (m, s), idx in pd.Series(np.arange(n)).groupby([model, session], sort=False).indices.items():
+            st = self.stats.get((m, s))
+            if st is None: st = self.stats[(m, s)] = GroupStats()
+            st.n += len(idx)
+            a = idx[has_adx[idx]]
+            st.adx_all += np.bincount(abin[a], minlength=N_ADX_BINS)
+            o = idx[has_out[idx]]; w = o[win[o]]
+            st.outcomes += len(o); st.wins += len(w)
+            st.adx_out += np.bincount(abin[o[has_adx[o]]], minlength=N_ADX_BINS)
+            st.adx_win += np.bincount(abin[w[has_adx[w]]], minlength=N_ADX_BINS)
+            v = vcls[idx]; st.vwap += np.bincount(v[v >= 0], minlength=len(VWAP_CLASSES))
+            g = idx[has_grade[idx]]; st.grade_n += np.bincount(gi[g], minlength=101)
+            go = g[has_out[g]]; st.grade_o += np.bincount(gi[go], minlength=101)
+            gw = go[win[go]]; st.grade_w += np.bincount(gi[gw], minlength=101)
+            for gname, ok in gates:
+                k = GATE_COLS.index(gname)
+                np.add.at(st.gate[k], (ok[o].astype(int), win[o].astype(int)), 1)
+        self.rows += n
+        return n
+    @staticmethod
+    def _outcome(df:pd.DataFrame, n:int)->Tuple[np.ndarray, np.ndarray]:
+        if "r" in df:
+            r = pd.to_numeric(df["r"], errors="coerce").to_numpy(float); return np.nan_to_num(r) > 0, ~np.isnan(r)
+        if "outcome" in df:
+            o = df["outcome"].astype(str).str.upper().to_numpy()
+            has = ~df["outcome"].isna().to_numpy() & (o != "") & (o != "EOD")
+            return np.isin(o, ["TP1","TP2","WIN","W"]), has
+        if "win" in df:
+            has = df["win"].notna().to_numpy(); return _bool(df["win"]) & has, has
+        return np.zeros(n, bool), np.zeros(n, bool)
+
+    def feed_csv(self, path:str, chunksize:int=200_000)->int:
+        return sum(self.update(c) for c in pd.read_csv(path, chunksize=chunksize, low_memory=False))
+    def feed_excel(self, path:str, sheet:Optional[str]=None, chunksize:int=50_000)->int:
+        """Streams rows with openpyxl's read-only mode, so a multi-year journal never sits in memory whole."""
+        from openpyxl import load_workbook
+        wb = load_workbook(path, read_only=True, data_only=True)
+        ws = wb[sheet] if sheet else wb.worksheets[0]
+        rows = ws.iter_rows(values_only=True); header = [str(h) if h is not None else "" for h in next(rows)]
+        total, buf = 0, []
+        for r in rows:
+            buf.append(r)
+            if len(buf) >= chunksize: total += self.update(pd.DataFrame(buf, columns=header)); buf = []
+        if buf: total += self.update(pd.DataFrame(buf, columns=header))
+        wb.close()
+        return total
+    def feed(self, paths:Iterable[str], chunksize:int=200_000, sheet:Optional[str]=None)->int:
+        n = 0
+        for p in paths:
+            n += self.feed_excel(p, sheet) if p.lower().endswith((".xlsx",".xlsm")) else self.feed_csv(p, chunksize)
+        return n
+
+    # --- results ---
+    def by_archetype(self)->Dict[str, GroupStats]:
+        out: Dict[str, GroupStats] = {}
+        for (m, _), st in self.stats.items():
+            if m not in out: out[m] = GroupStats()
+            out[m].merge(st)
+        return out
+    def report(self)->pd.DataFrame:
+        rows = []
+        for (m, s), st in sorted(self.stats.items()):
+            vt = st.vwap.sum()
+            rows.append({"archetype": m, "session": s, "entries": st.n,
+                         "win_rate": round(st.wins/st.outcomes, 3) if st.outcomes else None,
+                         "adx_p25": adx_quantile(st.adx_all, .25), "adx_p50": adx_quantile(st.adx_all, .5),
+                         "adx_p75": adx_quantile(st.adx_all, .75),
+                         **{f"vwap_{c}": round(st.vwap[i]/vt, 3) if vt else None for i, c in enumerate(VWAP_CLASSES)}})
+        return pd.DataFrame(rows)
+    def win_rate_by_grade(self, bucket:int=10)->pd.DataFrame:
+        """Win rate over rows with a known outcome; rows without one are reported as `unresolved`, not counted as losses."""
+        rows = []
+        for m, st in sorted(self.by_archetype().items()):
+            for lo in range(0, 101, bucket):
+                n = int(st.grade_n[lo:lo+bucket].sum()); o = int(st.grade_o[lo:lo+bucket].sum()); w = int(st.grade_w[lo:lo+bucket].sum())
+                if n: rows.append({"archetype": m, "grade_from": lo, "grade_to": min(100, lo + bucket - 1), "n": n,
+                                   "resolved": o, "unresolved": n - o, "win_rate": round(w/o, 3) if o else None})
+        return pd.DataFrame(rows)
+    def derive(self, profiles=None, adx_quantile_q:float=0.25, min_entries:int=30, adx_floor:float=18.0,
+               ungated:bool=False)->Dict[str, Dict[str, Any]]:
+        """
+        New profiles dict. adx_min comes from outcome-labelled rows (adx_edge_floor) when at least min_entries have
+        an outcome. Logged entries already passed the current floor, so a quantile of them could only ever raise it;
+        without outcomes adx_min is left alone unless `ungated` says the ADX sample was not filtered by the gate
+        (then its q-quantile is used). Which source each archetype used is kept in self.adx_source.
+        expected_vwap follows the dominant VWAP behaviour (same rule as the Model Summary import), and grade_weights
+        are re-split by each gate's win-rate lift when gate bits are present.
+        """
+        out = {k: copy.deepcopy(v.to_dict() if hasattr(v, "to_dict") else dict(v)) for k, v in (profiles or SWEEP_PROFILES).items()}
+        self.adx_source: Dict[str, str] = {}
+        for m, st in self.by_archetype().items():
+            if m not in out or st.n < min_entries: continue
+            prof = out[m]
+            if st.adx_out.sum() >= min_entries: q, src = adx_edge_floor(st.adx_out, st.adx_win), "outcomes"
+            elif ungated: q, src = adx_quantile(st.adx_all, adx_quantile_q), "ungated quantile"
+            else: q, src = float("nan"), "unchanged (no outcomes)"
+            if q == q: prof["adx_min"] = max(adx_floor, round(q))
+            self.adx_source[m] = src
+            if st.vwap.sum(): apply_vwap_expectation(prof, vwap_expectation(*st.vwap.astype(float)))
+            lifts = {}
+            for k, g in enumerate(GATE_COLS):
+                (f_n, f_w), (t_n, t_w) = (st.gate[k][0].sum(), st.gate[k][0][1]), (st.gate[k][1].sum(), st.gate[k][1][1])
+                if f_n >= 5 and t_n >= 5: lifts[g] = max(0.0, t_w/t_n - f_w/f_n)
+            if len(lifts) == len(GATE_COLS) and sum(lifts.values()) > 0:
+                gw = dict(prof["grade_weights"]); budget = 100 - gw["sweep"]; tot = sum(lifts.values())
+                for g in GATE_COLS: gw[g] = int(round(budget*lifts[g]/tot))
+                gw[max(lifts, key=lifts.get)] += 100 - sum(gw.values())          # rounding drift goes to the strongest gate
+                prof["grade_weights"] = gw
+        return out
+
+if __name__ == "__main__":
+    import argparse, time
+    from signal_engine_v3_11 import dump_profiles_to_json
+    ap = argparse.ArgumentParser(description="Calibrate profiles from signal/trade logs and journals (streamed)")
+    # the app writes every ready signal to both logs, so reading both by default would count each entry twice
+    ap.add_argument("paths", nargs="*", default=[p for p in ("logs/lsf_signal_log.csv",) if os.path.exists(p)])
+    ap.add_argument("--sheet", default=None, help="Excel sheet name (default: first)")
+    ap.add_argument("--chunksize", type=int, default=200_000)
+    ap.add_argument("--quantile", type=float, default=0.25, help="ADX quantile used for adx_min")
+    ap.add_argument("--min-entries", type=int, default=30)
+    ap.add_argument("--ungated", action="store_true", help="the ADX sample was not filtered by the current floor (e.g. all-bar dumps)")
+    ap.add_argument("--out", default=None, help="write calibrated profiles here (dump_profiles_to_json format)")
+    a = ap.parse_args()
+    cal = Calibrator(); t0 = time.perf_counter(); n = cal.feed(a.paths, a.chunksize, a.sheet)
+    print(f"{n:,} entry rows from {len(a.paths)} file(s) in {time.perf_counter()-t0:.2f}s")
+    if n:
+        print(cal.report().to_string(index=False))
+        if not sum(st.outcomes for st in cal.stats.values()):
+            print("NOTE: no outcome column (r / outcome / win) in these files, so win rates are unknown and adx_min is not "
+                  "recalibrated. The app's signal log has no outcomes; pass a trade journal or replay trades with results.")
+        else:
+            wr = cal.win_rate_by_grade()
+            if not wr.empty: print(wr.to_string(index=False))
+    if a.out:
+        dump_profiles_to_json(a.out, cal.derive(adx_quantile_q=a.quantile, min_entries=a.min_entries, ungated=a.ungated))
+        print(f"profiles -> {a.out}")
+        for m, src in sorted(cal.adx_source.items()): print(f"  {m}: adx_min from {src}")
@@ -0,0 +1,219 @@
+# decision_table.py — evaluate_signal precompiled into per-(model, direction) lookup tables
+#
+# Every Inputs field except the ADX numbers and bars_since_sweep is a small enum, so for a given profile
+# the whole rule set collapses to a table over the categorical combinations plus two numeric comparisons
+# (adx_ok, delay_ok). Tables are built with evaluate_signals_batch and rebuilt whenever the profile's
+# fingerprint changes (Tuning edits, JSON/Excel reloads, reset to defaults).
+from __future__ import annotations
+from typing import Optional, Dict, Any, Tuple, List
+import csv, itertools, threading, time
+from collections import OrderedDict
+import numpy as np
+
+import signal_engine_v3_11 as eng
+from signal_engine_v3_11 import (Inputs, ARCHETYPES, SWEEP_TYPES, SWEEP_PROFILES, evaluate_signal,
+                                 evaluate_signals_batch, auto_model_from_context)
+
+# (field, values) in index order; the last two axes are the numeric gates
+AXES: List[Tuple[str, Tuple[Any, ...]]] = [
+    ("vwap_side", ("ABOVE","BELOW","TOUCHING")),
+    ("vwap_slope", ("UP","DOWN","FLAT")),
+    ("htf_60m_bias", ("BULL","BEAR","NEUTRAL")),
+    ("ltf_15m_bias", ("BULL","BEAR","NEUTRAL")),
+    ("ltf_3m_bias", ("BULL","BEAR","NEUTRAL")),
+    ("mss_dir", ("LONG","SHORT",None)),
+    ("micro_fvg_present", (False, True)),
+    ("bias_logic_mode", ("auto","adaptive","strict")),
+]
+SHAPE = tuple(len(v) for _, v in AXES) + (2, 2)       # + adx_ok, delay_ok
+SIZE = int(np.prod(SHAPE))
+_STRIDES = [int(np.prod(SHAPE[i+1:])) for i in range(len(SHAPE))]
+_OFF = [{v: i*s for i, v in enumerate(vals)} for (_, vals), s in zip(AXES, _STRIDES)]   # value -> index offset
+_MICRO_ON = _OFF[6][True]
+
+GATES = ("delay_ok","mss_ok","vwap_ok","adx_ok","bias_ok","micro_ok")
+TAGS = ("CONTINUATION","REVERSAL","TRANSITIONAL_REVERSAL")
+BIAS_NOTES = ("strict","transitional","fail")
+VWAP_WHYS = ("support","resistance","flip/reclaim","any","not-required")
+# packed entry: bits 0-5 gates, 6 entry_ready, 7-14 grade, 15-16 tag, 17-18 bias_note, 19-21 vwap_why
+
+def profile_fingerprint(prof:Dict[str, Any])->Tuple:
+    gw = prof.get("grade_weights")
+    return (prof.get("adx_min"), prof.get("post_sweep_delay"), prof.get("require_vwap_flip"), prof.get("expected_vwap"),
+            prof.get("bias_mode"), tuple(gw.items()) if isinstance(gw, dict) else gw)
+
+class DecisionTable:
+    __slots__ = ("model","desired","prof","fingerprint","adx_min","delay","table","packed","decoded")
+    def __init__(self, model:str, desired:str, prof:Dict[str, Any]):
+        self.model, self.desired, self.prof = model, desired, prof
+        self.fingerprint = profile_fingerprint(prof)
+        self.adx_min = prof.get("adx_min", 24); self.delay = prof.get("post_sweep_delay")
+        self.packed = self._compile()
+        self.table = self.packed.tolist()                # list indexing is the fastest scalar lookup
+        dec = {c: unpack(c) for c in set(self.table)}
+        self.decoded = [dec[c] for c in self.table]      # shared read-only dicts, one per distinct outcome
+    def _compile(self)->np.ndarray:
+        digits = np.unravel_index(np.arange(SIZE), SHAPE)
+        cols = {name: np.array(vals, dtype=object)[digits[i]] for i, (name, vals) in enumerate(AXES)}
+        cols["micro_fvg_present"] = cols["micro_fvg_present"].astype(bool)
+        adx_bit, delay_bit = digits[-2].astype(bool), digits[-1].astype(bool)
+        n = SIZE
+        cols.update(price=np.zeros(n), adx_now=np.where(adx_bit, 1e9, -1e9), adx_sma3=np.zeros(n), adx_sma6=np.zeros(n),
+                    adx_min=np.zeros(n), adx_slope_min=np.zeros(n),
+                    bars_since_sweep=np.where(delay_bit, 10**9, -1), post_sweep_delay=np.zeros(n, dtype=int),
+                    session=np.full(n, "Asia", dtype=object), sweep_type=np.full(n, "Other", dtype=object),
+                    liquidity_model=np.full(n, self.model, dtype=object))
+        b = evaluate_signals_batch(cols, self.desired, {self.model: self.prof}, observe=False)   # a synthetic grid, not decisions
+        packed = np.zeros(n, dtype=np.int64)
+        for i, g in enumerate(GATES): packed |= b[g].astype(np.int64) << i
+        packed |= b["entry_ready"].astype(np.int64) << 6
+        packed |= b["grade"].astype(np.int64) << 7
+        enc = lambda arr, names: np.select([arr == v for v in names], list(range(len(names))))
+        packed |= enc(b["tag"], TAGS).astype(np.int64) << 15
+        packed |= enc(b["bias_note"], BIAS_NOTES).astype(np.int64) << 17
+        packed |= enc(b["vwap_why"], VWAP_WHYS).astype(np.int64) << 19
+        return packed
+    def index(self, inp:Inputs)->Optional[int]:
+        """Flat table index for inp, or None when a field is outside the enums (caller falls back to evaluate_signal)."""
+        try:
+            i = (_OFF[0][inp.vwap_side] + _OFF[1][inp.vwap_slope] + _OFF[2][inp.htf_60m_bias] + _OFF[3][inp.ltf_15m_bias]
+                 + _OFF[4][inp.ltf_3m_bias] + _OFF[5][inp.mss_dir] + (_MICRO_ON if inp.micro_fvg_present else 0)
+                 + _OFF[7][inp.bias_logic_mode])
+        except (KeyError, TypeError): return None
+        adx_ok = inp.adx_now >= max(inp.adx_min, self.adx_min) and (inp.adx_sma3 - inp.adx_sma6) >= inp.adx_slope_min
+        delay_ok = inp.bars_since_sweep >= (self.delay if self.delay is not None else inp.post_sweep_delay)
+        return i + (2 if adx_ok else 0) + (1 if delay_ok else 0)
+    def lookup(self, inp:Inputs)->Optional[int]:
+        i = self.index(inp)
+        return None if i is None else self.table[i]
+
+def unpack(code:int)->Dict[str, Any]:
+    out = {g: bool(code >> i & 1) for i, g in enumerate(GATES)}
+    out.update(entry_ready=bool(code >> 6 & 1), grade=code >> 7 & 0xFF, tag=TAGS[code >> 15 & 3],
+               bias_note=BIAS_NOTES[code >> 17 & 3], vwap_why=VWAP_WHYS[code >> 19 & 7])
+    return out
+
+class DecisionTables:
+    """Lazily compiled tables for one profiles dict; a table is rebuilt when its profile fingerprint changes."""
+    def __init__(self, profiles:Optional[Dict[str, Dict[str, Any]]]=None):
+        self.profiles = profiles; self._tables: Dict[Tuple[str,str], DecisionTable] = {}; self.compiles = 0
+    def table(self, model:str, desired:str)->DecisionTable:
+        profiles = self.profiles or SWEEP_PROFILES
+        prof = profiles[model] if model in profiles else SWEEP_PROFILES["Asia_London_NY_Continuation"]
+        t = self._tables.get((model, desired))
+        # frozen profile_registry.Profile objects cannot change in place, so only mutable dicts are fingerprinted
+        if t is None or t.prof is not prof or (isinstance(prof, dict) and t.fingerprint != profile_fingerprint(prof)):
+            t = self._tables[(model, desired)] = DecisionTable(model, desired, prof); self.compiles += 1
+        return t
+    def decide(self, desired, inp:Inputs)->Tuple[str, Dict[str, Any]]:
+        """(model_used, decoded gates/grade/tag) without building the full result dict — the scanner hot path."""
+        tel = eng.TELEMETRY; t0 = time.perf_counter() if tel is not None else 0.0
+        model = auto_model_from_context(inp.session, inp.sweep_type or "Other", desired) or inp.liquidity_model
+        t = self.table(model, desired)
+        i = t.index(inp)
+        if i is None:
+            r = evaluate_signal(desired, inp, self.profiles)
+            return model, {**r["components"], "entry_ready": r["entry_ready"], "grade": r["grade"], "tag": r["tag"]}
+        if tel is not None: tel.record(model, inp.session, desired, inp.liquidity_model, t.decoded[i], time.perf_counter() - t0)
+        return model, t.decoded[i]
+    def evaluate(self, desired, inp:Inputs)->Dict[str, Any]:
+        """Drop-in for evaluate_signal(desired, inp, self.profiles)."""
+        tel = eng.TELEMETRY; t0 = time.perf_counter() if tel is not None else 0.0
+        model = auto_model_from_context(inp.session, inp.sweep_type or "Other", desired) or inp.liquidity_model
+        t = self.table(model, desired)
+        i = t.index(inp)
+        if i is None: return evaluate_signal(desired, inp, self.profiles)
+        u = t.decoded[i]; p = t.prof
+        if tel is not None: tel.record(model, inp.session, desired, inp.liquidity_model, u, time.perf_counter() - t0)
+        return {"model_used": model, "entry_ready": u["entry_ready"], "grade": u["grade"], "tag": u["tag"],
+                "components": {"delay_ok":u["delay_ok"],"mss_ok":u["mss_ok"],"vwap_ok":u["vwap_ok"],"adx_ok":u["adx_ok"],
+                               "bias_ok":u["bias_ok"],"micro_ok":u["micro_ok"],"adx_slope":round(inp.adx_sma3 - inp.adx_sma6,2),
+                               "profile_adx_min":p.get("adx_min"),"expected_vwap":p.get("expected_vwap"),
+                               "bias_note":u["bias_note"],"vwap_why":u["vwap_why"]},
+                "profile": p}
+
+TABLES = DecisionTables()
+_CACHED: "OrderedDict[Any, DecisionTables]" = OrderedDict(); _CACHED_MAX = 8; _cached_lock = threading.Lock()
+def tables_for(profiles=None)->DecisionTables:
+    """
+    Shared DecisionTables per profiles object, so per-session ProfileSets compile once instead of on every call.
+    Keyed by ProfileSet.version, or by identity for plain dicts (the entry holds the dict, so its id stays unique).
+    """
+    if profiles is None or profiles is SWEEP_PROFILES: return TABLES
+    key = getattr(profiles, "version", None) or id(profiles)
+    with _cached_lock:
+        t = _CACHED.get(key)
+        if t is None or (key == id(profiles) and t.profiles is not profiles):
+            t = _CACHED[key] = DecisionTables(profiles)
+            while len(_CACHED) > _CACHED_MAX: _CACHED.popitem(last=False)
+        else: _CACHED.move_to_end(key)
+    return t
+
+def evaluate_signal_table(desired, inp:Inputs, profiles=None)->Dict[str, Any]:
+    """Same dict as evaluate_signal; only marginally faster. Hot loops should use tables_for(profiles).decide()."""
+    return tables_for(profiles).evaluate(desired, inp)
+
+def check_table_equivalence(profiles=None)->int:
+    """Exhaustive: every categorical combo x both numeric gates x every model/direction, plus every auto-model route."""
+    tabs = DecisionTables(profiles); n = 0
+    digits = list(itertools.product(*(range(k) for k in SHAPE[:-2])))
+    for model in ARCHETYPES:
+        for desired in ("LONG","SHORT"):
+            t = tabs.table(model, desired)
+            for combo in digits:
+                kw = {name: vals[c] for (name, vals), c in zip(AXES, combo)}
+                for adx_now, bars in ((t.adx_min - 1, 0), (t.adx_min, 0), (t.adx_min - 1, 99), (t.adx_min, 99)):
+                    inp = Inputs(price=0.0, adx_now=adx_now, adx_sma3=1.0, adx_sma6=1.0, adx_min=0.0, session="Asia",
+                                 liquidity_model=model, bars_since_sweep=bars, **kw)
+                    a, b = tabs.evaluate(desired, inp), evaluate_signal(desired, inp, profiles)
+                    a.pop("profile"); b.pop("profile")
+                    assert a == b, f"{model}/{desired} {kw} adx={adx_now} bars={bars}: table={a} scalar={b}"
+                    n += 1
+    for session, sweep, desired, model in itertools.product(("Asia","London","NY"), SWEEP_TYPES + [None], ("LONG","SHORT"), ARCHETYPES):
+        inp = Inputs(price=0.0, vwap_side="ABOVE", vwap_slope="UP", adx_now=30, adx_sma3=2, adx_sma6=1,
+                     session=session, sweep_type=sweep, liquidity_model=model, mss_dir=desired)
+        a, b = tabs.evaluate(desired, inp), evaluate_signal(desired, inp, profiles)
+        a.pop("profile"); b.pop("profile"); assert a == b, (session, sweep, desired, model); n += 1
+    return n
+
+PREVIEW_FIELDS = ["delay_ok","mss_ok","vwap_ok","adx_ok","bias_ok","micro_ok","model","direction","grade","entry_ready","tag"]
+def write_grade_preview(path:str="grade_preview_template.csv", profiles=None):
+    """Truth table of reachable gate combinations per model/direction, read straight off the compiled tables."""
+    tabs = DecisionTables(profiles); rows = {}
+    for model in ARCHETYPES:
+        for desired in ("LONG","SHORT"):
+            for code in np.unique(tabs.table(model, desired).packed):
+                u = unpack(int(code))
+                key = (model, desired, u["tag"]) + tuple(int(u[g]) for g in GATES)
+                rows[key] = {**{g: int(u[g]) for g in GATES}, "model": model, "direction": desired,
+                             "grade": u["grade"], "entry_ready": int(u["entry_ready"]), "tag": u["tag"]}
+    ordered = sorted(rows.values(), key=lambda r: (ARCHETYPES.index(r["model"]), r["direction"],
+                                                    tuple(-r[g] for g in GATES), r["tag"]))
+    with open(path, "w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=PREVIEW_FIELDS); w.writeheader(); w.writerows(ordered)
+    return len(ordered)
+
+if __name__ == "__main__":
+    from signal_engine_v3_11 import random_inputs
+    t0 = time.perf_counter(); n = check_table_equivalence(); print(f"exhaustive equivalence ok: {n:,} cases ({time.perf_counter()-t0:.1f}s)")
+    rows = random_inputs(50_000, 2)
+    t0 = time.perf_counter(); tabs = {m: TABLES.table(m, "LONG") for m in ARCHETYPES}
+    print(f"compile: {(time.perf_counter()-t0)/len(tabs)*1e3:.1f} ms/table ({SIZE:,} entries)")
+    t0 = time.perf_counter()
+    for r in rows: evaluate_signal("LONG", r)
+    t1 = time.perf_counter()
+    for r in rows: TABLES.evaluate("LONG", r)
+    t2 = time.perf_counter()
+    for r in rows: TABLES.decide("LONG", r)
+    t3 = time.perf_counter()
+    for r in rows: tabs[r.liquidity_model].lookup(r)
+    t4 = time.perf_counter()
+    us = lambda a, b: (b - a)/len(rows)*1e6
+    print(f"evaluate_signal: {us(t0,t1):.2f} us | table evaluate (same dict): {us(t1,t2):.2f} us | "
+          f"decide (fast path): {us(t2,t3):.2f} us | packed lookup: {us(t3,t4):.2f} us")
+    from profile_registry import ProfileSet
+    ps = ProfileSet.from_dict({})
+    for r in rows[:2000]: evaluate_signal_table("LONG", r, ps)            # compiles each model's table once
+    t0 = time.perf_counter()
+    for r in rows[:2000]: evaluate_signal_table("LONG", r, ps)
+    print(f"evaluate_signal_table with a ProfileSet after the first call: {us(t0, time.perf_counter())*len(rows)/2000:.2f} us")
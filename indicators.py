@@ -0,0 +1,182 @@
+# indicators.py — streaming 1m indicators -> Inputs (session VWAP, Wilder ADX + SMA3/SMA6)
+from __future__ import annotations
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, NamedTuple
+import datetime as dt, math
+
+from signal_engine_v3_11 import Inputs, Session
+from structure import StructureConfig, StructureDetector
+
+class Bar(NamedTuple):
+    ts: dt.datetime; open: float; high: float; low: float; close: float; volume: float
+
+# Exchange-local (ET) hour boundaries; futures session rolls at 18:00.
+SESSION_ROLL_HOUR = 18
+def session_of(ts:dt.datetime)->Session:
+    h = ts.hour
+    if h >= 18 or h < 2: return "Asia"
+    if h < 8: return "London"
+    return "NY"
+
+class RollingMean:
+    """Fixed-window mean with a running sum: O(1) per update, O(n) memory."""
+    __slots__ = ("n","buf","total")
+    def __init__(self, n:int): self.n, self.buf, self.total = n, deque(maxlen=n), 0.0
+    def update(self, x:float)->float:
+        if len(self.buf) == self.n: self.total -= self.buf[0]
+        self.buf.append(x); self.total += x
+        return self.total/len(self.buf)
+    @property
+    def value(self)->float: return self.total/len(self.buf) if self.buf else math.nan
+
+class SessionVWAP:
+    __slots__ = ("roll_hour","pv","vol","value","_next_roll","_hist","slope_bars")
+    def __init__(self, roll_hour:int=SESSION_ROLL_HOUR, slope_bars:int=5):
+        self.roll_hour, self.slope_bars = roll_hour, slope_bars
+        self.pv = self.vol = 0.0; self.value = math.nan; self._next_roll = None
+        self._hist = deque(maxlen=slope_bars+1)
+    def _roll_after(self, ts:dt.datetime)->dt.datetime:
+        r = ts.replace(hour=self.roll_hour, minute=0, second=0, microsecond=0)
+        return r if r > ts else r + dt.timedelta(days=1)
+    def update(self, bar:Bar)->float:
+        if self._next_roll is None or bar.ts >= self._next_roll:
+            self.pv = self.vol = 0.0; self._hist.clear(); self._next_roll = self._roll_after(bar.ts)
+        tp = (bar.high + bar.low + bar.close)/3.0
+        self.pv += tp*bar.volume; self.vol += bar.volume
+        self.value = self.pv/self.vol if self.vol > 0 else tp
+        self._hist.append(self.value)
+        return self.value
+    @property
+    def slope(self)->float: return self._hist[-1] - self._hist[0] if len(self._hist) > 1 else 0.0
+
+class WilderADX:
+    """Incremental Wilder ADX: O(1) per bar; NaN until 2*period bars have been seen."""
+    __slots__ = ("period","prev","count","tr","pdm","mdm","dx_sum","dx_n","value")
+    def __init__(self, period:int=14):
+        self.period = period; self.prev = None; self.count = 0
+        self.tr = self.pdm = self.mdm = self.dx_sum = 0.0; self.dx_n = 0; self.value = math.nan
+    def update(self, high:float, low:float, close:float)->float:
+        if self.prev is None: self.prev = (high, low, close); return self.value
+        ph, pl, pc = self.prev; self.prev = (high, low, close)
+        up, down = high - ph, pl - low
+        pdm = up if (up > down and up > 0) else 0.0
+        mdm = down if (down > up and down > 0) else 0.0
+        tr = max(high - low, abs(high - pc), abs(low - pc))
+        n = self.period; self.count += 1
+        if self.count <= n:
+            self.tr += tr; self.pdm += pdm; self.mdm += mdm
+            if self.count < n: return self.value
+        else:
+            self.tr += tr - self.tr/n; self.pdm += pdm - self.pdm/n; self.mdm += mdm - self.mdm/n
+        pdi = 100*self.pdm/self.tr if self.tr else 0.0; mdi = 100*self.mdm/self.tr if self.tr else 0.0
+        dx = 100*abs(pdi - mdi)/(pdi + mdi) if (pdi + mdi) else 0.0
+        if self.dx_n < n:
+            self.dx_sum += dx; self.dx_n += 1
+            if self.dx_n == n: self.value = self.dx_sum/n
+        else:
+            self.value = (self.value*(n - 1) + dx)/n
+        return self.value
+
+@dataclass
+class IndicatorConfig:
+    adx_period: int = 14
+    vwap_touch_ticks: float = 2.0     # |close - vwap| within this -> TOUCHING
+    tick: float = 0.25
+    vwap_slope_bars: int = 5
+    vwap_flat_ticks: float = 1.0      # |vwap change over slope_bars| below this -> FLAT
+    roll_hour: int = SESSION_ROLL_HOUR
+    structure: Optional[StructureConfig] = None   # set to fill sweep_type/bars_since_sweep/mss_dir/micro_fvg_present
+
+class IndicatorEngine:
+    """Per-instrument streaming state. Feed 1m bars with update(); read Inputs with to_inputs()."""
+    def __init__(self, cfg:Optional[IndicatorConfig]=None):
+        self.cfg = cfg = cfg or IndicatorConfig()
+        self.vwap = SessionVWAP(cfg.roll_hour, cfg.vwap_slope_bars)
+        self.adx = WilderADX(cfg.adx_period)
+        self.sma3, self.sma6 = RollingMean(3), RollingMean(6)
+        self.structure = StructureDetector(cfg.structure) if cfg.structure else None
+        self.last: Optional[Bar] = None
+    @property
+    def ready(self)->bool: return len(self.sma6.buf) == 6
+    def update(self, bar:Bar)->"IndicatorEngine":
+        self.last = bar
+        self.vwap.update(bar)
+        a = self.adx.update(bar.high, bar.low, bar.close)
+        if not math.isnan(a): self.sma3.update(a); self.sma6.update(a)
+        if self.structure: self.structure.update(bar)
+        return self
+    def vwap_side(self)->str:
+        d = self.last.close - self.vwap.value; tol = self.cfg.vwap_touch_ticks*self.cfg.tick
+        return "ABOVE" if d > tol else ("BELOW" if d < -tol else "TOUCHING")
+    def vwap_slope(self)->str:
+        s = self.vwap.slope; flat = self.cfg.vwap_flat_ticks*self.cfg.tick
+        return "UP" if s > flat else ("DOWN" if s < -flat else "FLAT")
+    def snapshot(self)->Dict[str, Any]:
+        return {"price": self.last.close, "vwap": self.vwap.value, "vwap_side": self.vwap_side(),
+                "vwap_slope": self.vwap_slope(), "adx_now": self.adx.value,
+                "adx_sma3": self.sma3.value, "adx_sma6": self.sma6.value, "session": session_of(self.last.ts)}
+    def to_inputs(self, **context)->Optional[Inputs]:
+        """
+        Inputs for evaluate_signal; `context` supplies the non-indicator fields (biases, sweep, MSS...) and wins over the detector.
+        The user ADX floor defaults to 0 so the profile's adx_min decides, as in the app (Inputs' own default is 28).
+        """
+        if not self.ready: return None
+        s = self.snapshot(); s.pop("vwap"); s["adx_min"] = 0.0
+        if self.structure: s.update(self.structure.context())
+        s.update(context)
+        return Inputs(**s)
+
+class MultiIndicatorEngine:
+    """One IndicatorEngine per symbol; update() returns Inputs once that symbol is warmed up."""
+    def __init__(self, cfg:Optional[IndicatorConfig]=None):
+        self.cfg = cfg; self.engines: Dict[str, IndicatorEngine] = {}
+        self.context: Dict[str, Dict[str, Any]] = {}
+    def set_context(self, symbol:str, **ctx): self.context.setdefault(symbol, {}).update(ctx)
+    def update(self, symbol:str, bar:Bar)->Optional[Inputs]:
+        eng = self.engines.get(symbol)
+        if eng is None: eng = self.engines[symbol] = IndicatorEngine(self.cfg)
+        return eng.update(bar).to_inputs(**self.context.get(symbol, {}))
+
+# --- synthetic bars + benchmark vs a naive pandas recompute-the-window loop ---
+def synthetic_bars(n:int, start:Optional[dt.datetime]=None, seed:int=0, price:float=25000.0):
+    import random
+    r = random.Random(seed); ts = start or dt.datetime(2025, 1, 6, 18, 0)
+    for _ in range(n):
+        o = round(price*4)/4; price = max(1.0, price + r.gauss(0, 4)); c = round(price*4)/4
+        h = max(o, c) + abs(r.gauss(0, 2)); l = min(o, c) - abs(r.gauss(0, 2))
+        yield Bar(ts, o, round(h*4)/4, round(l*4)/4, c, float(r.randint(50, 2000)))
+        ts += dt.timedelta(minutes=1)
+
+def naive_pandas_adx(df, period:int=14):
+    import pandas as pd, numpy as np
+    h, l, c = df["high"], df["low"], df["close"]; pc = c.shift()
+    tr = pd.concat([h - l, (h - pc).abs(), (l - pc).abs()], axis=1).max(axis=1)
+    up, down = h.diff(), -l.diff()
+    pdm = np.where((up > down) & (up > 0), up, 0.0); mdm = np.where((down > up) & (down > 0), down, 0.0)
+    a = 1.0/period
+    atr = tr.ewm(alpha=a, adjust=False).mean()
+    pdi = 100*pd.Series(pdm, index=df.index).ewm(alpha=a, adjust=False).mean()/atr
+    mdi = 100*pd.Series(mdm, index=df.index).ewm(alpha=a, adjust=False).mean()/atr
+    dx = 100*(pdi - mdi).abs()/(pdi + mdi)
+    adx = dx.ewm(alpha=a, adjust=False).mean()
+    tp = (h + l + c)/3
+    vwap = (tp*df["volume"]).cumsum()/df["volume"].cumsum()
+    return adx.iloc[-1], adx.rolling(3).mean().iloc[-1], adx.rolling(6).mean().iloc[-1], vwap.iloc[-1]
+
+def bench(n_bars:int=20_000, n_naive:int=500, window:int=390):
+    import time, pandas as pd
+    bars = list(synthetic_bars(n_bars))
+    eng = IndicatorEngine(); t0 = time.perf_counter()
+    for b in bars: eng.update(b); eng.to_inputs()
+    fast = n_bars/(time.perf_counter() - t0)
+    rows = []; t0 = time.perf_counter()
+    for b in bars[:n_naive]:
+        rows.append(b._asdict())
+        if len(rows) > window: rows.pop(0)
+        naive_pandas_adx(pd.DataFrame(rows))
+    slow = n_naive/(time.perf_counter() - t0)
+    print(f"streaming: {fast:,.0f} bars/s | naive pandas (window={window}): {slow:,.0f} bars/s | speedup x{fast/slow:,.0f}")
+
+if __name__ == "__main__":
+    bench()
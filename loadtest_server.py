@@ -0,0 +1,63 @@
+# loadtest_server.py — keep-alive load test for server.py: requests/sec and tail latency on localhost
+from __future__ import annotations
+from dataclasses import asdict
+import argparse, asyncio, json, time, multiprocessing as mp
+
+from signal_engine_v3_11 import random_inputs
+from scanner import LatencyHistogram
+
+def _bodies(n:int, seed:int=0):
+    out = []
+    for i, inp in enumerate(random_inputs(n, seed)):
+        out.append(json.dumps({"desired": "LONG" if i % 2 else "SHORT", "inputs": asdict(inp)}).encode())
+    return out
+
+async def _client(host, port, bodies, n, hist, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for i in range(n):
+            body = bodies[i % len(bodies)]
+            req = (f"POST /evaluate HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                   f"Content-Length: {len(body)}\r\n\r\n").encode() + body
+            t0 = time.perf_counter_ns(); writer.write(req)
+            status = await reader.readline(); length = 0
+            while True:
+                h = await reader.readline()
+                if h in (b"\r\n", b""): break
+                if h.lower().startswith(b"content-length:"): length = int(h.split(b":")[1])
+            await reader.readexactly(length)
+            hist.record(time.perf_counter_ns() - t0)
+            if b" 200 " not in status: errors.append(status)
+    finally:
+        writer.close()
+
+async def run(host:str, port:int, concurrency:int, requests:int):
+    bodies = _bodies(2000); hist = LatencyHistogram(); errors = []
+    per = requests // concurrency
+    t0 = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, bodies, per, hist, errors) for _ in range(concurrency)))
+    el = time.perf_counter() - t0
+    return {"requests": hist.n, "errors": len(errors), "rps": round(hist.n/el), "concurrency": concurrency,
+            **hist.summary_us()}
+
+def _serve(port, q):
+    from server import EngineServer
+    async def main():
+        ready = asyncio.get_running_loop().create_future()
+        srv = EngineServer(port=port, profiles_path="__no_profiles__.json")
+        t = asyncio.create_task(srv.serve(ready)); q.put(await ready); await t
+    asyncio.run(main())
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Load-test the LSF JSON server")
+    ap.add_argument("--url", default=None, help="host:port of a running server (default: spawn one locally)")
+    ap.add_argument("--concurrency", type=int, default=64)
+    ap.add_argument("--requests", type=int, default=20_000)
+    a = ap.parse_args()
+    proc = None
+    if a.url: host, port = a.url.rsplit(":", 1); port = int(port)
+    else:
+        q = mp.Queue(); proc = mp.Process(target=_serve, args=(0, q), daemon=True); proc.start(); host, port = q.get()
+    try: print(json.dumps(asyncio.run(run(host, port, a.concurrency, a.requests)), indent=2))
+    finally:
+        if proc: proc.terminate()
@@ -0,0 +1,131 @@
+# profile_registry.py — cached, versioned, immutable profile snapshots (copy-on-write edits per session)
+from __future__ import annotations
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Optional, Dict, Any, Iterator, Tuple
+import os, json, copy, hashlib, math, threading
+
+from signal_engine_v3_11 import _SWEEP_PROFILES_DEFAULT, dump_profiles_to_json
+
+BIAS_MODES = ("continuation","reversal")
+VWAP_EXPECTATIONS = ("support","resistance","flip","reclaim")
+WEIGHT_KEYS = ("sweep","mss","vwap","adx","bias")
+
+class ProfileError(ValueError): pass
+
+@dataclass(frozen=True)
+class Profile:
+    """One validated archetype profile. Reads like the old dict (get / [] / keys) so existing callers keep working."""
+    name: str
+    bias_mode: str
+    adx_min: float
+    post_sweep_delay: int
+    require_vwap_flip: bool
+    expected_vwap: str
+    grade_weights: Mapping
+    notes: str = ""
+    params: Tuple = field(init=False, repr=False, compare=False)
+    def __post_init__(self):
+        object.__setattr__(self, "grade_weights", MappingProxyType(dict(self.grade_weights)))
+        object.__setattr__(self, "params", (self.adx_min, self.post_sweep_delay, self.require_vwap_flip, self.expected_vwap,
+                                            self.bias_mode, self.bias_mode, self.grade_weights))
+    _KEYS = ("bias_mode","adx_min","post_sweep_delay","require_vwap_flip","expected_vwap","grade_weights","notes")
+    def get(self, key:str, default=None): return getattr(self, key) if key in self._KEYS else default
+    def __getitem__(self, key:str):
+        if key not in self._KEYS: raise KeyError(key)
+        return getattr(self, key)
+    def __contains__(self, key): return key in self._KEYS
+    def keys(self): return self._KEYS
+    def to_dict(self)->Dict[str, Any]:
+        d = {k: getattr(self, k) for k in self._KEYS}; d["grade_weights"] = dict(self.grade_weights); return d
+    def __reduce__(self):                      # MappingProxyType doesn't pickle; rebuild from plain values
+        return (Profile, (self.name, self.bias_mode, self.adx_min, self.post_sweep_delay, self.require_vwap_flip,
+                          self.expected_vwap, dict(self.grade_weights), self.notes))
+
+    @classmethod
+    def validate(cls, name:str, d:Dict[str, Any])->"Profile":
+        def num(k, lo=0.0):
+            try: v = float(d[k])
+            except (KeyError, TypeError, ValueError): raise ProfileError(f"{name}.{k} must be a number, got {d.get(k)!r}")
+            if not math.isfinite(v): raise ProfileError(f"{name}.{k} must be finite, got {d[k]!r}")
+            if v < lo: raise ProfileError(f"{name}.{k} must be >= {lo}, got {v}")
+            return v
+        if d.get("bias_mode") not in BIAS_MODES: raise ProfileError(f"{name}.bias_mode must be one of {BIAS_MODES}")
+        if d.get("expected_vwap") not in VWAP_EXPECTATIONS: raise ProfileError(f"{name}.expected_vwap must be one of {VWAP_EXPECTATIONS}")
+        gw = d.get("grade_weights")
+        if not isinstance(gw, Mapping) or any(k not in gw for k in WEIGHT_KEYS):
+            raise ProfileError(f"{name}.grade_weights needs keys {WEIGHT_KEYS}")
+        weights = {k: _weight(name, k, gw[k]) for k in WEIGHT_KEYS}
+        adx = num("adx_min"); delay = num("post_sweep_delay")
+        if delay != int(delay): raise ProfileError(f"{name}.post_sweep_delay must be a whole number of bars, got {d['post_sweep_delay']!r}")
+        return cls(name=name, bias_mode=d["bias_mode"], adx_min=int(adx) if adx == int(adx) else adx,
+                   post_sweep_delay=int(delay), require_vwap_flip=bool(d.get("require_vwap_flip", True)),
+                   expected_vwap=d["expected_vwap"], grade_weights=weights, notes=str(d.get("notes", "")))
+
+def _weight(name, k, v):
+    try: v = float(v)
+    except (TypeError, ValueError): raise ProfileError(f"{name}.grade_weights.{k} must be a number, got {v!r}")
+    if not math.isfinite(v): raise ProfileError(f"{name}.grade_weights.{k} must be finite, got {v!r}")
+    if v < 0: raise ProfileError(f"{name}.grade_weights.{k} must be >= 0")
+    return int(v) if v == int(v) else v
+
+class ProfileSet(Mapping):
+    """Immutable model -> Profile mapping with a content-derived version id; edit() returns a new set."""
+    __slots__ = ("_p","version","source")
+    def __init__(self, profiles:Dict[str, Profile], source:str="defaults"):
+        self._p = dict(profiles); self.source = source
+        blob = json.dumps({k: v.to_dict() for k, v in sorted(self._p.items())}, sort_keys=True).encode()
+        self.version = hashlib.sha1(blob).hexdigest()[:10]
+    def __getitem__(self, k)->Profile: return self._p[k]
+    def __iter__(self)->Iterator[str]: return iter(self._p)
+    def __len__(self): return len(self._p)
+    def __repr__(self): return f"ProfileSet(version={self.version!r}, source={self.source!r}, models={list(self._p)})"
+    def to_dict(self)->Dict[str, Dict[str, Any]]: return {k: v.to_dict() for k, v in self._p.items()}
+    def edit(self, model:str, **changes)->"ProfileSet":
+        if model not in self._p: raise KeyError(model)
+        cur = self._p[model].to_dict()
+        if "grade_weights" in changes: changes["grade_weights"] = {**cur["grade_weights"], **changes["grade_weights"]}
+        new = Profile.validate(model, {**cur, **changes})
+        if new == self._p[model]: return self
+        return ProfileSet({**self._p, model: new}, source="edited")
+    def reset(self, model:str)->"ProfileSet":
+        return ProfileSet({**self._p, model: Profile.validate(model, _SWEEP_PROFILES_DEFAULT[model])}, source="edited")
+    @classmethod
+    def from_dict(cls, data:Dict[str, Dict[str, Any]], source:str="dict", base=_SWEEP_PROFILES_DEFAULT)->"ProfileSet":
+        """Same merge rule as load_profiles_from_json: known models only, fields overlaid on the defaults."""
+        merged = copy.deepcopy(dict(base))
+        for k, v in (data or {}).items():
+            if k in merged and isinstance(v, dict): merged[k].update(v)
+        return cls({k: Profile.validate(k, v) for k, v in merged.items()}, source)
+
+class ProfileRegistry:
+    """Loads the tuning JSON only when its (mtime, size) changes; every caller shares the same immutable snapshot."""
+    def __init__(self, path:str=os.path.join("data","profiles_tuning.json")):
+        self.path = path; self._lock = threading.Lock()
+        self._stamp: Optional[Tuple[int,int]] = None; self._snap = ProfileSet.from_dict({}, "defaults")
+        self.loads = 0; self.last_error: Optional[str] = None
+    def _stat(self)->Optional[Tuple[int,int]]:
+        try: st = os.stat(self.path); return (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError: return None
+    def snapshot(self)->ProfileSet:
+        stamp = self._stat()
+        if stamp == self._stamp: return self._snap
+        with self._lock:
+            if stamp != self._stamp:
+                if stamp is None: self._snap = ProfileSet.from_dict({}, "defaults")
+                else:
+                    try:
+                        with open(self.path) as f: data = json.load(f)
+                        self._snap = ProfileSet.from_dict(data, self.path); self.last_error = None
+                    except (OSError, ValueError) as e:
+                        self.last_error = f"{type(e).__name__}: {e}"   # keep serving the last good snapshot
+                self._stamp = stamp; self.loads += 1
+        return self._snap
+    def save(self, profiles:ProfileSet|Dict[str, Any])->ProfileSet:
+        """Atomic write (temp file + rename) so readers never see a half-written JSON."""
+        ps = profiles if isinstance(profiles, ProfileSet) else ProfileSet.from_dict(profiles)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        dump_profiles_to_json(tmp, ps.to_dict()); os.replace(tmp, self.path)
+        with self._lock: self._snap = ProfileSet(dict(ps), self.path); self._stamp = self._stat()
+        return self._snap
@@ -0,0 +1,198 @@
+# replay.py — historical replay of the LSF rules over 1m bars (memory-mapped, day-sharded, multi-process)
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List, Callable, Iterator, Tuple
+import os, csv, copy, datetime as dt
+import numpy as np
+
+from signal_engine_v3_11 import ARCHETYPES, SWEEP_PROFILES, evaluate_signal, compute_targets, rr, auto_model_from_context
+from indicators import Bar, IndicatorConfig, IndicatorEngine, SESSION_ROLL_HOUR
+
+# ts = exchange-local wall clock as epoch seconds (naive, no tz conversion)
+BAR_DTYPE = np.dtype([("ts","i8"),("open","f8"),("high","f8"),("low","f8"),("close","f8"),("volume","f8")])
+_EPOCH = dt.datetime(1970, 1, 1)
+TRADE_FIELDS = ["day","entry_ts","exit_ts","model","model_used","direction","grade","tag","entry","sl","tp1","tp2",
+                "rr1","rr2","outcome","r"]
+
+# --- bar storage ---
+def csv_to_npy(csv_path:str, npy_path:str, chunksize:int=500_000, ts_format:Optional[str]=None)->int:
+    """Stream a ts,open,high,low,close,volume CSV into a .npy of BAR_DTYPE without loading it whole."""
+    import pandas as pd
+    with open(csv_path) as f: n = sum(1 for _ in f) - 1
+    out = np.lib.format.open_memmap(npy_path, mode="w+", dtype=BAR_DTYPE, shape=(n,))
+    i = 0
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize, float_precision="round_trip"):
+        ts = pd.to_datetime(chunk["ts"], format=ts_format)
+        m = len(chunk)
+        out["ts"][i:i+m] = (ts - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
+        for k in ("open","high","low","close","volume"): out[k][i:i+m] = chunk[k].to_numpy(dtype=float)
+        i += m
+    out.flush(); del out
+    return n
+
+def bars_to_npy(bars, npy_path:str, n:int)->str:
+    out = np.lib.format.open_memmap(npy_path, mode="w+", dtype=BAR_DTYPE, shape=(n,))
+    for i, b in enumerate(bars):
+        out[i] = ((b.ts - _EPOCH) // dt.timedelta(seconds=1), b.open, b.high, b.low, b.close, b.volume)
+    out.flush(); del out
+    return npy_path
+
+def open_bars(npy_path:str)->np.ndarray: return np.load(npy_path, mmap_mode="r")
+
+def trading_day(ts:np.ndarray, roll_hour:int=SESSION_ROLL_HOUR)->np.ndarray:
+    """Trading-day id (days since epoch); bars from roll_hour onwards belong to the next day."""
+    return (ts + (24 - roll_hour)*3600) // 86400
+
+def day_shards(bars:np.ndarray, roll_hour:int=SESSION_ROLL_HOUR, chunk:int=1_000_000)->List[Tuple[int,int,int]]:
+    """[(day_id, start, stop)] computed chunk by chunk so only `chunk` rows are touched at a time."""
+    shards, cur, start = [], None, 0
+    for lo in range(0, len(bars), chunk):
+        d = trading_day(np.asarray(bars["ts"][lo:lo+chunk]), roll_hour)
+        if cur is None: cur = int(d[0])
+        elif int(d[0]) != cur:                # boundary exactly on a chunk edge
+            shards.append((cur, start, lo)); cur, start = int(d[0]), lo
+        for j in np.flatnonzero(d[1:] != d[:-1]) + 1:
+            shards.append((cur, start, lo + int(j))); cur, start = int(d[j]), lo + int(j)
+    if cur is not None: shards.append((cur, start, len(bars)))
+    return shards
+
+# --- simulation ---
+@dataclass
+class ReplayConfig:
+    models: List[str] = field(default_factory=lambda: list(ARCHETYPES))
+    directions: Tuple[str, ...] = ("LONG","SHORT")
+    stop_points: float = 20.0
+    dev_per_sigma: float = 12.5
+    mult1: float = 2.5
+    mult2: float = 4.0
+    ensure_beyond: bool = True
+    warmup_bars: int = 120            # bars from the previous day used only to warm the indicators
+    indicators: IndicatorConfig = field(default_factory=IndicatorConfig)
+    context: Dict[str, Any] = field(default_factory=dict)     # static Inputs fields (biases, sweep, MSS ...)
+    context_fn: Optional[Callable[[IndicatorEngine], Dict[str, Any]]] = None   # must be picklable
+    profiles: Optional[Dict[str, Dict[str, Any]]] = None      # snapshot; defaults to SWEEP_PROFILES at run time
+
+class _Trade:
+    __slots__ = ("rec","side","entry","sl","tp1","tp2","rr1","rr2","risk","tp1_hit")
+    def __init__(self, rec, side, entry, sl, tp1, tp2):
+        self.rec, self.side, self.entry, self.sl, self.tp1, self.tp2 = rec, side, entry, sl, tp1, tp2
+        self.rr1, self.rr2 = rr(entry, sl, tp1, side) or 0.0, rr(entry, sl, tp2, side) or 0.0
+        self.risk = abs(entry - sl); self.tp1_hit = False
+    def step(self, hi:float, lo:float)->Optional[Tuple[str,float]]:
+        """Half off at TP1 with the stop moved to entry, rest at TP2; stop is assumed hit first inside a bar."""
+        long = self.side == "LONG"
+        adverse = (lo <= (self.entry if self.tp1_hit else self.sl)) if long else (hi >= (self.entry if self.tp1_hit else self.sl))
+        if adverse: return ("TP1", 0.5*self.rr1) if self.tp1_hit else ("SL", -1.0)
+        if not self.tp1_hit and ((hi >= self.tp1) if long else (lo <= self.tp1)): self.tp1_hit = True
+        if self.tp1_hit and ((hi >= self.tp2) if long else (lo <= self.tp2)): return "TP2", 0.5*self.rr1 + 0.5*self.rr2
+        return None
+    def mark(self, close:float)->float:
+        mtm = ((close - self.entry) if self.side == "LONG" else (self.entry - close))/self.risk if self.risk else 0.0
+        return 0.5*self.rr1 + 0.5*mtm if self.tp1_hit else mtm
+
+def _bar(row)->Bar: return Bar(_EPOCH + dt.timedelta(seconds=int(row["ts"])), float(row["open"]), float(row["high"]),
+                               float(row["low"]), float(row["close"]), float(row["volume"]))
+
+def replay_day(npy_path:str, day:int, start:int, stop:int, cfg:ReplayConfig)->List[Dict[str, Any]]:
+    """Replay one trading day; only bars[start-warmup:stop] are paged in from the memmap."""
+    bars = open_bars(npy_path)
+    w0 = max(0, start - cfg.warmup_bars)
+    rows = np.array(bars[w0:stop])
+    eng = IndicatorEngine(cfg.indicators); profiles = cfg.profiles or SWEEP_PROFILES
+    open_trades: Dict[Tuple[str,str], _Trade] = {}; done = []          # keyed (model_used, side)
+    for i, row in enumerate(rows):
+        b = _bar(row); eng.update(b)
+        if i < start - w0: continue
+        for key, t in list(open_trades.items()):
+            hit = t.step(b.high, b.low)
+            if hit: t.rec.update(exit_ts=b.ts.isoformat(), outcome=hit[0], r=round(hit[1], 3)); done.append(t.rec); del open_trades[key]
+        ctx = dict(cfg.context)
+        if cfg.context_fn: ctx.update(cfg.context_fn(eng))
+        seen = set()               # requested models that auto_model_from_context reroutes collapse to one trade, as in scanner.py
+        for model in cfg.models:
+            inp = eng.to_inputs(liquidity_model=model, **ctx)
+            if inp is None: break
+            for side in cfg.directions:
+                key = (auto_model_from_context(inp.session, inp.sweep_type or "Other", side) or model, side)
+                if key in seen or key in open_trades: continue
+                seen.add(key)
+                res = evaluate_signal(side, inp, profiles)
+                if not res["entry_ready"]: continue
+                entry = b.close; sl = entry - cfg.stop_points if side == "LONG" else entry + cfg.stop_points
+                tp1, tp2 = compute_targets(entry, cfg.dev_per_sigma, cfg.mult1, cfg.mult2, side, entry, cfg.ensure_beyond)
+                rec = {"day": str(_EPOCH.date() + dt.timedelta(days=day)), "entry_ts": b.ts.isoformat(), "model": model,
+                       "model_used": res["model_used"], "direction": side, "grade": res["grade"], "tag": res["tag"],
+                       "entry": entry, "sl": sl, "tp1": tp1, "tp2": tp2}
+                t = open_trades[key] = _Trade(rec, side, entry, sl, tp1, tp2)
+                rec.update(rr1=t.rr1, rr2=t.rr2)
+    if len(rows):
+        last = _bar(rows[-1])
+        for t in open_trades.values():
+            t.rec.update(exit_ts=last.ts.isoformat(), outcome="EOD", r=round(t.mark(last.close), 3)); done.append(t.rec)
+    return done
+
+def _replay_shard(args): return replay_day(*args)
+
+def iter_replay(npy_path:str, cfg:Optional[ReplayConfig]=None, workers:Optional[int]=None)->Iterator[List[Dict[str, Any]]]:
+    """Yield per-day trade lists in day order; days run on a process pool (workers=1 runs inline)."""
+    cfg = cfg or ReplayConfig()
+    if cfg.profiles is None: cfg = copy.copy(cfg); cfg.profiles = copy.deepcopy(SWEEP_PROFILES)
+    shards = day_shards(open_bars(npy_path), cfg.indicators.roll_hour)
+    jobs = [(npy_path, d, s, e, cfg) for d, s, e in shards]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        yield from map(_replay_shard, jobs); return
+    with ProcessPoolExecutor(workers) as ex:
+        yield from ex.map(_replay_shard, jobs, chunksize=max(1, len(jobs)//(workers*4)))
+
+def run_replay(npy_path:str, cfg:Optional[ReplayConfig]=None, workers:Optional[int]=None, out_csv:Optional[str]=None):
+    """
+    Merge per-day results. The summary is grouped by model_used, the archetype whose rules actually fired.
+    With out_csv the trades are appended to disk as days finish and only the summary stays in memory, so RSS
+    does not grow with the date range. Returns (trades_df|None, summary_df).
+    """
+    import pandas as pd
+    keep, agg = [], {}
+    f = w = None
+    if out_csv:
+        d = os.path.dirname(out_csv)
+        if d: os.makedirs(d, exist_ok=True)
+        f = open(out_csv, "w", newline=""); w = csv.DictWriter(f, fieldnames=TRADE_FIELDS); w.writeheader()
+    try:
+        for day in iter_replay(npy_path, cfg, workers):
+            for t in day:
+                a = agg.setdefault((t["model_used"], t["direction"]), [0, 0, 0, 0.0])
+                a[0] += 1; a[1] += t["outcome"] in ("TP1","TP2"); a[2] += t["outcome"] == "TP2"; a[3] += t["r"]
+            if w: w.writerows(day)
+            else: keep.extend(day)
+    finally:
+        if f: f.close()
+    summary = pd.DataFrame([{"model_used": m, "direction": d, "trades": n, "win_rate": round(wins/n, 3),
+                             "tp2_rate": round(tp2/n, 3), "avg_r": round(r/n, 3), "total_r": round(r, 2)}
+                            for (m, d), (n, wins, tp2, r) in sorted(agg.items())])
+    return (None if out_csv else pd.DataFrame(keep, columns=TRADE_FIELDS)), summary
+
+if __name__ == "__main__":
+    import argparse, time, tempfile
+    from indicators import synthetic_bars
+    ap = argparse.ArgumentParser(description="Replay LSF rules over 1m bars")
+    ap.add_argument("bars", nargs="?", help=".npy (BAR_DTYPE) or .csv with ts,open,high,low,close,volume; omit for synthetic")
+    ap.add_argument("--days", type=int, default=20, help="synthetic days when no file is given")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--out", default=None, help="stream trades to this CSV instead of keeping them in memory")
+    ap.add_argument("--structure", action="store_true", help="detect sweeps/MSS/FVGs from the bars instead of a fixed context")
+    a = ap.parse_args()
+    path = a.bars
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), "synthetic.npy"); n = a.days*1380
+        bars_to_npy(synthetic_bars(n), path, n)
+    elif path.endswith(".csv"):
+        npy = os.path.splitext(path)[0] + ".npy"; csv_to_npy(path, npy); path = npy
+    if a.structure:       # a full day of warm-up so PDH/PDL and the settlement range exist from the first bar
+        from structure import StructureConfig
+        cfg = ReplayConfig(indicators=IndicatorConfig(structure=StructureConfig()), warmup_bars=1440,
+                           context={"ltf_15m_bias": "BULL", "ltf_3m_bias": "BULL"})
+    else: cfg = ReplayConfig(context={"mss_dir": "LONG", "ltf_15m_bias": "BULL", "ltf_3m_bias": "BULL", "bars_since_sweep": 5})
+    t0 = time.perf_counter(); trades, summary = run_replay(path, cfg, a.workers, a.out)
+    print(summary.to_string(index=False)); print(f"replayed in {time.perf_counter()-t0:.2f}s")
@@ -0,0 +1,38 @@
+# rerun_timer.py — per-section wall-clock timing of a Streamlit rerun (no streamlit import; state lives in session_state)
+from __future__ import annotations
+from collections import deque
+from typing import Dict, List, MutableMapping
+import time
+
+class RerunTimer:
+    """
+    lap(name) attributes the time since the previous lap to `name`; finish() appends the rerun to a
+    bounded history kept in the given state mapping (st.session_state), so timings survive reruns.
+    """
+    KEY = "_rerun_timings"
+    def __init__(self, state:MutableMapping, history:int=100):
+        self.state = state; self.laps: Dict[str, float] = {}
+        if self.KEY not in state or state[self.KEY].maxlen != history: state[self.KEY] = deque(maxlen=history)
+        self.t0 = self._t = time.perf_counter()
+    def lap(self, name:str)->float:
+        now = time.perf_counter(); ms = (now - self._t)*1e3; self._t = now
+        self.laps[name] = self.laps.get(name, 0.0) + ms
+        return ms
+    def finish(self)->Dict[str, float]:
+        self.laps["total"] = (time.perf_counter() - self.t0)*1e3
+        self.state[self.KEY].append(dict(self.laps))
+        return self.laps
+    @classmethod
+    def history(cls, state:MutableMapping)->List[Dict[str, float]]: return list(state.get(cls.KEY, ()))
+    @classmethod
+    def summary(cls, state:MutableMapping)->List[Dict[str, float]]:
+        """Per section: last, p50 and max (ms) over the kept reruns, slowest p50 first."""
+        hist = cls.history(state)
+        if not hist: return []
+        names = list(dict.fromkeys(k for h in hist for k in h))
+        out = []
+        for n in names:
+            v = sorted(h[n] for h in hist if n in h)
+            out.append({"section": n, "last_ms": round(hist[-1].get(n, 0.0), 2), "p50_ms": round(v[len(v)//2], 2),
+                        "max_ms": round(v[-1], 2), "reruns": len(v)})
+        return sorted(out, key=lambda r: (r["section"] != "total", -r["p50_ms"]))
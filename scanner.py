@@ -0,0 +1,230 @@
+# scanner.py — asyncio multi-instrument scanner: bars in from a pluggable feed, every archetype x direction out
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator, Callable, Iterable
+import asyncio, json, logging, math, os, time, datetime as dt
+
+from signal_engine_v3_11 import ARCHETYPES
+from indicators import Bar, IndicatorConfig, MultiIndicatorEngine
+from structure import StructureConfig
+from decision_table import DecisionTables
+
+log = logging.getLogger(__name__)
+
+FeedItem = Tuple[str, Bar, int]            # (symbol, bar, t0_ns) — t0 is the producer stamp or our receipt time
+
+# --- wire format: CSV "symbol,ts,open,high,low,close,volume[,sent_ns]" or the same keys as a JSON object ---
+def parse_bar_line(line:str)->Tuple[str, Bar, Optional[int]]:
+    line = line.strip()
+    if line.startswith("{"):
+        d = json.loads(line)
+        return d["symbol"], Bar(dt.datetime.fromisoformat(d["ts"]), float(d["open"]), float(d["high"]), float(d["low"]),
+                                float(d["close"]), float(d["volume"])), d.get("sent_ns")
+    p = line.split(",")
+    return p[0], Bar(dt.datetime.fromisoformat(p[1]), float(p[2]), float(p[3]), float(p[4]), float(p[5]), float(p[6])), \
+           (int(p[7]) if len(p) > 7 and p[7] else None)
+
+def format_bar_line(symbol:str, b:Bar, sent_ns:Optional[int]=None)->str:
+    s = f"{symbol},{b.ts.isoformat()},{b.open},{b.high},{b.low},{b.close},{b.volume}"
+    return s + (f",{sent_ns}\n" if sent_ns is not None else "\n")
+
+async def _stamped_lines(reader:asyncio.StreamReader)->AsyncIterator[FeedItem]:
+    while True:
+        line = await reader.readline()
+        if not line: return
+        now = time.time_ns()
+        if not line.strip() or line.startswith(b"#"): continue
+        sym, bar, sent = parse_bar_line(line.decode())
+        yield sym, bar, sent or now
+
+class SocketFeed:
+    """Connects to a local TCP (host/port) or Unix-socket (path) bar publisher and yields bars as they arrive."""
+    def __init__(self, host:str="127.0.0.1", port:int=9009, path:Optional[str]=None):
+        self.host, self.port, self.path = host, port, path
+    async def __aiter__(self)->AsyncIterator[FeedItem]:
+        if self.path: reader, writer = await asyncio.open_unix_connection(self.path, limit=1 << 20)
+        else: reader, writer = await asyncio.open_connection(self.host, self.port, limit=1 << 20)
+        try:
+            async for item in _stamped_lines(reader): yield item
+        finally:
+            writer.close()
+
+class FileTailFeed:
+    """Tails a bar file (like `tail -f`); from_start=True replays what is already there first."""
+    def __init__(self, path:str, from_start:bool=False, poll:float=0.05, stop_at_eof:bool=False):
+        self.path, self.from_start, self.poll, self.stop_at_eof = path, from_start, poll, stop_at_eof
+    async def __aiter__(self)->AsyncIterator[FeedItem]:
+        with open(self.path) as f:
+            if not self.from_start: f.seek(0, os.SEEK_END)
+            buf = ""
+            while True:
+                chunk = f.readline()
+                if not chunk:
+                    if self.stop_at_eof: return
+                    await asyncio.sleep(self.poll); continue
+                buf += chunk
+                if not buf.endswith("\n"): continue          # partial line still being written
+                line, buf = buf, ""
+                if not line.strip() or line.startswith("#"): continue
+                now = time.time_ns(); sym, bar, sent = parse_bar_line(line)
+                yield sym, bar, sent or now
+
+# --- latency ---
+class LatencyHistogram:
+    """Log-bucketed histogram (~4% resolution, 1 us .. ~100 s); O(1) record, quantiles from bucket counts."""
+    __slots__ = ("counts","n","total","max")
+    BASE, PER_DECADE, DECADES = 1_000, 60, 8          # ns
+    def __init__(self):
+        self.counts = [0]*(self.PER_DECADE*self.DECADES + 1); self.n = 0; self.total = 0; self.max = 0
+    def record(self, ns:int):
+        b = 0 if ns <= self.BASE else min(len(self.counts) - 1, int(math.log10(ns/self.BASE)*self.PER_DECADE) + 1)
+        self.counts[b] += 1; self.n += 1; self.total += ns; self.max = max(self.max, ns)
+    def quantile(self, q:float)->float:
+        if not self.n: return math.nan
+        target, seen = q*self.n, 0
+        for b, c in enumerate(self.counts):
+            seen += c
+            if seen >= target: return min(float(self.max), self.BASE*10**(b/self.PER_DECADE))
+        return float(self.max)
+    def summary_us(self)->Dict[str, float]:
+        return {"n": self.n, "p50_us": round(self.quantile(0.5)/1e3, 1), "p99_us": round(self.quantile(0.99)/1e3, 1),
+                "max_us": round(self.max/1e3, 1), "mean_us": round(self.total/self.n/1e3, 1) if self.n else math.nan}
+
+# --- scanner ---
+@dataclass
+class Alert:
+    symbol: str; ts: dt.datetime; model: str; model_used: str; direction: str; grade: int; tag: str
+    price: float; latency_us: float
+
+@dataclass
+class ScannerConfig:
+    models: List[str] = field(default_factory=lambda: list(ARCHETYPES))
+    directions: Tuple[str, ...] = ("LONG","SHORT")
+    indicators: IndicatorConfig = field(default_factory=IndicatorConfig)
+    rearm_bars: int = 0          # extra bars an alert stays suppressed after its setup stops being ready
+    alert_queue: int = 1000      # Scanner.alerts keeps the newest this many; older ones are dropped (counted in stats)
+
+class Scanner:
+    """
+    Evaluates every model x direction for each closed bar. An alert fires when a (symbol, model_used, direction)
+    setup becomes entry-ready; repeats are suppressed until it drops out of ready (plus rearm_bars).
+    """
+    def __init__(self, cfg:Optional[ScannerConfig]=None, profiles=None, on_alert:Optional[Callable[[Alert], Any]]=None):
+        self.cfg = cfg or ScannerConfig()
+        self.engines = MultiIndicatorEngine(self.cfg.indicators)
+        self.tables = DecisionTables(profiles)
+        for m in ARCHETYPES:                                  # compile up front so the first ready bar doesn't stall
+            for side in self.cfg.directions: self.tables.table(m, side)
+        self.on_alert = on_alert
+        self.alerts: asyncio.Queue = asyncio.Queue(maxsize=self.cfg.alert_queue)
+        self.latency, self.alert_latency = LatencyHistogram(), LatencyHistogram()
+        self._armed: Dict[Tuple[str,str,str], int] = {}    # key -> bar count when it was last ready
+        self._bars: Dict[str, int] = {}
+        self.bars = self.evaluations = self.alerts_sent = self.suppressed = self.alerts_dropped = self.on_alert_errors = 0
+    def set_context(self, symbol:str, **ctx): self.engines.set_context(symbol, **ctx)
+    def on_bar(self, symbol:str, bar:Bar, t0_ns:int)->List[Alert]:
+        self.bars += 1; k = self._bars[symbol] = self._bars.get(symbol, 0) + 1
+        base = self.engines.update(symbol, bar)
+        out = []
+        if base is not None:
+            seen = set()
+            for model in self.cfg.models:
+                base.liquidity_model = model
+                for side in self.cfg.directions:
+                    used, res = self.tables.decide(side, base); self.evaluations += 1
+                    key = (symbol, used, side)
+                    if key in seen: continue
+                    seen.add(key)
+                    if not res["entry_ready"]: continue
+                    last = self._armed.get(key); self._armed[key] = k
+                    if last is not None and k - last <= 1 + self.cfg.rearm_bars:
+                        self.suppressed += 1; continue
+                    lat = time.time_ns() - t0_ns
+                    a = Alert(symbol, bar.ts, model, used, side, res["grade"], res["tag"], bar.close, lat/1e3)
+                    self.alert_latency.record(lat); out.append(a); self.alerts_sent += 1
+                    if self.alerts.full(): self.alerts.get_nowait(); self.alerts_dropped += 1
+                    self.alerts.put_nowait(a)
+                    if self.on_alert:
+                        try: self.on_alert(a)
+                        except Exception:                     # a bad handler must not stop the scan for every symbol
+                            self.on_alert_errors += 1; log.exception("on_alert failed for %s %s %s", symbol, used, side)
+        self.latency.record(time.time_ns() - t0_ns)
+        return out
+    async def run(self, feed:AsyncIterator[FeedItem]|Any):
+        async for symbol, bar, t0 in feed: self.on_bar(symbol, bar, t0)
+    def stats(self)->Dict[str, Any]:
+        return {"bars": self.bars, "symbols": len(self._bars), "evaluations": self.evaluations, "alerts": self.alerts_sent,
+                "suppressed": self.suppressed, "alerts_dropped": self.alerts_dropped,
+                "on_alert_errors": self.on_alert_errors, "bar_to_decision": self.latency.summary_us(),
+                "bar_to_alert": self.alert_latency.summary_us()}
+
+# --- local stand-in publisher + load test ---
+async def serve_bars(lines:Iterable[Tuple[str, Bar]], host:str="127.0.0.1", port:int=0, path:Optional[str]=None,
+                     rate:Optional[float]=None, ready:Optional[asyncio.Future]=None):
+    """Publish (symbol, bar) pairs to the first client that connects, stamping sent_ns; rate = lines/sec (None = max)."""
+    done = asyncio.get_running_loop().create_future()
+    async def handle(reader, writer):
+        t0 = time.perf_counter(); i = 0
+        for sym, b in lines:
+            writer.write(format_bar_line(sym, b, time.time_ns()).encode()); i += 1
+            if rate and i % 100 == 0:
+                lag = i/rate - (time.perf_counter() - t0)
+                if lag > 0: await asyncio.sleep(lag)
+            if i % 256 == 0: await writer.drain()
+        await writer.drain(); writer.close(); done.set_result(i)
+    server = await (asyncio.start_unix_server(handle, path) if path else asyncio.start_server(handle, host, port))
+    if ready: ready.set_result(server.sockets[0].getsockname())
+    async with server: return await done
+
+def interleaved_bars(n_symbols:int, n_bars:int, seed:int=0):
+    """Bar-close order across symbols: every symbol's minute t before any symbol's minute t+1."""
+    from indicators import synthetic_bars
+    gens = [synthetic_bars(n_bars, seed=seed + i, price=1000.0 + 500*i) for i in range(n_symbols)]
+    for bars in zip(*gens):
+        for i, b in enumerate(bars): yield f"SYM{i:02d}", b
+
+def _publish_process(n_symbols, n_bars, rate, addr_q):
+    async def main():
+        ready = asyncio.get_running_loop().create_future()
+        pub = asyncio.create_task(serve_bars(interleaved_bars(n_symbols, n_bars), rate=rate, ready=ready))
+        addr_q.put((await ready)[:2]); await pub
+    asyncio.run(main())
+
+async def load_test(n_symbols:int=60, n_bars:int=1000, rate:Optional[float]=3000.0, structure:bool=False):
+    """
+    Publisher runs in a child process so the numbers are the scanner's own single core. The default rate keeps the
+    socket from backing up, so the latencies are bar close -> signal; rate=None floods it and mostly measures queueing.
+    """
+    import multiprocessing as mp
+    q = mp.Queue(); proc = mp.Process(target=_publish_process, args=(n_symbols, n_bars, rate, q), daemon=True); proc.start()
+    host, port = await asyncio.get_running_loop().run_in_executor(None, q.get)
+    sc = Scanner(ScannerConfig(indicators=IndicatorConfig(structure=StructureConfig())) if structure else None)
+    for i in range(n_symbols):
+        sc.set_context(f"SYM{i:02d}", ltf_15m_bias="BULL", ltf_3m_bias="BULL", htf_60m_bias="BEAR", **({} if structure else {"mss_dir": "LONG"}))
+    t0 = time.perf_counter(); await sc.run(SocketFeed(host, port)); el = time.perf_counter() - t0
+    proc.join()
+    return sc.stats(), el
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="LSF multi-instrument scanner")
+    ap.add_argument("--tcp", default=None, help="host:port of a bar publisher")
+    ap.add_argument("--uds", default=None, help="unix socket path of a bar publisher")
+    ap.add_argument("--tail", default=None, help="bar file to tail")
+    ap.add_argument("--bench", action="store_true", help="local load test (60 symbols over TCP)")
+    ap.add_argument("--symbols", type=int, default=60); ap.add_argument("--bars", type=int, default=1000)
+    ap.add_argument("--rate", type=float, default=3000.0, help="bench publish rate, bars/sec (0 = as fast as possible; latency then includes socket queueing)")
+    ap.add_argument("--structure", action="store_true", help="detect sweep_type/bars_since_sweep/mss_dir/micro_fvg_present per symbol")
+    a = ap.parse_args()
+    if a.bench:
+        stats, el = asyncio.run(load_test(a.symbols, a.bars, a.rate or None, a.structure))
+        print(json.dumps(stats, indent=2)); print(f"{stats['bars']/el:,.0f} bars/s on one core ({el:.2f}s)" + (f", publisher capped at {a.rate:,.0f}/s" if a.rate else ""))
+    else:
+        if a.tcp: h, p = a.tcp.rsplit(":", 1); feed = SocketFeed(h, int(p))
+        elif a.uds: feed = SocketFeed(path=a.uds)
+        elif a.tail: feed = FileTailFeed(a.tail)
+        else: ap.error("one of --tcp, --uds, --tail or --bench is required")
+        sc = Scanner(ScannerConfig(indicators=IndicatorConfig(structure=StructureConfig())) if a.structure else None, on_alert=lambda al: print(json.dumps({**al.__dict__, "ts": al.ts.isoformat()}), flush=True))
+        try: asyncio.run(sc.run(feed))
+        except KeyboardInterrupt: pass
+        print(json.dumps(sc.stats()))
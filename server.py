@@ -0,0 +1,236 @@
+# server.py — headless HTTP/JSON API for the engine (stdlib asyncio, HTTP/1.1 keep-alive, micro-batched evaluation)
+#
+#   POST /evaluate          {"desired": "LONG", "inputs": {...Inputs fields...}}
+#   POST /evaluate/batch    {"desired": "LONG" | [...], "rows": [{...}, ...]}
+#   POST /targets           {"anchor", "dev", "m1", "m2", "side", "entry", "ensure", "sl"?}
+#   GET  /profiles          GET /profiles/<model>    PUT /profiles/<model> {partial profile, validated}
+#   POST /profiles/save     (to --profiles only)      POST /profiles/reset/<model>
+#   GET  /health            GET /stats
+from __future__ import annotations
+from http import HTTPStatus
+from typing import Optional, Dict, Any, List, Literal, Union, get_type_hints, get_origin, get_args
+import asyncio, json, math, os, time
+
+import numpy as np
+from signal_engine_v3_11 import Inputs, evaluate_signals_batch, inputs_to_columns, compute_targets, rr
+from profile_registry import ProfileRegistry, ProfileSet, ProfileError, Profile
+
+DEFAULT_PROFILES_PATH = os.path.join("data", "profiles_tuning.json")
+
+class HTTPError(Exception):
+    def __init__(self, status:int, msg:str): super().__init__(msg); self.status = status
+
+def _py(v):
+    if isinstance(v, np.generic): return v.item()
+    return v
+
+def _batch_results(b:Dict[str, np.ndarray], n:int)->List[Dict[str, Any]]:
+    comp_keys = ("delay_ok","mss_ok","vwap_ok","adx_ok","bias_ok","micro_ok","adx_slope","profile_adx_min",
+                 "expected_vwap","bias_note","vwap_why")
+    cols = {k: b[k].tolist() for k in ("model_used","entry_ready","grade","tag") + comp_keys}
+    return [{"model_used": cols["model_used"][i], "entry_ready": cols["entry_ready"][i], "grade": cols["grade"][i],
+             "tag": cols["tag"][i], "components": {k: _py(cols[k][i]) for k in comp_keys}} for i in range(n)]
+
+def _coercer(name:str, tp):
+    """Field validator built from the Inputs annotation: finite numbers, whole ints, real bools, Literal members."""
+    optional = get_origin(tp) is Union and type(None) in get_args(tp)
+    if optional: tp = next(a for a in get_args(tp) if a is not type(None))
+    def check(v):
+        if v is None:
+            if optional: return None
+            raise ValueError("must not be null")
+        if get_origin(tp) is Literal:
+            if v not in get_args(tp): raise ValueError(f"must be one of {list(get_args(tp))}, got {v!r}")
+            return v
+        if tp is bool:
+            if not isinstance(v, bool): raise ValueError(f"must be true/false, got {v!r}")
+            return v
+        if tp in (float, int):
+            if isinstance(v, bool): raise ValueError(f"must be a number, got {v!r}")
+            try: x = float(v)
+            except (TypeError, ValueError): raise ValueError(f"must be a number, got {v!r}")
+            if not math.isfinite(x): raise ValueError(f"must be finite, got {v!r}")
+            if tp is int:
+                if x != int(x): raise ValueError(f"must be a whole number, got {v!r}")
+                return int(x)
+            return x
+        if not isinstance(v, str): raise ValueError(f"must be a string, got {v!r}")
+        return v
+    return check
+
+_INPUT_CHECKS = {k: _coercer(k, tp) for k, tp in get_type_hints(Inputs).items()}
+
+def _inputs(d:Any)->Inputs:
+    """Validated Inputs; any bad field is the caller's 400, never a failure inside a shared micro-batch."""
+    if not isinstance(d, dict): raise HTTPError(400, "inputs must be an object")
+    unknown = [k for k in d if k not in _INPUT_CHECKS]
+    if unknown: raise HTTPError(400, f"bad inputs: unknown field(s) {unknown}")
+    clean = {}
+    for k, v in d.items():
+        try: clean[k] = _INPUT_CHECKS[k](v)
+        except ValueError as e: raise HTTPError(400, f"bad inputs: {k} {e}")
+    try: return Inputs(**clean)
+    except TypeError as e: raise HTTPError(400, f"bad inputs: {e}")
+
+class MicroBatcher:
+    """
+    Coalesces concurrent /evaluate calls: the first request wakes the worker, which yields to the event loop
+    (plus max_wait seconds, if set) so the other in-flight connections can enqueue, then scores everything
+    queued with one evaluate_signals_batch call.
+    """
+    def __init__(self, profiles=None, max_batch:int=512, max_wait:float=0.0):
+        self.profiles, self.max_batch, self.max_wait = profiles, max_batch, max_wait
+        self.q: asyncio.Queue = asyncio.Queue(); self._task: Optional[asyncio.Task] = None
+        self.batches = self.items = 0
+    def start(self): self._task = asyncio.get_running_loop().create_task(self._run())
+    async def submit(self, desired:str, inp:Inputs)->Dict[str, Any]:
+        fut = asyncio.get_running_loop().create_future(); self.q.put_nowait((desired, inp, fut))
+        return await fut
+    async def _run(self):
+        while True:
+            batch = [await self.q.get()]
+            await (asyncio.sleep(self.max_wait) if self.max_wait else asyncio.sleep(0))
+            while len(batch) < self.max_batch and not self.q.empty(): batch.append(self.q.get_nowait())
+            try: self._score(batch)
+            except Exception:
+                for item in batch:                   # isolate the failure: each future gets its own result or error
+                    try: self._score([item])
+                    except Exception as e:
+                        if not item[2].done(): item[2].set_exception(e)
+            self.batches += 1; self.items += len(batch)
+    def _score(self, batch):
+        cols = inputs_to_columns(i for _, i, _ in batch)
+        b = evaluate_signals_batch(cols, np.array([d for d, _, _ in batch], dtype=object), self.profiles)
+        for (_, _, fut), r in zip(batch, _batch_results(b, len(batch))):
+            if not fut.done(): fut.set_result(r)
+
+class EngineServer:
+    def __init__(self, host:str="127.0.0.1", port:int=8765, profiles_path:str=DEFAULT_PROFILES_PATH,
+                 max_batch:int=512, max_wait:float=0.0):
+        self.host, self.port, self.profiles_path = host, port, profiles_path
+        self.registry = ProfileRegistry(profiles_path); self._edited: Optional[ProfileSet] = None
+        self.batcher = MicroBatcher(max_batch=max_batch, max_wait=max_wait)
+        self.requests = 0; self.connections = 0; self.started = time.time()
+    @property
+    def profiles(self)->ProfileSet:
+        """Unsaved API edits if any, else the registry snapshot (which follows the file on disk)."""
+        return self._edited if self._edited is not None else self.registry.snapshot()
+    def _set_profiles(self, ps:ProfileSet): self._edited = ps
+
+    # --- routing ---
+    async def route(self, method:str, path:str, body:Any)->Any:
+        parts = [p for p in path.split("?")[0].split("/") if p]
+        if method == "POST" and parts[:1] in (["evaluate"], ["targets"]) and not isinstance(body, dict):
+            raise HTTPError(400, "request body must be a JSON object")
+        if method == "POST" and parts == ["evaluate"]:
+            desired = body.get("desired")
+            if desired not in ("LONG","SHORT"): raise HTTPError(400, "desired must be LONG or SHORT")
+            self.batcher.profiles = self.profiles
+            return await self.batcher.submit(desired, _inputs(body.get("inputs")))
+        if method == "POST" and parts == ["evaluate", "batch"]:
+            rows = body.get("rows", [])
+            if not isinstance(rows, list): raise HTTPError(400, "rows must be a list of input objects")
+            rows = [_inputs(r) for r in rows]
+            if not rows: return []
+            desired = body.get("desired")
+            if not (desired in ("LONG","SHORT") or (isinstance(desired, list) and len(desired) == len(rows)
+                                                    and all(d in ("LONG","SHORT") for d in desired))):
+                raise HTTPError(400, "desired must be LONG/SHORT or a list of them, one per row")
+            b = evaluate_signals_batch(inputs_to_columns(rows), np.asarray(desired, dtype=object), self.profiles)
+            return _batch_results(b, len(rows))
+        if method == "POST" and parts == ["targets"]:
+            try:
+                side, entry = body["side"], float(body["entry"])
+                if side not in ("LONG","SHORT"): raise ValueError(f"side must be LONG or SHORT, got {side!r}")
+                t1, t2 = compute_targets(float(body.get("anchor", entry)), float(body["dev"]), float(body.get("m1", 2.5)),
+                                         float(body.get("m2", 4.0)), side, entry, bool(body.get("ensure", True)))
+            except (KeyError, TypeError, ValueError) as e: raise HTTPError(400, f"bad target request: {e}")
+            out = {"tp1": t1, "tp2": t2}
+            if body.get("sl") is not None:
+                sl = float(body["sl"]); out.update(rr1=rr(entry, sl, t1, side), rr2=rr(entry, sl, t2, side))
+            return out
+        if parts[:1] == ["profiles"]:
+            ps = self.profiles
+            if method == "GET" and len(parts) == 1: return ps.to_dict()
+            if len(parts) == 2 and parts[1] in ps:
+                if method == "GET": return ps[parts[1]].to_dict()
+                if method == "PUT":
+                    if not isinstance(body, dict): raise HTTPError(400, "profile update must be an object")
+                    unknown = [k for k in body if k not in Profile._KEYS]
+                    if unknown: raise HTTPError(400, f"unknown profile field(s) {unknown}")
+                    if "grade_weights" in body and not isinstance(body["grade_weights"], dict):
+                        raise HTTPError(400, "grade_weights must be an object")
+                    try: new = ps.edit(parts[1], **body)
+                    except ProfileError as e: raise HTTPError(400, str(e))
+                    self._set_profiles(new); return new[parts[1]].to_dict()
+            if method == "POST" and parts[1:] == ["save"]:
+                if isinstance(body, dict) and "path" in body: raise HTTPError(400, "profiles are only saved to the server's --profiles file")
+                saved = self.registry.save(ps); self._edited = None
+                return {"saved": self.registry.path, "version": saved.version}
+            if method == "POST" and len(parts) == 3 and parts[1] == "reset" and parts[2] in ps:
+                new = ps.reset(parts[2]); self._set_profiles(new); return new[parts[2]].to_dict()
+            raise HTTPError(404, f"unknown profile route {path}")
+        if method == "GET" and parts == ["health"]: return {"ok": True}
+        if method == "GET" and parts == ["stats"]:
+            b = self.batcher
+            return {"requests": self.requests, "connections": self.connections, "uptime_s": round(time.time() - self.started, 1),
+                    "batches": b.batches, "avg_batch": round(b.items/b.batches, 2) if b.batches else 0.0}
+        raise HTTPError(404, f"no route for {method} {path}")
+
+    # --- HTTP/1.1 with keep-alive ---
+    async def handle(self, reader:asyncio.StreamReader, writer:asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line: break
+                try: method, path, version = line.decode("latin-1").split()
+                except ValueError: await self._send(writer, 400, {"error": "bad request line"}, False); break
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""): break
+                    k, _, v = h.decode("latin-1").partition(":"); headers[k.strip().lower()] = v.strip()
+                try: n = int(headers.get("content-length") or 0)
+                except ValueError: n = -1
+                if n < 0:                                # the body length is unknown, so the stream cannot be resynced
+                    await self._send(writer, 400, {"error": "bad Content-Length"}, False); break
+                raw = await reader.readexactly(n) if n else b""
+                conn = headers.get("connection", "").lower()
+                keep = conn != "close" if version == "HTTP/1.1" else conn == "keep-alive"
+                self.requests += 1
+                try:
+                    body = json.loads(raw) if raw else None
+                    status, payload = 200, await self.route(method.upper(), path, body)
+                except HTTPError as e: status, payload = e.status, {"error": str(e)}
+                except json.JSONDecodeError as e: status, payload = 400, {"error": f"invalid JSON: {e}"}
+                except Exception as e: status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+                await self._send(writer, status, payload, keep)
+                if not keep: break
+        except (asyncio.IncompleteReadError, ConnectionResetError): pass
+        finally:
+            writer.close()
+    async def _send(self, writer, status:int, payload:Any, keep:bool):
+        data = json.dumps(payload, default=_py).encode()
+        head = (f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\nConnection: {'keep-alive' if keep else 'close'}\r\n\r\n")
+        writer.write(head.encode() + data); await writer.drain()
+
+    async def serve(self, ready:Optional[asyncio.Future]=None):
+        self.batcher.start()
+        server = await asyncio.start_server(self.handle, self.host, self.port, backlog=1024)
+        if ready: ready.set_result(server.sockets[0].getsockname()[:2])
+        async with server: await server.serve_forever()
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="LSF engine JSON server")
+    ap.add_argument("--host", default="127.0.0.1"); ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--profiles", default=DEFAULT_PROFILES_PATH)
+    ap.add_argument("--max-batch", type=int, default=512)
+    ap.add_argument("--max-wait-ms", type=float, default=0.0, help="extra time to hold a batch open")
+    a = ap.parse_args()
+    srv = EngineServer(a.host, a.port, a.profiles, a.max_batch, a.max_wait_ms/1e3)
+    print(f"serving on http://{a.host}:{a.port}")
+    try: asyncio.run(srv.serve())
+    except KeyboardInterrupt: pass
@@ -1,8 +1,9 @@
 # signal_engine_v3_11.py
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Literal, Optional, Dict, Any, Tuple
-import os, csv, json, datetime as dt, copy
+from dataclasses import dataclass, fields, MISSING, asdict
+from typing import Literal, Optional, Dict, Any, Tuple, List
+import os, csv, json, math, random, time, datetime as dt, copy
+import numpy as np
 
 Dir = Literal["LONG","SHORT"]
 TF  = Literal["1m","3m","5m"]
@@ -39,33 +40,55 @@ SWEEP_PROFILES = copy.deepcopy(_SWEEP_PROFILES_DEFAULT)
 def defaults_for(model:str)->Dict[str,Any]: return copy.deepcopy(_SWEEP_PROFILES_DEFAULT[model])
 def reset_model_to_defaults(model:str): SWEEP_PROFILES[model] = defaults_for(model)
 
-def load_profiles_from_excel(df):
-    if df is None or df.empty: return
-    for _, row in df.iterrows():
-        arche = row.get("Archetype")
-        if not isinstance(arche, str) or arche not in SWEEP_PROFILES: continue
-        prof = SWEEP_PROFILES[arche]
-        try:
-            avg_adx = float(row.get("Avg_ADX_Entry")); 
-            if avg_adx>0: prof["adx_min"] = max(18.0, round(avg_adx - 2))
-        except: pass
-        try:
-            vrec = float(row.get("VWAP_reclaim/support") or 0); 
-            vrej = float(row.get("VWAP_rejection/resistance") or 0); 
-            vflip= float(row.get("VWAP_flip/cross") or 0)
-            if vrej >= vrec and vrej >= vflip:
-                prof["expected_vwap"] = "resistance"; prof["require_vwap_flip"]=True
-            elif vflip >= vrec and vflip >= vrej:
-                prof["expected_vwap"] = "flip"; prof["require_vwap_flip"]=True
-            else:
-                prof["expected_vwap"] = "support"; 
-                if prof.get("bias_mode")=="continuation": prof["require_vwap_flip"]=False
-        except: pass
-
-def dump_profiles_to_json(path:str):
+def vwap_expectation(vrec:float, vrej:float, vflip:float)->str:
+    """Dominant VWAP behaviour from reclaim/support, rejection/resistance and flip/cross frequencies (ties: resistance, then flip)."""
+    if vrej >= vrec and vrej >= vflip: return "resistance"
+    if vflip >= vrec and vflip >= vrej: return "flip"
+    return "support"
+
+def apply_vwap_expectation(prof:Dict[str,Any], expected:str):
+    prof["expected_vwap"] = expected
+    if expected != "support": prof["require_vwap_flip"] = True
+    elif prof.get("bias_mode")=="continuation": prof["require_vwap_flip"] = False
+
+def _excel_num(col)->"np.ndarray":
+    """float(x or 0) per cell, NaN where that would raise (those rows are skipped, as before)."""
+    import pandas as pd
+    if col.dtype == object:
+        falsy = np.fromiter((x is None or (isinstance(x, str) and x == "") for x in col), bool, len(col))
+        col = col.mask(falsy, 0)
+    return pd.to_numeric(col, errors="coerce").to_numpy(dtype=float)
+
+def load_profiles_from_excel(df, profiles=None):
+    profiles = SWEEP_PROFILES if profiles is None else profiles
+    if df is None or df.empty or "Archetype" not in df: return
+    arche = df["Archetype"]
+    zeros = lambda: np.zeros(len(df))
+    adx = _excel_num(df["Avg_ADX_Entry"]) if "Avg_ADX_Entry" in df else np.full(len(df), np.nan)
+    cols = [df[c] if c in df else None for c in ("VWAP_reclaim/support","VWAP_rejection/resistance","VWAP_flip/cross")]
+    vrec, vrej, vflip = (zeros() if c is None else _excel_num(c) for c in cols)
+    parsed = np.ones(len(df), dtype=bool)
+    for c, v in zip(cols, (vrec, vrej, vflip)):
+        if c is not None: parsed &= ~(np.isnan(v) & c.notna().to_numpy() & (c.to_numpy() != None))   # unparseable text -> row skipped
+    code = np.where((vrej >= vrec) & (vrej >= vflip), 1, np.where((vflip >= vrec) & (vflip >= vrej), 2, 0))
+    for name, idx in arche.groupby(arche, sort=False).indices.items():
+        if not isinstance(name, str) or name not in profiles: continue
+        prof = profiles[name]
+        good = idx[adx[idx] > 0]
+        if len(good): prof["adx_min"] = max(18.0, round(adx[good[-1]] - 2))        # last row wins, as in the row loop
+        rows = idx[parsed[idx]]
+        if not len(rows): continue
+        c = code[rows]
+        if c[-1] == 0 and prof.get("bias_mode") != "continuation":
+            if (c != 0).any(): prof["require_vwap_flip"] = True
+            prof["expected_vwap"] = "support"
+        else:
+            apply_vwap_expectation(prof, ("support","resistance","flip")[c[-1]])
+
+def dump_profiles_to_json(path:str, profiles=None):
     dirpath = os.path.dirname(path)
     if dirpath and not os.path.exists(dirpath): os.makedirs(dirpath, exist_ok=True)
-    with open(path,"w") as f: json.dump(SWEEP_PROFILES, f, indent=2)
+    with open(path,"w") as f: json.dump(profiles if profiles is not None else SWEEP_PROFILES, f, indent=2)
 
 def load_profiles_from_json(path:str):
     if not os.path.exists(path): return
@@ -73,9 +96,8 @@ def load_profiles_from_json(path:str):
     for k,v in data.items():
         if k in SWEEP_PROFILES and isinstance(v, dict): SWEEP_PROFILES[k].update(v)
 
-from dataclasses import dataclass
 
-@dataclass
+@dataclass(slots=True)
 class Inputs:
     price: float; vwap_side: Literal["ABOVE","BELOW","TOUCHING"]; vwap_slope: Literal["UP","DOWN","FLAT"]
     adx_now: float; adx_sma3: float; adx_sma6: float; adx_kill: float = 20.0
@@ -118,32 +140,52 @@ def auto_model_from_context(session, sweep_type, desired):
     if session=="NY" and sweep_type in ("Asia_Low","Asia_High"): return "Asia_London_NY_Continuation"
     return None
 
-def evaluate_signal(desired, inp:Inputs, profiles=None):
+_DEFAULT_WEIGHTS = {"sweep":30,"mss":20,"vwap":20,"adx":15,"bias":15}
+
+def profile_params(prof)->Tuple:
+    """(adx_min, post_sweep_delay|None, require_vwap_flip, expected_vwap, gate bias_mode, raw bias_mode, grade_weights).
+    Validated registry profiles carry this precomputed as `.params`; plain dicts resolve their defaults here."""
+    p = getattr(prof, "params", None)
+    if p is not None: return p
+    return (prof.get("adx_min",24), prof.get("post_sweep_delay"), prof.get("require_vwap_flip", True),
+            prof.get("expected_vwap","support"), prof.get("bias_mode","continuation"), prof.get("bias_mode"),
+            prof.get("grade_weights", _DEFAULT_WEIGHTS))
+
+# Opt-in gate telemetry sink (telemetry.GateTelemetry); install with telemetry.enable(). None = no instrumentation.
+TELEMETRY = None
+
+def _evaluate(desired, inp:Inputs, profiles=None):
+    """The gate rules; returns (model, profile, delay, mss, vwap, adx, bias, micro, bias_note, vwap_why, grade, tag, adx_slope)."""
     profiles = profiles or SWEEP_PROFILES
     rec = auto_model_from_context(inp.session, inp.sweep_type or "Other", desired)
     model_name = rec or inp.liquidity_model
     prof = profiles.get(model_name, SWEEP_PROFILES["Asia_London_NY_Continuation"])
+    p_adx, p_delay, p_flip, p_vwap, p_bias, p_bias_raw, w = profile_params(prof)
     adx_slope = inp.adx_sma3 - inp.adx_sma6
-    adx_ok = (inp.adx_now >= max(inp.adx_min, prof.get("adx_min",24))) and (adx_slope >= inp.adx_slope_min)
-    delay_ok = inp.bars_since_sweep >= prof.get("post_sweep_delay", inp.post_sweep_delay)
+    adx_ok = (inp.adx_now >= max(inp.adx_min, p_adx)) and (adx_slope >= inp.adx_slope_min)
+    delay_ok = inp.bars_since_sweep >= (inp.post_sweep_delay if p_delay is None else p_delay)
     mss_ok = (inp.mss_dir == desired)
-    if prof.get("require_vwap_flip", True):
-        vwap_ok, vwhy = vwap_gate(prof.get("expected_vwap","support"), inp.vwap_side, inp.vwap_slope, inp.vwap_close_confirm)
+    if p_flip:
+        vwap_ok, vwhy = vwap_gate(p_vwap, inp.vwap_side, inp.vwap_slope, inp.vwap_close_confirm)
     else:
         vwap_ok, vwhy = True, "not-required"
     mode = inp.bias_logic_mode
     if mode=="auto":
-        mode = "adaptive" if prof.get("bias_mode")=="reversal" else "strict"
+        mode = "adaptive" if p_bias_raw=="reversal" else "strict"
     if mode=="strict":
-        bias_ok = bias_gate_strict(inp.htf_60m_bias, inp.ltf_15m_bias, inp.ltf_3m_bias, prof.get("bias_mode","continuation"), desired)
+        bias_ok = bias_gate_strict(inp.htf_60m_bias, inp.ltf_15m_bias, inp.ltf_3m_bias, p_bias, desired)
         bias_note = "strict"
     else:
-        bias_ok, bias_note = bias_gate_adaptive(inp.htf_60m_bias, inp.ltf_15m_bias, inp.ltf_3m_bias, prof.get("bias_mode","continuation"), desired, vwap_ok, adx_ok)
+        bias_ok, bias_note = bias_gate_adaptive(inp.htf_60m_bias, inp.ltf_15m_bias, inp.ltf_3m_bias, p_bias, desired, vwap_ok, adx_ok)
     micro_ok = bool(inp.micro_fvg_present)
-    entry_ready = all([delay_ok, mss_ok, vwap_ok, adx_ok, bias_ok, micro_ok])
-    w = prof.get("grade_weights", {"sweep":30,"mss":20,"vwap":20,"adx":15,"bias":15})
     grade = min(100, int(round(w["sweep"]*1 + w["mss"]*int(mss_ok) + w["vwap"]*int(vwap_ok) + w["adx"]*int(adx_ok) + w["bias"]*int(bias_ok))))
-    tag = "TRANSITIONAL_REVERSAL" if (bias_note=="transitional") else ("CONTINUATION" if prof.get("bias_mode")=="continuation" else "REVERSAL")
+    tag = "TRANSITIONAL_REVERSAL" if (bias_note=="transitional") else ("CONTINUATION" if p_bias_raw=="continuation" else "REVERSAL")
+    return model_name, prof, delay_ok, mss_ok, vwap_ok, adx_ok, bias_ok, micro_ok, bias_note, vwhy, grade, tag, adx_slope
+
+def evaluate_signal(desired, inp:Inputs, profiles=None):
+    model_name, prof, delay_ok, mss_ok, vwap_ok, adx_ok, bias_ok, micro_ok, bias_note, vwhy, grade, tag, adx_slope = (
+        _evaluate(desired, inp, profiles) if TELEMETRY is None else TELEMETRY.observe(desired, inp, profiles))
+    entry_ready = all([delay_ok, mss_ok, vwap_ok, adx_ok, bias_ok, micro_ok])
     return {"model_used": model_name, "entry_ready": entry_ready, "grade": grade, "tag": tag,
             "components": {"delay_ok":delay_ok,"mss_ok":mss_ok,"vwap_ok":vwap_ok,"adx_ok":adx_ok,
                            "bias_ok":bias_ok,"micro_ok":micro_ok,"adx_slope":round(adx_slope,2),
@@ -151,12 +193,185 @@ def evaluate_signal(desired, inp:Inputs, profiles=None):
                            "bias_note":bias_note,"vwap_why":vwhy},
             "profile": prof}
 
-def log_signal_csv(path, model, desired, res, inp:Inputs):
-    dirp = os.path.dirname(path)
-    if dirp and not os.path.exists(dirp): os.makedirs(dirp, exist_ok=True)
-    headers = ["timestamp","session","model","sweep_type","direction","grade","entry_ready","tag",
-               "adx_now","adx_slope","vwap_side","vwap_slope","htf","l15","l3","bias_note"]
-    row = {"timestamp": dt.datetime.utcnow().isoformat(),
+# --- compact results: gates packed into a bitmask, no profile reference, explanation built on demand ---
+GATE_NAMES = ("delay_ok","mss_ok","vwap_ok","adx_ok","bias_ok","micro_ok")
+GATE_BITS = {g: 1 << i for i, g in enumerate(GATE_NAMES)}
+ALL_GATES = (1 << len(GATE_NAMES)) - 1
+DIRECTIONS = ("LONG","SHORT")
+TAGS = ("CONTINUATION","REVERSAL","TRANSITIONAL_REVERSAL")
+BIAS_NOTES = ("strict","transitional","fail")
+VWAP_WHYS = ("support","resistance","flip/reclaim","any","not-required")
+
+def pack_gates(delay_ok, mss_ok, vwap_ok, adx_ok, bias_ok, micro_ok)->int:
+    return delay_ok | mss_ok << 1 | vwap_ok << 2 | adx_ok << 3 | bias_ok << 4 | micro_ok << 5
+
+class SignalResult:
+    """
+    One evaluation in about 145 bytes retained (tracemalloc over 20k results; the slotted object itself is
+    112). Holds copies of the two profile values the explanation quotes, never the profile itself, so later
+    tuning edits cannot change a stored result. Supports the dict-style reads of evaluate_signal's result
+    (res["grade"], res["components"][...]); components are built per access.
+    """
+    __slots__ = ("model_used","direction","gates","grade","tag","bias_note","vwap_why","adx_slope","profile_adx_min","expected_vwap")
+    def __init__(self, model_used, direction, gates, grade, tag, bias_note, vwap_why, adx_slope, profile_adx_min, expected_vwap):
+        self.model_used = model_used; self.direction = direction; self.gates = gates; self.grade = grade; self.tag = tag
+        self.bias_note = bias_note; self.vwap_why = vwap_why; self.adx_slope = adx_slope
+        self.profile_adx_min = profile_adx_min; self.expected_vwap = expected_vwap
+    @property
+    def entry_ready(self)->bool: return self.gates == ALL_GATES
+    def ok(self, gate:str)->bool: return bool(self.gates & GATE_BITS[gate])
+    def failed(self)->List[str]: return [g for g in GATE_NAMES if not self.gates & GATE_BITS[g]]
+    @property
+    def components(self)->Dict[str, Any]:
+        c = {g: bool(self.gates & b) for g, b in GATE_BITS.items()}
+        c.update(adx_slope=round(self.adx_slope, 2), profile_adx_min=self.profile_adx_min, expected_vwap=self.expected_vwap,
+                 bias_note=self.bias_note, vwap_why=self.vwap_why)
+        return c
+    def explain(self)->str:
+        parts = [f"{self.model_used} {self.direction}: grade {self.grade} {self.tag}",
+                 "ENTRY READY" if self.entry_ready else "blocked by " + ", ".join(self.failed()),
+                 f"bias {self.bias_note}", f"vwap {self.vwap_why} (expects {self.expected_vwap})",
+                 f"adx slope {self.adx_slope:+.2f}, profile adx_min {self.profile_adx_min}"]
+        return "; ".join(parts)
+    def to_dict(self)->Dict[str, Any]:
+        """evaluate_signal's shape, minus the "profile" reference."""
+        return {"model_used": self.model_used, "entry_ready": self.entry_ready, "grade": self.grade, "tag": self.tag,
+                "components": self.components}
+    _KEYS = ("model_used","entry_ready","grade","tag","components")
+    def __getitem__(self, k:str):
+        if k in self._KEYS: return getattr(self, k)
+        raise KeyError(k)
+    def get(self, k:str, default=None): return self[k] if k in self._KEYS else default
+    def __eq__(self, o): return isinstance(o, SignalResult) and all(getattr(self, a) == getattr(o, a) for a in self.__slots__)
+    def __reduce__(self): return (SignalResult, tuple(getattr(self, a) for a in self.__slots__))
+    def __repr__(self): return f"SignalResult({self.model_used!r}, {self.direction}, gates=0b{self.gates:06b}, grade={self.grade}, {self.tag})"
+
+def evaluate_signal_compact(desired, inp:Inputs, profiles=None)->SignalResult:
+    """evaluate_signal returning a SignalResult — for callers that keep many results (replays, scans)."""
+    model_name, prof, d, m, v, a, b, mi, bias_note, vwhy, grade, tag, adx_slope = (
+        _evaluate(desired, inp, profiles) if TELEMETRY is None else TELEMETRY.observe(desired, inp, profiles))
+    return SignalResult(model_name, desired, pack_gates(d, m, v, a, b, mi), grade, tag, bias_note, vwhy, adx_slope,
+                        prof.get("adx_min"), prof.get("expected_vwap"))
+
+RESULT_DTYPE = np.dtype([("model","u1"),("direction","u1"),("gates","u1"),("grade","u1"),("tag","u1"),
+                         ("bias_note","u1"),("vwap_why","u1"),("expected_vwap","u1"),
+                         ("adx_slope","f4"),("profile_adx_min","f4")])
+
+class ResultBuffer:
+    """
+    Struct-of-arrays store of evaluations: 16 bytes per result. String fields are stored as uint8 codes;
+    fixed vocabularies come from DIRECTIONS/TAGS/BIAS_NOTES/VWAP_WHYS, and model names and expected_vwap
+    values get per-buffer dictionaries (`models`, `expected`). Append scalar results with append(), or a
+    whole evaluate_signals_batch output with extend_batch().
+    """
+    def __init__(self):
+        import array
+        self._cols = {name: array.array("B" if RESULT_DTYPE[name].kind == "u" else "f") for name in RESULT_DTYPE.names}
+        self.models: List[str] = []; self.expected: List[Optional[str]] = []
+        self._mcode: Dict[str, int] = {}; self._ecode: Dict[Optional[str], int] = {}
+        self._codes = {"direction": {v: i for i, v in enumerate(DIRECTIONS)}, "tag": {v: i for i, v in enumerate(TAGS)},
+                       "bias_note": {v: i for i, v in enumerate(BIAS_NOTES)}, "vwap_why": {v: i for i, v in enumerate(VWAP_WHYS)}}
+    def _code(self, table:Dict, names:List, v)->int:
+        c = table.get(v)
+        if c is None:
+            if len(names) == 255: raise ValueError("ResultBuffer holds at most 255 distinct values per dictionary field")
+            c = table[v] = len(names); names.append(v)
+        return c
+    def __len__(self): return len(self._cols["grade"])
+    def append(self, r:SignalResult):
+        c, k = self._cols, self._codes
+        c["model"].append(self._code(self._mcode, self.models, r.model_used)); c["direction"].append(k["direction"][r.direction])
+        c["gates"].append(r.gates); c["grade"].append(r.grade); c["tag"].append(k["tag"][r.tag])
+        c["bias_note"].append(k["bias_note"][r.bias_note]); c["vwap_why"].append(k["vwap_why"][r.vwap_why])
+        c["expected_vwap"].append(self._code(self._ecode, self.expected, r.expected_vwap))
+        c["adx_slope"].append(r.adx_slope)
+        c["profile_adx_min"].append(math.nan if r.profile_adx_min is None else r.profile_adx_min)
+    def extend_batch(self, b, desired):
+        """Append an evaluate_signals_batch result (dict of arrays or DataFrame) evaluated for `desired`."""
+        n = len(b["grade"]); k = self._codes
+        def codes(vals, table, names=None):
+            vals = np.asarray(vals, dtype=object)
+            _, first, inv = np.unique(vals.astype(str), return_index=True, return_inverse=True)
+            m = np.array([table[x] if names is None else self._code(table, names, x) for x in vals[first]], dtype=np.uint8)
+            return m[inv]
+        gates = np.zeros(n, np.uint8)
+        for g, bit in GATE_BITS.items(): gates |= np.asarray(b[g], bool).astype(np.uint8)*bit
+        pam = np.asarray(b["profile_adx_min"], dtype=object); pam = np.where(pam == None, np.nan, pam).astype(np.float32)
+        cols = {"model": codes(b["model_used"], self._mcode, self.models),
+                "direction": codes(np.broadcast_to(np.asarray(desired, dtype=object), (n,)), k["direction"]),
+                "gates": gates, "grade": np.asarray(b["grade"]).astype(np.uint8), "tag": codes(b["tag"], k["tag"]),
+                "bias_note": codes(b["bias_note"], k["bias_note"]), "vwap_why": codes(b["vwap_why"], k["vwap_why"]),
+                "expected_vwap": codes(b["expected_vwap"], self._ecode, self.expected),
+                "adx_slope": np.asarray(b["adx_slope"], np.float32), "profile_adx_min": pam}
+        for name, v in cols.items(): self._cols[name].frombytes(np.ascontiguousarray(v, RESULT_DTYPE[name]).tobytes())
+    def __getitem__(self, i:int)->SignalResult:
+        c = {name: col[i] for name, col in self._cols.items()}
+        pam = c["profile_adx_min"]
+        return SignalResult(self.models[c["model"]], DIRECTIONS[c["direction"]], c["gates"], c["grade"], TAGS[c["tag"]],
+                            BIAS_NOTES[c["bias_note"]], VWAP_WHYS[c["vwap_why"]], c["adx_slope"],
+                            None if pam != pam else pam, self.expected[c["expected_vwap"]])
+    def to_records(self)->np.ndarray:
+        """Structured array (RESULT_DTYPE); decode model/expected_vwap codes with .models/.expected."""
+        out = np.empty(len(self), RESULT_DTYPE)
+        for name, col in self._cols.items(): out[name] = np.frombuffer(col, dtype=RESULT_DTYPE[name]) if len(col) else []
+        return out
+    def to_frame(self):
+        import pandas as pd
+        r = self.to_records(); cat = pd.Categorical.from_codes
+        df = pd.DataFrame({"model_used": cat(r["model"], self.models), "direction": cat(r["direction"], DIRECTIONS),
+                           "entry_ready": r["gates"] == ALL_GATES, "grade": r["grade"], "tag": cat(r["tag"], TAGS)})
+        for g, bit in GATE_BITS.items(): df[g] = (r["gates"] & bit) != 0
+        df["adx_slope"] = r["adx_slope"]; df["profile_adx_min"] = r["profile_adx_min"]
+        df["bias_note"] = cat(r["bias_note"], BIAS_NOTES); df["vwap_why"] = cat(r["vwap_why"], VWAP_WHYS)
+        df["expected_vwap"] = cat(r["expected_vwap"], [str(e) for e in self.expected])
+        return df
+    def to_arrow(self):
+        """pyarrow Table with dictionary-encoded string columns (zero-copy from the code arrays where possible)."""
+        try: import pyarrow as pa
+        except ImportError as e: raise ImportError("to_arrow requires pyarrow (pip install pyarrow)") from e
+        r = self.to_records(); d = lambda codes, names: pa.DictionaryArray.from_arrays(pa.array(codes), pa.array(list(names)))
+        return pa.table({"model_used": d(r["model"], self.models), "direction": d(r["direction"], DIRECTIONS),
+                         "gates": pa.array(r["gates"]), "entry_ready": pa.array(r["gates"] == ALL_GATES),
+                         "grade": pa.array(r["grade"]), "tag": d(r["tag"], TAGS),
+                         "bias_note": d(r["bias_note"], BIAS_NOTES), "vwap_why": d(r["vwap_why"], VWAP_WHYS),
+                         "expected_vwap": d(r["expected_vwap"], self.expected),
+                         "adx_slope": pa.array(r["adx_slope"]), "profile_adx_min": pa.array(r["profile_adx_min"])})
+
+TICK = 0.25
+
+def compute_targets(anchor, dev, m1, m2, side, entry, ensure, tick=TICK):
+    """
+    If 'ensure' is True, use ENTRY as the base so TP is always away from entry.
+    Otherwise, use the provided anchor (legacy behavior).
+    """
+    base = entry if ensure else anchor
+    sign = 1 if side == "LONG" else -1
+    t1 = base + sign * (m1 * dev)
+    t2 = base + sign * (m2 * dev)
+
+    # one-tick safety nudge
+    if ensure:
+        if side == "LONG":
+            t1 = max(t1, entry + tick)
+            t2 = max(t2, entry + tick)
+        else:
+            t1 = min(t1, entry - tick)
+            t2 = min(t2, entry - tick)
+
+    return round(t1, 2), round(t2, 2)
+
+def rr(entry, sl, tp, side):
+    risk = (entry - sl) if side=="LONG" else (sl - entry)
+    reward = (tp - entry) if side=="LONG" else (entry - tp)
+    if risk <= 0: return None
+    return round(reward / risk, 2)
+
+SIGNAL_LOG_FIELDS = ["timestamp","session","model","sweep_type","direction","grade","entry_ready","tag",
+                     "adx_now","adx_slope","vwap_side","vwap_slope","htf","l15","l3","bias_note"]
+TRADE_TICKET_FIELDS = ["timestamp","session","model","sweep_type","side","entry","sl","tp1","tp2","rr1","rr2","grade","tag"]
+
+def signal_log_row(model, desired, res, inp:Inputs)->Dict[str,Any]:
+    return {"timestamp": dt.datetime.utcnow().isoformat(),
         "session": inp.session, "model": res.get("model_used", model),
         "sweep_type": inp.sweep_type, "direction": desired,
         "grade": res.get("grade"), "entry_ready": res.get("entry_ready"), "tag": res.get("tag"),
@@ -164,8 +379,168 @@ def log_signal_csv(path, model, desired, res, inp:Inputs):
         "vwap_side": inp.vwap_side, "vwap_slope": inp.vwap_slope,
         "htf": inp.htf_60m_bias, "l15": inp.ltf_15m_bias, "l3": inp.ltf_3m_bias,
         "bias_note": res["components"].get("bias_note","")}
+
+def log_signal_csv(path, model, desired, res, inp:Inputs):
+    dirp = os.path.dirname(path)
+    if dirp and not os.path.exists(dirp): os.makedirs(dirp, exist_ok=True)
+    row = signal_log_row(model, desired, res, inp)
     write_header = not os.path.exists(path)
     with open(path,"a",newline="") as f:
-        w = csv.DictWriter(f, fieldnames=headers)
+        w = csv.DictWriter(f, fieldnames=SIGNAL_LOG_FIELDS)
         if write_header: w.writeheader()
         w.writerow(row)
+
+# --- vectorized batch path (same rules as evaluate_signal, one pass over columns) ---
+
+_INPUT_FIELDS = [f.name for f in fields(Inputs)]
+_INPUT_DEFAULTS = {f.name: f.default for f in fields(Inputs) if f.default is not MISSING}
+_SWEEP_LOWS  = ("London_Low","PDL","Midnight_Low","Settlement_Low")
+_SWEEP_HIGHS = ("London_High","PDH","Midnight_High","Settlement_High")
+_VWAP_CODES = {"support":0, "resistance":1, "flip":2, "reclaim":2}
+_VWAP_WHY = np.array(VWAP_WHYS, dtype=object)
+_BATCH_BOOL_COLS = GATE_NAMES
+
+def _isin(a, vals):
+    m = np.zeros(len(a), dtype=bool)
+    for v in vals: m |= (a == v)
+    return m
+
+def _batch_col(data, name, n):
+    if name in data: return np.asarray(data[name])
+    if name not in _INPUT_DEFAULTS: raise KeyError(f"missing input column '{name}'")
+    d = _INPUT_DEFAULTS[name]
+    return np.full(n, d, dtype=object if d is None or isinstance(d, str) else None)
+
+def inputs_to_columns(rows)->Dict[str, np.ndarray]:
+    """List of Inputs -> dict of column arrays accepted by evaluate_signals_batch."""
+    rows = list(rows)
+    return {k: np.array([getattr(r, k) for r in rows], dtype=object if k in ("mss_dir","sweep_type") else None) for k in _INPUT_FIELDS}
+
+def auto_models_batch(session, sweep_type, desired)->np.ndarray:
+    session, sweep_type, desired = np.asarray(session), np.asarray(sweep_type), np.asarray(desired)
+    ny = session == "NY"
+    out = np.full(len(session), None, dtype=object)
+    out[ny & _isin(sweep_type, ("Asia_Low","Asia_High"))] = "Asia_London_NY_Continuation"
+    out[ny & _isin(sweep_type, _SWEEP_HIGHS) & (desired=="SHORT")] = "London_High_Reversal"
+    out[ny & _isin(sweep_type, _SWEEP_LOWS) & (desired=="LONG")] = "NY_Low_Reversal"
+    return out
+
+def evaluate_signals_batch(data, desired, profiles=None, observe:bool=True):
+    """
+    Vectorized evaluate_signal. `data` is a DataFrame or a dict of equal-length arrays keyed by
+    Inputs field names (missing optional fields take the Inputs defaults); `desired` is "LONG"/"SHORT"
+    or an array of them. Returns a dict of arrays (a DataFrame when given one) with the result
+    keys and the flattened components. observe=False keeps the call out of telemetry (synthetic grids).
+    """
+    t0 = time.perf_counter() if TELEMETRY is not None else 0.0
+    profiles = profiles or SWEEP_PROFILES
+    n = len(data[next(iter(data.keys()))]) if not hasattr(data, "columns") else len(data)
+    col = lambda k: _batch_col(data, k, n)
+    desired = np.broadcast_to(np.asarray(desired, dtype=object), (n,))
+    is_long, is_short = desired=="LONG", desired=="SHORT"
+
+    rec = auto_models_batch(col("session"), col("sweep_type"), desired)
+    model_name = np.where(rec == None, col("liquidity_model"), rec).astype(str)
+    names, inv = np.unique(model_name, return_inverse=True)
+
+    # per-model profile parameters, broadcast back to rows through `inv`
+    fallback = SWEEP_PROFILES["Asia_London_NY_Continuation"]
+    profs = [profiles.get(m, fallback) for m in names]
+    p_adx   = np.array([p.get("adx_min",24) for p in profs], dtype=float)[inv]
+    p_delay = np.array([p.get("post_sweep_delay", np.nan) for p in profs], dtype=float)[inv]
+    p_flip  = np.array([bool(p.get("require_vwap_flip", True)) for p in profs])[inv]
+    p_vwap  = np.array([_VWAP_CODES.get(p.get("expected_vwap","support"), 3) for p in profs])[inv]
+    p_cont  = np.array([p.get("bias_mode","continuation")=="continuation" for p in profs])[inv]
+    p_rev   = np.array([p.get("bias_mode")=="reversal" for p in profs])[inv]
+    p_tagc  = np.array([p.get("bias_mode")=="continuation" for p in profs])[inv]
+    gw = [p.get("grade_weights", {"sweep":30,"mss":20,"vwap":20,"adx":15,"bias":15}) for p in profs]
+    w = {k: np.array([g[k] for g in gw], dtype=float)[inv] for k in ("sweep","mss","vwap","adx","bias")}
+
+    adx_slope = col("adx_sma3").astype(float) - col("adx_sma6").astype(float)
+    adx_ok = (col("adx_now").astype(float) >= np.maximum(col("adx_min").astype(float), p_adx)) & (adx_slope >= col("adx_slope_min").astype(float))
+    delay_ok = col("bars_since_sweep").astype(float) >= np.where(np.isnan(p_delay), col("post_sweep_delay").astype(float), p_delay)
+    mss_ok = col("mss_dir") == desired
+    side, slope = col("vwap_side"), col("vwap_slope")
+    vwap_hit = np.select([p_vwap==0, p_vwap==1, p_vwap==2],
+                         [side=="ABOVE", side=="BELOW", _isin(slope, ("UP","DOWN")) & (side!="TOUCHING")], True)
+    vwap_ok = np.where(p_flip, vwap_hit, True)
+    vwap_why = _VWAP_WHY[np.where(p_flip, p_vwap, 4)]
+
+    mode = col("bias_logic_mode")
+    strict_mode = (mode=="strict") | ((mode=="auto") & ~p_rev)
+    htf, l15, l3 = col("htf_60m_bias"), col("ltf_15m_bias"), col("ltf_3m_bias")
+    bull, bear = (l15=="BULL") & (l3=="BULL"), (l15=="BEAR") & (l3=="BEAR")
+    strict_ok = np.where(p_cont, (is_long & bull) | (is_short & bear),
+                         (is_long & bull & (htf!="BULL")) | (is_short & bear & (htf!="BEAR")))
+    one_ltf = (is_long & ((l15=="BULL") | (l3=="BULL"))) | (is_short & ((l15=="BEAR") | (l3=="BEAR")))
+    transitional = ~strict_mode & ~strict_ok & one_ltf & vwap_ok & adx_ok
+    bias_ok = strict_ok | transitional
+    bias_note = np.where(strict_mode | strict_ok, "strict", np.where(transitional, "transitional", "fail")).astype(object)
+    micro_ok = col("micro_fvg_present").astype(bool)
+
+    entry_ready = delay_ok & mss_ok & vwap_ok & adx_ok & bias_ok & micro_ok
+    raw = w["sweep"] + w["mss"]*mss_ok + w["vwap"]*vwap_ok + w["adx"]*adx_ok + w["bias"]*bias_ok
+    grade = np.minimum(100, np.rint(raw)).astype(int)
+    tag = np.where(transitional, "TRANSITIONAL_REVERSAL", np.where(p_tagc, "CONTINUATION", "REVERSAL")).astype(object)
+    out = {"model_used": model_name.astype(object), "entry_ready": entry_ready, "grade": grade, "tag": tag,
+           "delay_ok": delay_ok, "mss_ok": mss_ok, "vwap_ok": vwap_ok, "adx_ok": adx_ok,
+           "bias_ok": bias_ok, "micro_ok": micro_ok, "adx_slope": np.round(adx_slope, 2),
+           "profile_adx_min": np.array([p.get("adx_min") for p in profs], dtype=object)[inv],
+           "expected_vwap": np.array([p.get("expected_vwap") for p in profs], dtype=object)[inv],
+           "bias_note": bias_note, "vwap_why": vwap_why}
+    if observe and TELEMETRY is not None: TELEMETRY.observe_batch(out, col("session"), desired, col("liquidity_model"), time.perf_counter() - t0)
+    if hasattr(data, "columns"):
+        import pandas as pd
+        return pd.DataFrame(out, index=data.index)
+    return out
+
+def random_inputs(n:int, seed:int=0):
+    """Synthetic Inputs covering every enum combination the UI can produce (for parity checks / benches)."""
+    r = random.Random(seed); pick = r.choice
+    return [Inputs(price=round(r.uniform(20000, 26000)*4)/4, vwap_side=pick(["ABOVE","BELOW","TOUCHING"]),
+                   vwap_slope=pick(["UP","DOWN","FLAT"]), adx_now=round(r.uniform(10, 45), 1),
+                   adx_sma3=round(r.uniform(10, 45), 1), adx_sma6=round(r.uniform(10, 45), 1),
+                   session=pick(["Asia","London","NY"]), mss_dir=pick(["LONG","SHORT",None]),
+                   htf_60m_bias=pick(["BULL","BEAR","NEUTRAL"]), ltf_15m_bias=pick(["BULL","BEAR","NEUTRAL"]),
+                   ltf_3m_bias=pick(["BULL","BEAR","NEUTRAL"]), liquidity_model=pick(ARCHETYPES),
+                   sweep_type=pick(SWEEP_TYPES + [None]), bars_since_sweep=r.randint(0, 8),
+                   post_sweep_delay=r.randint(0, 5), micro_fvg_present=r.random() < 0.7,
+                   adx_min=r.choice([18.0, 20.0, 24.0, 28.0]), adx_slope_min=r.choice([-1.0, 0.0, 0.5]),
+                   bias_logic_mode=pick(["auto","adaptive","strict"]))
+            for _ in range(n)]
+
+def check_batch_parity(n:int=5000, seed:int=0, profiles=None)->int:
+    """Assert evaluate_signals_batch == evaluate_signal row by row on random inputs; returns rows checked."""
+    rows = random_inputs(n, seed)
+    cols = inputs_to_columns(rows)
+    for desired in ("LONG","SHORT"):
+        b = evaluate_signals_batch(cols, desired, profiles)
+        for i, inp in enumerate(rows):
+            s = evaluate_signal(desired, inp, profiles); c = s["components"]
+            got = (b["model_used"][i], bool(b["entry_ready"][i]), int(b["grade"][i]), b["tag"][i],
+                   *(bool(b[k][i]) for k in _BATCH_BOOL_COLS), b["bias_note"][i], b["vwap_why"][i])
+            want = (s["model_used"], s["entry_ready"], s["grade"], s["tag"],
+                    *(bool(c[k]) for k in _BATCH_BOOL_COLS), c["bias_note"], c["vwap_why"])
+            assert got == want, f"row {i} {desired}: batch={got} scalar={want} inp={asdict(inp)}"
+            assert abs(b["adx_slope"][i] - c["adx_slope"]) < 1e-9, f"row {i}: adx_slope"
+    return 2*n
+
+def perturbed_profiles(seed:int=0)->Dict[str, Dict[str, Any]]:
+    """Defaults with every tunable field moved, so parity runs exercise the batch path's per-profile parameters."""
+    r = random.Random(seed); out = copy.deepcopy(_SWEEP_PROFILES_DEFAULT)
+    for p in out.values():
+        p.update(adx_min=r.choice([16, 19.5, 22, 31]), post_sweep_delay=r.randint(0, 6), require_vwap_flip=r.random() < .5,
+                 expected_vwap=r.choice(["support","resistance","flip","reclaim"]), bias_mode=r.choice(["continuation","reversal"]))
+        p["grade_weights"] = {k: r.randint(5, 40) for k in p["grade_weights"]}
+    return out
+
+if __name__ == "__main__":
+    print(f"parity ok: {check_batch_parity()} rows")
+    from profile_registry import ProfileSet
+    for seed in range(3):
+        prof = perturbed_profiles(seed)
+        print(f"parity ok (perturbed dict {seed}): {check_batch_parity(2000, seed + 1, prof)} rows, "
+              f"(ProfileSet): {check_batch_parity(2000, seed + 1, ProfileSet.from_dict(prof, 'perturbed'))} rows")
+    cols = inputs_to_columns(random_inputs(100_000, 1))
+    t0 = time.perf_counter(); evaluate_signals_batch(cols, "LONG"); t1 = time.perf_counter()
+    print(f"batch: 100k rows in {(t1-t0)*1e3:.1f} ms")
@@ -0,0 +1,122 @@
+# signal_logger.py — buffered, batched, multi-process-safe CSV logger with rotation and an optional Parquet sink
+from __future__ import annotations
+from typing import Optional, Dict, Any, List, Sequence
+import os, io, csv, time, atexit, threading, datetime as dt
+
+try:
+    import fcntl
+    def _lock(f): fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    def _unlock(f): fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+except ImportError:                                   # Windows
+    import msvcrt
+    def _lock(f):
+        f.seek(0)
+        while True:
+            try: msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1); return
+            except OSError: time.sleep(0.01)
+    def _unlock(f): f.seek(0); msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+from signal_engine_v3_11 import SIGNAL_LOG_FIELDS, TRADE_TICKET_FIELDS, signal_log_row, Inputs
+
+class SignalLogger:
+    """
+    Rows are buffered in memory and written in one locked append per flush. A flush happens when
+    `max_rows` are pending, when the oldest pending row is `max_age` seconds old (background thread),
+    on flush()/close() and at interpreter exit. If the CSV write fails the rows go back to the front of
+    the buffer and are retried on the next flush; background failures are counted in flush_errors.
+
+    rotate: None (single file), "day" (<stem>_YYYY-MM-DD.csv) or "size" (roll to <stem>.<n>.csv past max_bytes).
+    parquet_dir: if set, every flush also writes a part file there (needs pyarrow).
+    """
+    def __init__(self, path:str, fieldnames:Sequence[str], max_rows:int=500, max_age:float=1.0,
+                 rotate:Optional[str]=None, max_bytes:int=50_000_000, parquet_dir:Optional[str]=None):
+        if rotate not in (None, "day", "size"): raise ValueError(f"rotate must be None, 'day' or 'size', got {rotate!r}")
+        self.path, self.fieldnames = path, list(fieldnames)
+        self.max_rows, self.max_age, self.rotate, self.max_bytes = max_rows, max_age, rotate, max_bytes
+        self.parquet_dir = parquet_dir
+        if parquet_dir:
+            try: import pyarrow, pyarrow.parquet          # noqa: F401
+            except ImportError as e: raise ImportError("parquet_dir requires pyarrow (pip install pyarrow)") from e
+            os.makedirs(parquet_dir, exist_ok=True)
+        d = os.path.dirname(path)
+        if d: os.makedirs(d, exist_ok=True)
+        self._buf: List[Dict[str, Any]] = []; self._first = 0.0
+        self._lock = threading.Lock(); self._io = threading.Lock()
+        self._stop = threading.Event(); self.rows_written = 0; self.flushes = 0; self.flush_errors = 0
+        self._thread = threading.Thread(target=self._run, name="SignalLogger", daemon=True); self._thread.start()
+        atexit.register(self.close)
+
+    # --- public API ---
+    def log(self, row:Dict[str, Any]):
+        with self._lock:
+            if not self._buf: self._first = time.monotonic()
+            self._buf.append(row); full = len(self._buf) >= self.max_rows
+        if full: self.flush()
+    def log_signal(self, model, desired, res, inp:Inputs): self.log(signal_log_row(model, desired, res, inp))
+    def flush(self):
+        with self._lock: rows, self._buf, first = self._buf, [], self._first
+        if not rows: return
+        with self._io:
+            try: self._write_csv(rows)
+            except BaseException:
+                with self._lock:                 # put them back ahead of anything logged meanwhile; the next flush retries
+                    self._buf[:0] = rows; self._first = first
+                raise
+            self.rows_written += len(rows); self.flushes += 1
+            if self.parquet_dir: self._write_parquet(rows)     # the CSV already has these rows, so a failure here is not retried
+    def close(self):
+        if self._stop.is_set(): return
+        self._stop.set(); self._thread.join(timeout=5); self.flush()
+        atexit.unregister(self.close)
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+    def current_path(self, now:Optional[dt.datetime]=None)->str:
+        if self.rotate != "day": return self.path
+        stem, ext = os.path.splitext(self.path)
+        return f"{stem}_{(now or dt.datetime.utcnow()).date().isoformat()}{ext}"
+    def files(self)->List[str]:
+        """Every CSV this logger has produced, oldest first (for download / downstream readers)."""
+        d = os.path.dirname(self.path) or "."; stem, ext = os.path.splitext(os.path.basename(self.path))
+        out = [os.path.join(d, f) for f in os.listdir(d)
+               if f.endswith(ext) and (f == stem + ext or f.startswith(stem + "_") or f.startswith(stem + "."))]
+        return sorted(out, key=os.path.getmtime)
+
+    # --- internals ---
+    def _run(self):
+        tick = max(0.05, self.max_age/4)
+        while not self._stop.wait(tick):
+            with self._lock: due = bool(self._buf) and time.monotonic() - self._first >= self.max_age
+            if due:
+                try: self.flush()
+                except Exception: self.flush_errors += 1     # keep the flusher alive; flush() put the rows back for the next try
+    def _render(self, rows, header:bool)->str:
+        s = io.StringIO(); w = csv.DictWriter(s, fieldnames=self.fieldnames, extrasaction="ignore")
+        if header: w.writeheader()
+        w.writerows(rows); return s.getvalue()
+    def _write_csv(self, rows):
+        path = self.current_path()
+        with open(path, "a", newline="") as f:
+            _lock(f)                             # header check + size rotation happen under the cross-process lock
+            try:
+                if not os.path.exists(path) or os.fstat(f.fileno()).st_ino != os.stat(path).st_ino:
+                    _unlock(f); f.close()            # another process rotated it while we waited
+                    return self._write_csv(rows)
+                f.seek(0, os.SEEK_END)
+                if self.rotate == "size" and f.tell() >= self.max_bytes:
+                    stem, ext = os.path.splitext(path); n = 1
+                    while os.path.exists(f"{stem}.{n}{ext}"): n += 1
+                    os.replace(path, f"{stem}.{n}{ext}")
+                    _unlock(f); f.close()
+                    return self._write_csv(rows)
+                f.write(self._render(rows, header=f.tell() == 0)); f.flush()
+            finally:
+                if not f.closed: _unlock(f)
+    def _write_parquet(self, rows):
+        import pyarrow as pa, pyarrow.parquet as pq
+        cols = {k: [r.get(k) for r in rows] for k in self.fieldnames}
+        name = f"part-{dt.datetime.utcnow():%Y%m%dT%H%M%S%f}-{os.getpid()}.parquet"
+        pq.write_table(pa.table(cols), os.path.join(self.parquet_dir, name))
+
+def signal_logger(path:str="logs/lsf_signal_log.csv", **kw)->SignalLogger: return SignalLogger(path, SIGNAL_LOG_FIELDS, **kw)
+def trade_ticket_logger(path:str="logs/trade_tickets.csv", **kw)->SignalLogger: return SignalLogger(path, TRADE_TICKET_FIELDS, **kw)
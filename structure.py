@@ -0,0 +1,227 @@
+# structure.py — streaming session levels, liquidity sweeps, 3m MSS and 1m FVGs -> sweep/MSS Inputs fields
+#
+# Bars are 1m, exchange-local (ET) and stamped with their open time, as in indicators.py. Reference levels:
+#   Asia_High/Low        Asia range (18:00-02:00), live once London opens
+#   London_High/Low      London range (02:00-08:00), live once NY opens
+#   PDH/PDL              previous trading day (18:00 roll) high/low
+#   Midnight_High/Low    00:00 ET opening range (midnight_minutes long)
+#   Settlement_High/Low  the last settle_minutes before the 16:00 ET settlement, carried into the next day
+# A level is swept when a bar trades through it by sweep_ticks and closes back inside. A close beyond the level
+# is a break, and the level is retired either way. Each bar does a fixed amount of work (4 ranges, at most 10
+# levels, a 2*swing_len+1 pivot window), so a detector per instrument costs O(1) per bar.
+from __future__ import annotations
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Tuple
+import datetime as dt
+
+SWEEP_PRIORITY = ("PDH","PDL","London_High","London_Low","Asia_High","Asia_Low",
+                  "Settlement_High","Settlement_Low","Midnight_High","Midnight_Low")
+_HIGHS = frozenset(n for n in SWEEP_PRIORITY if n == "PDH" or n.endswith("_High"))
+
+@dataclass
+class StructureConfig:
+    tick: float = 0.25
+    sweep_ticks: float = 1.0           # penetration needed to count as a sweep
+    sweep_max_age: int = 90            # bars after which a sweep no longer sets sweep_type
+    roll_hour: int = 18
+    london_hour: int = 2; ny_hour: int = 8
+    midnight_minutes: int = 30
+    settle_hour: int = 16; settle_minutes: int = 15
+    mss_tf: int = 3                    # minutes per structure bar
+    swing_len: int = 1                 # pivot = higher/lower than swing_len structure bars on each side
+    fvg_min_ticks: float = 1.0
+    fvg_max_age: int = 10              # 1m bars an unfilled FVG counts as "present"
+
+def _tod(ts:dt.datetime, roll_hour:int)->int:
+    """Minutes since the trading-day roll."""
+    return ((ts.hour - roll_hour) % 24)*60 + ts.minute
+
+class _Range:
+    """High/low over a [start, end) window of the trading day (minutes since roll)."""
+    __slots__ = ("name","start","end","hi","lo","published")
+    def __init__(self, name:str, start:int, end:int):
+        self.name, self.start, self.end = name, start, end; self.reset()
+    def reset(self): self.hi = self.lo = None; self.published = False
+
+class LevelIndex:
+    """Reference levels for the current trading day; update() returns the (level, "SWEEP"|"BREAK") events of a bar."""
+    __slots__ = ("cfg","ranges","levels","day_hi","day_lo","_next_roll","_eps")
+    def __init__(self, cfg:Optional[StructureConfig]=None):
+        self.cfg = c = cfg or StructureConfig()
+        t = lambda h, m=0: ((h - c.roll_hour) % 24)*60 + m
+        settle = t(c.settle_hour)
+        self.ranges = [_Range("Asia", 0, t(c.london_hour)), _Range("London", t(c.london_hour), t(c.ny_hour)),
+                       _Range("Midnight", t(0), t(0) + c.midnight_minutes),
+                       _Range("Settlement", settle - c.settle_minutes, settle)]
+        self.levels: Dict[str, float] = {}          # live (unswept, unbroken) levels only
+        self.day_hi = self.day_lo = None; self._next_roll = None; self._eps = c.sweep_ticks*c.tick - 1e-9
+    def _roll(self, ts:dt.datetime):
+        if self.day_hi is not None: self.levels["PDH"], self.levels["PDL"] = self.day_hi, self.day_lo
+        else: self.levels.pop("PDH", None); self.levels.pop("PDL", None)
+        for k in ("Asia_High","Asia_Low","London_High","London_Low","Midnight_High","Midnight_Low"): self.levels.pop(k, None)
+        for r in self.ranges: r.reset()
+        self.day_hi = self.day_lo = None
+        nxt = ts.replace(hour=self.cfg.roll_hour, minute=0, second=0, microsecond=0)
+        self._next_roll = nxt if nxt > ts else nxt + dt.timedelta(days=1)
+    def update(self, bar)->List[Tuple[str,str]]:
+        if self._next_roll is None or bar.ts >= self._next_roll: self._roll(bar.ts)
+        tod = _tod(bar.ts, self.cfg.roll_hour)
+        for r in self.ranges:
+            if r.start <= tod < r.end:
+                r.hi = bar.high if r.hi is None else max(r.hi, bar.high)
+                r.lo = bar.low if r.lo is None else min(r.lo, bar.low)
+            elif tod >= r.end and not r.published and r.hi is not None:
+                self.levels[r.name + "_High"], self.levels[r.name + "_Low"] = r.hi, r.lo; r.published = True
+        events = []
+        for name, px in list(self.levels.items()):
+            if name in _HIGHS:
+                if bar.high - px >= self._eps: events.append((name, "SWEEP" if bar.close < px else "BREAK")); del self.levels[name]
+            elif px - bar.low >= self._eps: events.append((name, "SWEEP" if bar.close > px else "BREAK")); del self.levels[name]
+        self.day_hi = bar.high if self.day_hi is None else max(self.day_hi, bar.high)
+        self.day_lo = bar.low if self.day_lo is None else min(self.day_lo, bar.low)
+        return events
+
+class StructureDetector:
+    """
+    Per-instrument sweep / MSS / FVG state. Feed 1m bars with update(); context() gives the Inputs fields
+    sweep_type, bars_since_sweep, mss_dir and micro_fvg_present.
+    """
+    def __init__(self, cfg:Optional[StructureConfig]=None):
+        self.cfg = cfg = cfg or StructureConfig()
+        self.index = LevelIndex(cfg)
+        self.n = 0
+        self.sweep_type: Optional[str] = None; self.sweep_bar = -1
+        # structure (mss_tf) bars
+        self._bucket = None; self._sb: Optional[List[float]] = None          # [high, low, close]
+        self._piv: deque = deque(maxlen=2*cfg.swing_len + 1)
+        self.swing_high: Optional[float] = None; self.swing_low: Optional[float] = None
+        self.mss_dir: Optional[str] = None; self.mss_bar = -1
+        # 1m FVGs: (bar index, low edge, high edge) of the latest unfilled gap each way
+        self._prev: deque = deque(maxlen=2)
+        self.bull_fvg: Optional[Tuple[int,float,float]] = None; self.bear_fvg: Optional[Tuple[int,float,float]] = None
+    def update(self, bar)->"StructureDetector":
+        cfg = self.cfg; i = self.n; self.n += 1
+        # sweeps: highest-priority level swept on this bar wins
+        swept = [name for name, kind in self.index.update(bar) if kind == "SWEEP"]
+        if swept:
+            self.sweep_type = min(swept, key=SWEEP_PRIORITY.index); self.sweep_bar = i
+        # fair-value gaps (3-bar imbalance), retired once price trades back through them
+        if self.bull_fvg and bar.low <= self.bull_fvg[1]: self.bull_fvg = None
+        if self.bear_fvg and bar.high >= self.bear_fvg[2]: self.bear_fvg = None
+        if len(self._prev) == 2:
+            h2, l2 = self._prev[0]; gap = cfg.fvg_min_ticks*cfg.tick - 1e-9
+            if bar.low - h2 >= gap: self.bull_fvg = (i, h2, bar.low)
+            elif l2 - bar.high >= gap: self.bear_fvg = (i, bar.high, l2)
+        self._prev.append((bar.high, bar.low))
+        # structure bars: close a bucket when its last minute arrives (or when a gap skips past it)
+        m = bar.ts.toordinal()*1440 + bar.ts.hour*60 + bar.ts.minute; b = m // cfg.mss_tf
+        if self._bucket is not None and b != self._bucket: self._close_structure_bar(i)
+        if self._sb is None: self._sb = [bar.high, bar.low, bar.close]; self._bucket = b
+        else: sb = self._sb; sb[0] = max(sb[0], bar.high); sb[1] = min(sb[1], bar.low); sb[2] = bar.close
+        if (m + 1) % cfg.mss_tf == 0: self._close_structure_bar(i)
+        return self
+    def _close_structure_bar(self, i:int):
+        h, l, c = self._sb; self._sb = None; self._bucket = None
+        if self.swing_high is not None and c > self.swing_high: self.mss_dir = "LONG"; self.mss_bar = i; self.swing_high = None
+        elif self.swing_low is not None and c < self.swing_low: self.mss_dir = "SHORT"; self.mss_bar = i; self.swing_low = None
+        piv = self._piv; piv.append((h, l))
+        if len(piv) == piv.maxlen:
+            k = self.cfg.swing_len; ph, pl = piv[k]
+            if all(ph > x[0] for j, x in enumerate(piv) if j != k): self.swing_high = ph
+            if all(pl < x[1] for j, x in enumerate(piv) if j != k): self.swing_low = pl
+    @property
+    def bars_since_sweep(self)->Optional[int]: return self.n - 1 - self.sweep_bar if self.sweep_bar >= 0 else None
+    def fvg_present(self, direction:Optional[str]=None)->bool:
+        lim = self.n - 1 - self.cfg.fvg_max_age
+        bull = self.bull_fvg is not None and self.bull_fvg[0] >= lim
+        bear = self.bear_fvg is not None and self.bear_fvg[0] >= lim
+        return bull if direction == "LONG" else bear if direction == "SHORT" else (bull or bear)
+    def context(self)->Dict[str, Any]:
+        """Inputs fields; micro_fvg_present follows mss_dir (either side while there is no MSS yet)."""
+        age = self.bars_since_sweep; live = age is not None and age <= self.cfg.sweep_max_age
+        return {"sweep_type": self.sweep_type if live else None, "bars_since_sweep": age if live else 0,
+                "mss_dir": self.mss_dir, "micro_fvg_present": self.fvg_present(self.mss_dir)}
+    def snapshot(self)->Dict[str, Any]:
+        return {**self.context(), "levels": dict(self.index.levels), "swing_high": self.swing_high,
+                "swing_low": self.swing_low, "bull_fvg": self.bull_fvg, "bear_fvg": self.bear_fvg}
+
+# --- reference: recompute everything from the full history on every bar (O(n) per bar) ---
+def naive_context(bars:list, cfg:Optional[StructureConfig]=None)->Dict[str, Any]:
+    cfg = cfg or StructureConfig(); roll = cfg.roll_hour; eps = cfg.sweep_ticks*cfg.tick - 1e-9
+    t = lambda h, m=0: ((h - roll) % 24)*60 + m
+    wins = {"Asia": (0, t(cfg.london_hour)), "London": (t(cfg.london_hour), t(cfg.ny_hour)),
+            "Midnight": (t(0), t(0) + cfg.midnight_minutes), "Settlement": (t(cfg.settle_hour) - cfg.settle_minutes, t(cfg.settle_hour))}
+    def day_of(ts): return (ts - dt.timedelta(hours=roll)).date()
+    levels: Dict[str, float] = {}; sweep_type, sweep_bar = None, -1
+    for i, b in enumerate(bars):
+        d = day_of(b.ts); tod = _tod(b.ts, roll)
+        if i == 0 or d != day_of(bars[i-1].ts):
+            for k in [k for k in levels if not k.startswith("Settlement")]: del levels[k]
+            prev = [x for x in bars[:i] if day_of(x.ts) == day_of(bars[i-1].ts)] if i else []
+            if prev: levels["PDH"], levels["PDL"] = max(x.high for x in prev), min(x.low for x in prev)
+            published = set()
+        for name, (s, e) in wins.items():
+            if tod >= e and name not in published:
+                inside = [x for x in bars[:i] if day_of(x.ts) == d and s <= _tod(x.ts, roll) < e]
+                if inside: levels[name + "_High"], levels[name + "_Low"] = max(x.high for x in inside), min(x.low for x in inside); published.add(name)
+        swept = []
+        for name, px in list(levels.items()):
+            hi = name in _HIGHS
+            if (b.high - px >= eps) if hi else (px - b.low >= eps):
+                if (b.close < px) if hi else (b.close > px): swept.append(name)
+                del levels[name]
+        if swept: sweep_type, sweep_bar = min(swept, key=SWEEP_PRIORITY.index), i
+    n = len(bars); age = n - 1 - sweep_bar if sweep_bar >= 0 else None
+    live = age is not None and age <= cfg.sweep_max_age
+    # structure bars + pivots + breaks
+    sbars, cur, cb = [], None, None
+    for i, b in enumerate(bars):
+        m = b.ts.toordinal()*1440 + b.ts.hour*60 + b.ts.minute; bk = m // cfg.mss_tf
+        if cur is not None and bk != cb: sbars.append((cur, i)); cur = None
+        cur = [b.high, b.low, b.close] if cur is None else [max(cur[0], b.high), min(cur[1], b.low), b.close]; cb = bk
+        if (m + 1) % cfg.mss_tf == 0: sbars.append((cur, i)); cur = None
+    k = cfg.swing_len; sh = sl = None; mss = None
+    for j, (sb, _) in enumerate(sbars):
+        if sh is not None and sb[2] > sh: mss, sh = "LONG", None
+        elif sl is not None and sb[2] < sl: mss, sl = "SHORT", None
+        if j >= 2*k:
+            w = [x[0] for x in sbars[j-2*k:j+1]]; ph, pl = w[k][0], w[k][1]
+            if all(ph > x[0] for q, x in enumerate(w) if q != k): sh = ph
+            if all(pl < x[1] for q, x in enumerate(w) if q != k): sl = pl
+    # latest unfilled FVG each way
+    bull = bear = None; gap = cfg.fvg_min_ticks*cfg.tick - 1e-9
+    for i, b in enumerate(bars):
+        if bull and b.low <= bull[1]: bull = None
+        if bear and b.high >= bear[2]: bear = None
+        if i >= 2:
+            if b.low - bars[i-2].high >= gap: bull = (i, bars[i-2].high, b.low)
+            elif bars[i-2].low - b.high >= gap: bear = (i, b.high, bars[i-2].low)
+    lim = n - 1 - cfg.fvg_max_age
+    fb, fs = bull is not None and bull[0] >= lim, bear is not None and bear[0] >= lim
+    fvg = fb if mss == "LONG" else fs if mss == "SHORT" else (fb or fs)
+    return {"sweep_type": sweep_type if live else None, "bars_since_sweep": age if live else 0, "mss_dir": mss, "micro_fvg_present": fvg}
+
+def check_against_naive(n:int=3000, step:int=37, seed:int=3)->int:
+    """Streaming context() must equal the full-history recompute at every `step`-th bar; returns bars checked."""
+    from indicators import synthetic_bars
+    bars = list(synthetic_bars(n, seed=seed)); det = StructureDetector(); checked = 0
+    for i, b in enumerate(bars):
+        det.update(b)
+        if i % step == 0 or i == n - 1:
+            exp = naive_context(bars[:i+1])
+            assert det.context() == exp, (i, b.ts, det.context(), exp); checked += 1
+    return checked
+
+def bench(n_bars:int=50_000, n_symbols:int=50):
+    import time
+    from indicators import synthetic_bars
+    bars = list(synthetic_bars(n_bars))
+    det = StructureDetector(); t0 = time.perf_counter()
+    for b in bars: det.update(b); det.context()
+    el = time.perf_counter() - t0
+    print(f"structure: {n_bars/el:,.0f} bars/s per core ({1e6*el/n_bars:.1f} us/bar -> {n_symbols} symbols at 1m bars use {100*n_symbols*el/n_bars/60:.4f}% of a core)")
+
+if __name__ == "__main__":
+    print(f"naive parity ok: {check_against_naive()} checkpoints")
+    bench()
@@ -0,0 +1,180 @@
+# targets.py — vectorized CISD-deviation target / R:R surface, optionally scored against historical bar paths
+#
+# A surface is the grid  entry offset (points) x stop distance (points) x σ multiplier. Every cell applies
+# compute_targets' rules in one NumPy pass: the base is the entry (ensure=True) or the anchor, TP = base ± m·dev,
+# nudged to at least one tick beyond the entry, and rounded to cents. R:R is computed like rr(). Offsets are
+# in the trade's favour: LONG enters at ref - offset and SHORT at ref + offset, so a negative offset chases.
+from __future__ import annotations
+from typing import Optional, Dict, Any, Sequence
+import numpy as np
+
+from signal_engine_v3_11 import TICK, compute_targets, rr
+
+def target_surface(ref:float, side:str, dev:float, mults:Sequence[float], stops:Sequence[float],
+                   offsets:Sequence[float]=(0.0,), anchor:Optional[float]=None, ensure:bool=True, tick:float=TICK)->Dict[str, np.ndarray]:
+    """
+    Arrays shaped (len(offsets), len(stops), len(mults)): entry, sl, tp, rr. The axes come back as
+    "offset", "stop" and "mult". rr is NaN where the risk is not positive, which rr() reports as None.
+    """
+    sign = 1.0 if side == "LONG" else -1.0
+    o = np.asarray(offsets, float)[:, None, None]; s = np.asarray(stops, float)[None, :, None]; m = np.asarray(mults, float)[None, None, :]
+    entry = ref - sign*o
+    base = entry if ensure else np.asarray(ref if anchor is None else anchor, float)
+    tp = base + sign*m*dev
+    if ensure: tp = np.maximum(tp, entry + tick) if side == "LONG" else np.minimum(tp, entry - tick)
+    tp = np.round(tp, 2)
+    sl = entry - sign*s
+    risk = sign*(entry - sl); reward = sign*(tp - entry)
+    with np.errstate(divide="ignore", invalid="ignore"): r = np.where(risk > 0, np.round(reward/risk, 2), np.nan)
+    shape = (o.size, s.size, m.size)
+    return {"offset": o.ravel(), "stop": s.ravel(), "mult": m.ravel(), "side": side, "ref": ref, "dev": dev, "ensure": ensure,
+            "entry": np.broadcast_to(entry, shape), "sl": np.broadcast_to(sl, shape), "tp": np.broadcast_to(tp, shape),
+            "rr": np.broadcast_to(r, shape)}
+
+def _first_at_least(cum:np.ndarray, thresholds:np.ndarray)->np.ndarray:
+    """
+    Index of the first bar whose value reaches the threshold, for many thresholds per row and many rows at once.
+    `cum` is (P, H) and non-decreasing along each row; `thresholds` is (P, K). Returns (P, K), and H when never reached.
+    Each row is lifted by row*span so the flattened array stays sorted, which allows one searchsorted for all rows.
+    """
+    P, H = cum.shape
+    lo = min(np.nanmin(np.where(np.isfinite(cum), cum, np.inf)), np.nanmin(thresholds))
+    hi = max(np.nanmax(np.where(np.isfinite(cum), cum, -np.inf)), np.nanmax(thresholds))
+    span = (hi - lo) + 2.0
+    lift = (np.arange(P, dtype=float)*span)[:, None]
+    flat = (np.clip(cum, lo - 0.5, hi + 0.5) - lo + lift).ravel()
+    idx = np.searchsorted(flat, (thresholds - lo + lift).ravel(), side="left").reshape(thresholds.shape)
+    return np.minimum(idx - (np.arange(P)*H)[:, None], H)
+
+def score_surface(surf:Dict[str, np.ndarray], high:np.ndarray, low:np.ndarray, close:np.ndarray,
+                  entries:Sequence[int], horizon:int=120, fill_bars:int=5, chunk_cells:int=1 << 21)->Dict[str, np.ndarray]:
+    """
+    Scores every cell over historical paths. Each entry index i is a hypothetical signal at close[i],
+    and the surface's ref/anchor is re-based to that close. The limit entry must fill within `fill_bars`
+    bars after i. From the fill bar to i+horizon, whichever of TP and SL is touched first wins. When both
+    are touched on the same bar, the SL wins (conservative). A limit fill bar only counts toward the SL:
+    its high/low order is unknown, so its TP-side extreme may have printed before the fill. Paths that hit neither are marked to market
+    at the last close. Adds fill_rate, p_tp, p_sl, p_open, exp_r and n (paths scored), each shaped like
+    the surface. Paths are scored in chunks of about chunk_cells path x cell elements and the counts are
+    summed, so peak memory does not grow with len(entries).
+    """
+    side = surf["side"]
+    offs, stops, mults = surf["offset"], surf["stop"], surf["mult"]
+    entries = np.asarray([i for i in entries if i + horizon < len(close)], dtype=np.int64)
+    P = len(entries); shape = (offs.size, stops.size, mults.size)
+    out = {k: np.full(shape, np.nan) for k in ("fill_rate","p_tp","p_sl","p_open","exp_r")}; out["n"] = np.zeros(shape, np.int64)
+    if not P: return {**surf, **out}
+    # work in LONG terms: a SHORT is a LONG on the negated series (high/low swap)
+    win = entries[:, None] + 1 + np.arange(horizon)[None, :]                 # (P, H) forward bar indices
+    if side == "LONG": hi, lo, cl, ref = high[win], low[win], close[win][:, -1], close[entries]
+    else: hi, lo, cl, ref = -low[win], -high[win], -close[win][:, -1], -close[entries]
+    hi = hi - ref[:, None]; lo = lo - ref[:, None]; cl = cl - ref                # excursions relative to the signal close
+    cmin_all = np.minimum.accumulate(lo, axis=1)
+    H = horizon; step = max(1, chunk_cells//max(1, stops.size*mults.size))
+    for a, o in enumerate(offs):
+        # fill: first bar (within fill_bars) that trades through entry = -o; o <= 0 fills at the signal close
+        if o > 0: fill = np.minimum(_first_at_least(-cmin_all, np.full((P, 1), o))[:, 0], H)
+        else: fill = np.zeros(P, np.int64)
+        filled = fill < min(fill_bars, H) if o > 0 else np.ones(P, bool)
+        if not filled.any(): out["fill_rate"][a] = 0.0; continue
+        e = -o                                                                  # entry relative to ref
+        tp_rel = surf["tp"][a, 0, :] - surf["entry"][a, 0, :]                   # per-mult distance entry -> TP (side-signed)
+        tp_rel = tp_rel if side == "LONG" else -tp_rel
+        rr_c = surf["rr"][a][None, :, :]
+        idx = np.flatnonzero(filled); Pf = len(idx); sums = np.zeros((4,) + shape[1:])
+        for j in range(0, Pf, step):                                            # (chunk, S, M) temporaries stay under chunk_cells
+            k = idx[j:j + step]; f = fill[k]; h, l, c = hi[k], lo[k], cl[k]; n = len(k)
+            bar = np.arange(H)[None, :]
+            cmax = np.maximum.accumulate(np.where(bar >= f[:, None] + (o > 0), h, -np.inf), axis=1)   # TP from the bar after the fill
+            cmin = np.minimum.accumulate(np.where(bar >= f[:, None], l, np.inf), axis=1)
+            tp_idx = _first_at_least(cmax, np.broadcast_to(e + tp_rel, (n, mults.size)))           # (n, M)
+            sl_idx = _first_at_least(-cmin, np.broadcast_to(-(e - stops), (n, stops.size)))       # (n, S)
+            t, s = tp_idx[:, None, :], sl_idx[:, :, None]                                          # -> (n, S, M)
+            hit_tp = t < s; hit_sl = (s <= t) & (s < H)
+            mtm = ((c - e)[:, None, None]/stops[None, :, None])
+            r = np.where(hit_tp, rr_c, np.where(hit_sl, -1.0, mtm))
+            sums[0] += hit_tp.sum(0); sums[1] += hit_sl.sum(0); sums[2] += r.sum(0)
+        sums[3] = Pf - sums[0] - sums[1]
+        out["fill_rate"][a] = Pf/P; out["n"][a] = Pf
+        out["p_tp"][a] = sums[0]/Pf; out["p_sl"][a] = sums[1]/Pf; out["p_open"][a] = sums[3]/Pf
+        out["exp_r"][a] = sums[2]/P                     # unfilled signals contribute 0R
+    for k in ("p_tp","p_sl","p_open","exp_r"): out[k][:, stops <= 0, :] = np.nan
+    return {**surf, **out}
+
+def surface_frame(surf:Dict[str, Any]):
+    """Long-form DataFrame (one row per cell), as consumed by heatmaps."""
+    import pandas as pd
+    shape = surf["entry"].shape
+    o, s, m = np.meshgrid(surf["offset"], surf["stop"], surf["mult"], indexing="ij")
+    cols = {"offset": o.ravel(), "stop": s.ravel(), "mult": m.ravel()}
+    for k, v in surf.items():
+        if isinstance(v, np.ndarray) and v.shape == shape: cols[k] = v.ravel()
+    return pd.DataFrame(cols)
+
+def grid(lo:float, hi:float, step:float)->np.ndarray:
+    """Inclusive arange that does not drop `hi` to float error."""
+    return np.round(np.arange(lo, hi + step/2, step), 6)
+
+# --- checks ---
+def check_surface_parity(n:int=200, seed:int=0)->int:
+    """Every cell of random surfaces must equal compute_targets()/rr() called one cell at a time; returns cells checked."""
+    rng = np.random.default_rng(seed); cells = 0
+    for _ in range(n):
+        side = "LONG" if rng.random() < .5 else "SHORT"; ensure = bool(rng.random() < .7)
+        ref = round(rng.uniform(4000, 26000)*4)/4; dev = round(rng.uniform(0, 30)*4)/4; anchor = ref + round(rng.normal(0, 40)*4)/4
+        mults = np.round(rng.uniform(-1, 6, 5), 2); stops = np.round(rng.uniform(-2, 40, 4)*4)/4; offs = np.round(rng.uniform(-8, 8, 3)*4)/4
+        s = target_surface(ref, side, dev, mults, stops, offs, anchor, ensure)
+        for a, o in enumerate(offs):
+            for b, st in enumerate(stops):
+                for c, m in enumerate(mults):
+                    entry = ref - (o if side == "LONG" else -o); sl = entry - st if side == "LONG" else entry + st
+                    t1, _ = compute_targets(anchor, dev, m, m, side, entry, ensure)
+                    want_rr = rr(entry, sl, t1, side)
+                    assert s["tp"][a, b, c] == t1 and abs(s["entry"][a, b, c] - entry) < 1e-9, (side, ensure, ref, dev, o, st, m, s["tp"][a, b, c], t1)
+                    got = s["rr"][a, b, c]
+                    assert (want_rr is None and np.isnan(got)) or got == want_rr, (side, entry, sl, t1, got, want_rr)
+                    cells += 1
+    return cells
+
+def naive_score(surf, high, low, close, entries, horizon=120, fill_bars=5):
+    """Bar-by-bar loop with the same rules as score_surface, used only to check it."""
+    side = surf["side"]; sg = 1 if side == "LONG" else -1
+    entries = [i for i in entries if i + horizon < len(close)]
+    shape = surf["entry"].shape; exp = np.zeros(shape); ptp = np.zeros(shape); fills = np.zeros(shape[0])
+    for a, o in enumerate(surf["offset"]):
+        for i in entries:
+            ref = close[i]; e = ref - sg*o; f = 0
+            if o > 0:
+                f = next((k for k in range(min(fill_bars, horizon)) if (low[i+1+k] <= e if side == "LONG" else high[i+1+k] >= e)), None)
+                if f is None: continue
+            fills[a] += 1
+            for b, st in enumerate(surf["stop"]):
+                for c, _ in enumerate(surf["mult"]):
+                    tp = ref - sg*o + (surf["tp"][a, b, c] - surf["entry"][a, b, c]); sl = e - sg*st; res = None
+                    for k in range(f, horizon):
+                        j = i + 1 + k
+                        hit_sl = low[j] <= sl if side == "LONG" else high[j] >= sl
+                        hit_tp = k > f if o > 0 else True
+                        hit_tp = hit_tp and (high[j] >= tp if side == "LONG" else low[j] <= tp)
+                        if hit_sl: res = -1.0; break
+                        if hit_tp: res = surf["rr"][a, b, c]; ptp[a, b, c] += 1; break
+                    if res is None: res = sg*(close[i + horizon] - e)/st
+                    exp[a, b, c] += res
+    n = len(entries)
+    return exp/n, ptp/np.maximum(fills, 1)[:, None, None], fills/n
+
+if __name__ == "__main__":
+    import time
+    from indicators import synthetic_bars
+    print(f"parity ok: {check_surface_parity()} cells")
+    bars = list(synthetic_bars(30_000, seed=5))
+    high = np.array([b.high for b in bars]); low = np.array([b.low for b in bars]); close = np.array([b.close for b in bars])
+    small = target_surface(close[0], "SHORT", 12.5, grid(0.5, 4, 0.5), grid(5, 25, 5), [-2, 0, 3])
+    sc = score_surface(small, high, low, close, range(100, 3000, 37), horizon=60)
+    ne, nt, nf = naive_score(small, high, low, close, range(100, 3000, 37), horizon=60)
+    assert np.allclose(sc["exp_r"], ne) and np.allclose(sc["p_tp"], nt) and np.allclose(sc["fill_rate"][:, 0, 0], nf), "score_surface != naive"
+    print("scoring matches the bar-by-bar loop")
+    t0 = time.perf_counter()
+    s = target_surface(close[0], "LONG", 12.5, grid(0.25, 8, 0.25), grid(2, 40, 1), grid(-4, 4, 1))
+    t1 = time.perf_counter(); s = score_surface(s, high, low, close, range(200, 29_000, 30), horizon=120); t2 = time.perf_counter()
+    print(f"{s['rr'].size:,} cells: surface {1e3*(t1-t0):.1f} ms, scored over {int(s['n'].max()):,} paths in {1e3*(t2-t1):.0f} ms")
@@ -0,0 +1,194 @@
+# telemetry.py — opt-in gate telemetry for the signal engine (pass/fail per gate, eval-time histograms, auto-model overrides)
+#
+#   import telemetry; tel = telemetry.enable()        # process-wide; every evaluate_signal* call is recorded
+#   ...; tel.write_prometheus("metrics/lsf.prom")     # node_exporter textfile-collector format
+#   telemetry.disable()
+# While disabled the engine pays one global `is None` check per call.
+from __future__ import annotations
+from bisect import bisect_left
+from typing import Optional, Dict, Any, List, Tuple
+import os, threading, time
+import numpy as np
+
+import signal_engine_v3_11 as eng
+from signal_engine_v3_11 import GATE_NAMES
+
+# upper bounds (seconds) of the eval-time buckets; the last bucket is +Inf
+TIME_BUCKETS = (1e-6, 2e-6, 5e-6, 1e-5, 2e-5, 5e-5, 1e-4, 2e-4, 5e-4, 1e-3, 5e-3, 2e-2)
+_N = len(GATE_NAMES)
+
+class TimeHistogram:
+    """Cumulative fixed-bucket histogram (Prometheus semantics); callers hold the owner's lock."""
+    __slots__ = ("counts","n","total")
+    def __init__(self): self.counts = [0]*(len(TIME_BUCKETS) + 1); self.n = 0; self.total = 0.0
+    def record(self, seconds:float, n:int=1):
+        self.counts[bisect_left(TIME_BUCKETS, seconds/n)] += n; self.n += n; self.total += seconds
+    def quantile(self, q:float)->float:
+        """Upper bound of the bucket holding the q-quantile (inf when it falls in the overflow bucket)."""
+        if not self.n: return float("nan")
+        seen, target = 0, q*self.n
+        for b, c in enumerate(self.counts):
+            seen += c
+            if seen >= target: return TIME_BUCKETS[b] if b < len(TIME_BUCKETS) else float("inf")
+        return float("inf")
+
+class GateTelemetry:
+    """
+    Aggregates keyed by (archetype, session, direction): evaluations, entry-ready count and per-gate passes
+    (fails = evaluations - passes). Also eval-time histograms per path ("scalar" rows, "batch" rows
+    timed per call and spread over the rows, "table" for decision-table lookups) and auto_model_from_context overrides keyed by
+    (selected liquidity_model, routed model). One lock guards all of it; each record is a handful of adds.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.gates: Dict[Tuple[str,str,str], List[int]] = {}     # key -> [evals, ready, pass_0 .. pass_5]
+        self.overrides: Dict[Tuple[str,str], int] = {}
+        self.times: Dict[str, TimeHistogram] = {"scalar": TimeHistogram(), "batch": TimeHistogram(), "table": TimeHistogram()}
+        self.started = time.time()
+    # --- engine hooks ---
+    def observe(self, desired, inp, profiles):
+        t0 = time.perf_counter(); r = eng._evaluate(desired, inp, profiles); el = time.perf_counter() - t0
+        model, _, d, m, v, a, b, mi = r[:8]
+        key = (model, inp.session, desired)
+        with self._lock:
+            c = self.gates.get(key)
+            if c is None: c = self.gates[key] = [0]*(_N + 2)
+            c[0] += 1; c[1] += d and m and v and a and b and mi
+            c[2] += d; c[3] += m; c[4] += v; c[5] += a; c[6] += b; c[7] += mi
+            if model != inp.liquidity_model:
+                k = (inp.liquidity_model, model); self.overrides[k] = self.overrides.get(k, 0) + 1
+            self.times["scalar"].record(el)
+        return r
+    def record(self, model, session, desired, selected, res:Dict[str, Any], seconds:float, path:str="table"):
+        """One decision made outside the engine (decision-table lookups); `res` holds entry_ready and the gate bools."""
+        key = (model, session, desired)
+        with self._lock:
+            c = self.gates.get(key)
+            if c is None: c = self.gates[key] = [0]*(_N + 2)
+            c[0] += 1; c[1] += res["entry_ready"]
+            for i, g in enumerate(GATE_NAMES): c[2+i] += res[g]
+            if model != selected: k = (selected, model); self.overrides[k] = self.overrides.get(k, 0) + 1
+            self.times[path].record(seconds)
+    def observe_batch(self, out:Dict[str, np.ndarray], session, desired, liquidity_model, seconds:float):
+        n = len(out["grade"])
+        if not n: return
+        model = np.asarray(out["model_used"], dtype=object)
+        session = np.broadcast_to(np.asarray(session, dtype=object), (n,)); desired = np.broadcast_to(np.asarray(desired, dtype=object), (n,))
+        keys = np.array([f"{x}\0{y}\0{z}" for x, y, z in zip(model.tolist(), session.tolist(), desired.tolist())], dtype=object)
+        u, inv = np.unique(keys, return_inverse=True)
+        cols = [np.bincount(inv, minlength=len(u)), np.bincount(inv, np.asarray(out["entry_ready"], float), len(u))]
+        cols += [np.bincount(inv, np.asarray(out[g], float), len(u)) for g in GATE_NAMES]
+        counts = np.rint(np.vstack(cols)).astype(np.int64).T.tolist()
+        lm = np.broadcast_to(np.asarray(liquidity_model, dtype=object), (n,))
+        ov = model != lm
+        ok, oc = (np.unique(np.array([f"{x}\0{y}" for x, y in zip(lm[ov].tolist(), model[ov].tolist())], dtype=object), return_counts=True)
+                  if ov.any() else ((), ()))
+        with self._lock:
+            for k, row in zip(u.tolist(), counts):
+                key = tuple(k.split("\0")); c = self.gates.get(key)
+                if c is None: self.gates[key] = row
+                else: self.gates[key] = [x + y for x, y in zip(c, row)]
+            for k, cnt in zip(list(ok), list(oc)):
+                key = tuple(k.split("\0")); self.overrides[key] = self.overrides.get(key, 0) + int(cnt)
+            self.times["batch"].record(seconds, n)
+    # --- reading ---
+    def reset(self):
+        with self._lock:
+            self.gates.clear(); self.overrides.clear()
+            for h in self.times.values(): h.__init__()
+            self.started = time.time()
+    def gate_rows(self)->List[Dict[str, Any]]:
+        """One row per (archetype, session, direction): evaluations, ready rate, pass rate per gate."""
+        with self._lock: snap = {k: list(v) for k, v in self.gates.items()}
+        rows = []
+        for (model, session, direction), c in sorted(snap.items()):
+            n = c[0]
+            rows.append({"archetype": model, "session": session, "direction": direction, "evaluations": n,
+                         "entry_ready": round(c[1]/n, 3), **{g: round(c[2+i]/n, 3) for i, g in enumerate(GATE_NAMES)}})
+        return rows
+    def blocking_gates(self)->List[Dict[str, Any]]:
+        """Fail counts per gate across all keys, most-rejecting gate first."""
+        with self._lock: snap = [list(v) for v in self.gates.values()]
+        tot = sum(c[0] for c in snap)
+        fails = {g: sum(c[0] - c[2+i] for c in snap) for i, g in enumerate(GATE_NAMES)}
+        return [{"gate": g, "fails": f, "fail_rate": round(f/tot, 3) if tot else None} for g, f in sorted(fails.items(), key=lambda x: -x[1])]
+    def override_rows(self)->List[Dict[str, Any]]:
+        with self._lock: snap = dict(self.overrides)
+        return [{"selected": s, "routed_to": r, "count": n} for (s, r), n in sorted(snap.items(), key=lambda x: -x[1])]
+    def timing_rows(self)->List[Dict[str, Any]]:
+        with self._lock: snap = {p: (h.n, h.total, h.quantile(0.5), h.quantile(0.99)) for p, h in self.times.items()}
+        return [{"path": p, "evaluations": n, "mean_us": round(1e6*tot/n, 2) if n else None,
+                 "p50_le_us": round(1e6*p50, 1) if n else None, "p99_le_us": round(1e6*p99, 1) if n else None}
+                for p, (n, tot, p50, p99) in snap.items()]
+    # --- export ---
+    def prometheus(self, prefix:str="lsf")->str:
+        esc = lambda s: str(s).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        lab = lambda **kw: "{" + ",".join(f'{k}="{esc(v)}"' for k, v in kw.items()) + "}"
+        with self._lock:
+            gates = {k: list(v) for k, v in self.gates.items()}; overrides = dict(self.overrides)
+            times = {p: (list(h.counts), h.n, h.total) for p, h in self.times.items()}
+        out = [f"# HELP {prefix}_evaluations_total Signal evaluations.", f"# TYPE {prefix}_evaluations_total counter"]
+        out += [f"{prefix}_evaluations_total{lab(archetype=m, session=s, direction=d)} {c[0]}" for (m, s, d), c in sorted(gates.items())]
+        out += [f"# HELP {prefix}_entry_ready_total Evaluations with every gate passing.", f"# TYPE {prefix}_entry_ready_total counter"]
+        out += [f"{prefix}_entry_ready_total{lab(archetype=m, session=s, direction=d)} {c[1]}" for (m, s, d), c in sorted(gates.items())]
+        for name, pick in (("gate_pass", lambda c, i: c[2+i]), ("gate_fail", lambda c, i: c[0] - c[2+i])):
+            out += [f"# HELP {prefix}_{name}_total Per-gate {name.split('_')[1]} count.", f"# TYPE {prefix}_{name}_total counter"]
+            out += [f"{prefix}_{name}_total{lab(archetype=m, session=s, direction=d, gate=g)} {pick(c, i)}"
+                    for (m, s, d), c in sorted(gates.items()) for i, g in enumerate(GATE_NAMES)]
+        out += [f"# HELP {prefix}_auto_model_overrides_total auto_model_from_context routing away from the selected model.",
+                f"# TYPE {prefix}_auto_model_overrides_total counter"]
+        out += [f"{prefix}_auto_model_overrides_total{lab(selected=s, routed=r)} {n}" for (s, r), n in sorted(overrides.items())]
+        out += [f"# HELP {prefix}_eval_seconds Evaluation time per row.", f"# TYPE {prefix}_eval_seconds histogram"]
+        for p, (counts, n, total) in times.items():
+            cum = 0
+            for b, c in enumerate(counts):
+                cum += c; le = repr(TIME_BUCKETS[b]) if b < len(TIME_BUCKETS) else "+Inf"
+                out.append(f"{prefix}_eval_seconds_bucket{lab(path=p, le=le)} {cum}")
+            out += [f"{prefix}_eval_seconds_sum{lab(path=p)} {total!r}", f"{prefix}_eval_seconds_count{lab(path=p)} {n}"]
+        return "\n".join(out) + "\n"
+    def write_prometheus(self, path:str, prefix:str="lsf")->str:
+        """Atomic write (tmp + rename) so a textfile collector never reads half a file."""
+        d = os.path.dirname(path)
+        if d: os.makedirs(d, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f: f.write(self.prometheus(prefix))
+        os.replace(tmp, path)
+        return path
+
+def enable(tel:Optional[GateTelemetry]=None)->GateTelemetry:
+    """Install `tel` (or the current/new one) as the engine's process-wide telemetry sink."""
+    tel = tel or eng.TELEMETRY or GateTelemetry(); eng.TELEMETRY = tel
+    return tel
+
+def disable(): eng.TELEMETRY = None
+def current()->Optional[GateTelemetry]: return eng.TELEMETRY
+
+def overhead(n:int=20_000)->Dict[str, float]:
+    """us/call of evaluate_signal with telemetry off vs on (restores the previous state)."""
+    rows = eng.random_inputs(2000, 7); prev = eng.TELEMETRY; res = {}
+    try:
+        for label, t in (("disabled", None), ("enabled", GateTelemetry())):
+            eng.TELEMETRY = t; best = float("inf")
+            for _ in range(5):
+                t0 = time.perf_counter()
+                for i in range(n): eng.evaluate_signal("LONG" if i & 1 else "SHORT", rows[i % 2000])
+                best = min(best, time.perf_counter() - t0)
+            res[label] = round(1e6*best/n, 3)
+    finally: eng.TELEMETRY = prev
+    return res
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Gate telemetry demo: evaluate random inputs with telemetry on, print and export")
+    ap.add_argument("--rows", type=int, default=20_000)
+    ap.add_argument("--out", default=None, help="write Prometheus text here")
+    a = ap.parse_args()
+    print("overhead us/call:", overhead())
+    tel = enable(); rows = eng.random_inputs(a.rows, 11)
+    for d in ("LONG","SHORT"):
+        for r in rows: eng.evaluate_signal(d, r)
+    eng.evaluate_signals_batch(eng.inputs_to_columns(rows), "LONG")
+    for row in tel.blocking_gates(): print(row)
+    for row in tel.timing_rows(): print(row)
+    print(tel.override_rows()[:5])
+    if a.out: print("->", tel.write_prometheus(a.out))
@@ -0,0 +1,186 @@
+# tuner.py — grid/random-search tuning of SWEEP_PROFILES against a historical signal dataset
+#
+# Dataset: one row per historical setup with the Inputs columns, a `direction` column (LONG/SHORT)
+# and `r`, the R multiple the trade would have returned if taken. replay.py trade CSVs carry no Inputs
+# columns and cannot be used as is. Without an `adx_min` column the user floor is 0, so the tuned
+# profile adx_min alone decides (Inputs' own default of 28 would mask every candidate below it).
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Dict, Any, List, Tuple
+import os, copy, random, itertools, time
+import numpy as np
+
+from signal_engine_v3_11 import (ARCHETYPES, SWEEP_PROFILES, dump_profiles_to_json, auto_models_batch,
+                                 random_inputs, inputs_to_columns, _batch_col, _isin)
+
+PARAM_SPACE: Dict[str, List[Any]] = {
+    "adx_min": list(range(16, 33)),
+    "post_sweep_delay": list(range(0, 7)),
+    "require_vwap_flip": [True, False],
+    "expected_vwap": ["support","resistance","flip","reclaim"],
+    "w_sweep": list(range(10, 45, 5)), "w_mss": list(range(5, 35, 5)), "w_vwap": list(range(5, 35, 5)),
+    "w_adx": list(range(5, 30, 5)), "w_bias": list(range(5, 30, 5)),
+}
+_VWAP_IDX = {"support":0, "resistance":1, "flip":2, "reclaim":2}
+
+class GateCache:
+    """
+    Everything about one archetype's rows that no tuned parameter can change (MSS, micro-FVG, VWAP hit per
+    expectation, strict/one-LTF bias, ADX slope) is computed once; adx/delay masks are memoized per value.
+    """
+    def __init__(self, cols:Dict[str, np.ndarray], desired:np.ndarray, r:np.ndarray, archetype:str, base:Dict[str, Any]):
+        self.archetype, self.base = archetype, base
+        n = len(desired); col = lambda k: _batch_col(cols, k, n)
+        rec = auto_models_batch(col("session"), col("sweep_type"), desired)
+        sel = np.where(rec == None, col("liquidity_model"), rec).astype(str) == archetype
+        pick = lambda k: col(k)[sel]
+        d = desired[sel]; is_long, is_short = d=="LONG", d=="SHORT"
+        self.n, self.r = int(sel.sum()), r[sel].astype(float)
+        self.adx_now = pick("adx_now").astype(float)
+        self.adx_floor = pick("adx_min").astype(float) if "adx_min" in cols else np.zeros(self.n)
+        self.slope_ok = (pick("adx_sma3").astype(float) - pick("adx_sma6").astype(float)) >= pick("adx_slope_min").astype(float)
+        self.bars = pick("bars_since_sweep").astype(float)
+        self.mss_ok = pick("mss_dir") == d
+        self.micro_ok = pick("micro_fvg_present").astype(bool)
+        side, slope = pick("vwap_side"), pick("vwap_slope")
+        self.vwap_hit = np.stack([side=="ABOVE", side=="BELOW", _isin(slope, ("UP","DOWN")) & (side!="TOUCHING")])
+        mode = pick("bias_logic_mode"); bm = base.get("bias_mode")
+        self.strict_mode = (mode=="strict") | ((mode=="auto") & (bm != "reversal"))
+        htf, l15, l3 = pick("htf_60m_bias"), pick("ltf_15m_bias"), pick("ltf_3m_bias")
+        bull, bear = (l15=="BULL") & (l3=="BULL"), (l15=="BEAR") & (l3=="BEAR")
+        if (bm or "continuation") == "continuation": self.strict_ok = (is_long & bull) | (is_short & bear)
+        else: self.strict_ok = (is_long & bull & (htf!="BULL")) | (is_short & bear & (htf!="BEAR"))
+        self.one_ltf = (is_long & ((l15=="BULL") | (l3=="BULL"))) | (is_short & ((l15=="BEAR") | (l3=="BEAR")))
+        self.fixed_ok = self.mss_ok & self.micro_ok
+        self._adx, self._delay = {}, {}
+    def __getstate__(self): s = self.__dict__.copy(); s["_adx"], s["_delay"] = {}, {}; return s
+    def adx_ok(self, adx_min:float)->np.ndarray:
+        m = self._adx.get(adx_min)
+        if m is None: m = self._adx[adx_min] = (self.adx_now >= np.maximum(self.adx_floor, adx_min)) & self.slope_ok
+        return m
+    def delay_ok(self, delay:int)->np.ndarray:
+        m = self._delay.get(delay)
+        if m is None: m = self._delay[delay] = self.bars >= delay
+        return m
+    def score(self, c:Dict[str, Any], min_grade:float=0, min_trades:int=20, objective:str="total_r")->Tuple[float,int,float]:
+        if self.n == 0: return -np.inf, 0, 0.0
+        adx_ok = self.adx_ok(c["adx_min"])
+        vwap_ok = self.vwap_hit[_VWAP_IDX[c["expected_vwap"]]] if c["require_vwap_flip"] else np.ones(self.n, bool)
+        bias_ok = self.strict_ok | (~self.strict_mode & self.one_ltf & vwap_ok & adx_ok)
+        ready = self.fixed_ok & self.delay_ok(c["post_sweep_delay"]) & vwap_ok & adx_ok & bias_ok
+        if min_grade > 0:
+            grade = np.minimum(100, np.rint(c["w_sweep"] + c["w_mss"]*self.mss_ok + c["w_vwap"]*vwap_ok
+                                            + c["w_adx"]*adx_ok + c["w_bias"]*bias_ok))
+            ready &= grade >= min_grade
+        k = int(ready.sum())
+        if k == 0 or k < min_trades: return -np.inf, k, 0.0
+        total = float(self.r[ready].sum())
+        return (total if objective == "total_r" else total/k), k, total/k
+
+def _plain(p)->Dict[str, Any]:
+    """Deep-copied dict for a profile dict or a profile_registry.Profile."""
+    return p.to_dict() if hasattr(p, "to_dict") else copy.deepcopy(dict(p))
+
+def candidate_to_profile(base, c:Dict[str, Any])->Dict[str, Any]:
+    p = _plain(base)
+    p.update(adx_min=c["adx_min"], post_sweep_delay=c["post_sweep_delay"],
+             require_vwap_flip=c["require_vwap_flip"], expected_vwap=c["expected_vwap"])
+    p["grade_weights"] = {k: c["w_"+k] for k in ("sweep","mss","vwap","adx","bias")}
+    return p
+
+def profile_to_candidate(p:Dict[str, Any])->Dict[str, Any]:
+    gw = p.get("grade_weights", {})
+    c = {"adx_min": p.get("adx_min",24), "post_sweep_delay": p.get("post_sweep_delay",3),
+         "require_vwap_flip": p.get("require_vwap_flip", True), "expected_vwap": p.get("expected_vwap","support")}
+    c.update({"w_"+k: gw.get(k, v) for k, v in {"sweep":30,"mss":20,"vwap":20,"adx":15,"bias":15}.items()})
+    return c
+
+def grid_candidates(space:Dict[str, List[Any]])->List[Dict[str, Any]]:
+    keys = list(space)
+    return [dict(zip(keys, vals)) for vals in itertools.product(*(space[k] for k in keys))]
+
+def random_candidates(space:Dict[str, List[Any]], n:int, seed:int=0)->List[Dict[str, Any]]:
+    r = random.Random(seed)
+    return [{k: r.choice(v) for k, v in space.items()} for _ in range(n)]
+
+# --- process pool: caches are shipped once per worker via the initializer ---
+_CACHES: Dict[str, GateCache] = {}
+def _init_worker(caches): global _CACHES; _CACHES = caches
+def _score_chunk(args):
+    arche, cands, min_grade, min_trades, objective = args
+    gc = _CACHES[arche]
+    return [(i, *gc.score(c, min_grade, min_trades, objective)) for i, c in cands]
+
+def tune(df, candidates:Optional[List[Dict[str, Any]]]=None, n_random:int=10_000, archetypes:Optional[List[str]]=None,
+         profiles=None, workers:Optional[int]=None, min_grade:float=0, min_trades:int=20,
+         objective:str="total_r", seed:int=0, chunk:int=500):
+    """
+    Score every candidate for every archetype. Returns (best_profiles, leaderboard_df); best_profiles is a full
+    profiles dict (untouched archetypes keep their current profile), ready for dump_profiles_to_json. `profiles`
+    is the baseline every candidate must beat: a profiles dict or a ProfileSet (default SWEEP_PROFILES).
+    """
+    import pandas as pd
+    profiles = {k: _plain(v) for k, v in (profiles or SWEEP_PROFILES).items()}
+    archetypes = archetypes or list(ARCHETYPES)
+    cols = {k: np.asarray(df[k]) for k in df.columns}
+    desired, r = np.asarray(df["direction"], dtype=object), np.asarray(df["r"], dtype=float)
+    caches = {a: GateCache(cols, desired, r, a, profiles[a]) for a in archetypes}
+    candidates = candidates or random_candidates(PARAM_SPACE, n_random, seed)
+    jobs = []
+    for a in archetypes:
+        cands = [(-1, profile_to_candidate(profiles[a]))] + list(enumerate(candidates))
+        jobs += [(a, cands[i:i+chunk], min_grade, min_trades, objective) for i in range(0, len(cands), chunk)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(caches); results = list(map(_score_chunk, jobs))
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(caches,)) as ex:
+            results = list(ex.map(_score_chunk, jobs))
+    rows = [{"archetype": job[0], "candidate": i, "score": s, "trades": k, "avg_r": ar}
+            for job, res in zip(jobs, results) for i, s, k, ar in res]
+    board = pd.DataFrame(rows).sort_values(["archetype","score"], ascending=[True, False], kind="stable")
+    for a, g in board.groupby("archetype"):
+        top = g.iloc[0]
+        if np.isfinite(top["score"]) and top["candidate"] >= 0:
+            profiles[a] = candidate_to_profile(profiles[a], candidates[int(top["candidate"])])
+    return profiles, board
+
+def synthetic_dataset(n:int=50_000, seed:int=0):
+    """Random setups with an R outcome that favours higher ADX and aligned MSS, for benchmarking the tuner."""
+    import pandas as pd
+    rows = random_inputs(n, seed); df = pd.DataFrame(inputs_to_columns(rows))
+    rng = np.random.default_rng(seed)
+    df["direction"] = rng.choice(["LONG","SHORT"], n)
+    edge = 0.04*(df["adx_now"] - 25) + 0.3*(df["mss_dir"] == df["direction"])
+    df["r"] = np.round(np.where(rng.random(n) < 0.45 + 0.1*np.tanh(edge), 1.8, -1.0), 2)
+    return df
+
+if __name__ == "__main__":
+    import argparse
+    import pandas as pd
+    ap = argparse.ArgumentParser(description="Sweep SWEEP_PROFILES parameters against a signal dataset")
+    ap.add_argument("dataset", nargs="?", help="CSV/Parquet with Inputs columns + direction + r; omit for synthetic")
+    ap.add_argument("--candidates", type=int, default=10_000)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--min-grade", type=float, default=0)
+    ap.add_argument("--min-trades", type=int, default=20)
+    ap.add_argument("--objective", choices=["total_r","avg_r"], default="total_r")
+    ap.add_argument("--out", default=None, help="default: data/profiles_tuning.json, or data/profiles_tuning.synthetic.json "
+                                                "without a dataset so a demo run never replaces the live tuning file")
+    ap.add_argument("--profiles", default=os.path.join("data", "profiles_tuning.json"),
+                    help="baseline to improve on (the live tuning file; built-in defaults when it does not exist)")
+    a = ap.parse_args()
+    from profile_registry import ProfileRegistry
+    reg = ProfileRegistry(a.profiles); base = reg.snapshot()
+    if reg.last_error: ap.error(f"cannot load baseline {a.profiles}: {reg.last_error}")
+    a.out = a.out or os.path.join("data", "profiles_tuning.json" if a.dataset else "profiles_tuning.synthetic.json")
+    if a.dataset is None: df = synthetic_dataset()
+    elif a.dataset.endswith(".parquet"): df = pd.read_parquet(a.dataset)
+    else: df = pd.read_csv(a.dataset)
+    t0 = time.perf_counter()
+    best, board = tune(df, n_random=a.candidates, profiles=base, workers=a.workers, min_grade=a.min_grade,
+                       min_trades=a.min_trades, objective=a.objective)
+    dt_s = time.perf_counter() - t0
+    print(board.groupby("archetype").head(1).to_string(index=False))
+    print(f"{a.candidates:,} candidates x {board['archetype'].nunique()} archetypes in {dt_s:.1f}s (baseline: {base.source})")
+    dump_profiles_to_json(a.out, best); print(f"best profiles -> {a.out}")